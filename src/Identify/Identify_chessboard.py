@@ -120,6 +120,149 @@ def find_board_quad(img_bgr: np.ndarray, debug: bool = True) -> np.ndarray | Non
     return best
 
 
+class QuadTracker:
+    """
+    Keeps the board quad locked across video frames.
+    The full contour search (find_board_quad) only runs to initialize or
+    recover; every other frame just follows the 4 corners with pyramidal
+    Lucas-Kanade optical flow in a small window and refines them to sub-pixel.
+    """
+
+    def __init__(self, scale=0.5, win_size=21, max_level=2,
+                 max_fb_error=1.5, max_area_change=0.15, redetect_every=0):
+        """
+        :param scale: Downscale factor used for the full detector
+        :param win_size: Optical flow / corner search window in pixels
+        :param max_level: Pyramid levels for optical flow
+        :param max_fb_error: Max forward-backward error (px) for a corner to count as tracked
+        :param max_area_change: Max relative quad area change between two frames
+        :param redetect_every: Force a full detection every N frames (0 = only on failure)
+        """
+        self.scale = scale
+        self.win_size = (win_size, win_size)
+        self.max_level = max_level
+        self.max_fb_error = max_fb_error
+        self.max_area_change = max_area_change
+        self.redetect_every = redetect_every
+
+        self.quad = None
+        self.prev_gray = None
+        self.frames_since_detect = 0
+
+        self.lk_params = dict(
+            winSize=self.win_size,
+            maxLevel=self.max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+        )
+        self.subpix_criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.01)
+
+        # Counters, useful to check how often the slow path is taken
+        self.stats = {"detect": 0, "track": 0, "lost": 0}
+
+    def reset(self):
+        self.quad = None
+        self.prev_gray = None
+        self.frames_since_detect = 0
+
+    def _detect(self, img_bgr, gray):
+        small = cv2.resize(img_bgr, (0, 0), fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        quad_small = find_board_quad(small, debug=False)
+        self.stats["detect"] += 1
+        self.frames_since_detect = 0
+        if quad_small is None:
+            self.reset()
+            return None
+
+        quad = order_points(quad_small / self.scale)
+        self.quad = self._refine(gray, quad)
+        self.prev_gray = gray
+        return self.quad
+
+    def _refine(self, gray, quad):
+        pts = quad.reshape(-1, 1, 2).astype(np.float32).copy()
+        half = (self.win_size[0] // 2, self.win_size[1] // 2)
+        cv2.cornerSubPix(gray, pts, half, (-1, -1), self.subpix_criteria)
+        return pts.reshape(4, 2)
+
+    def _track(self, gray):
+        prev_pts = self.quad.reshape(-1, 1, 2).astype(np.float32)
+        next_pts, st, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, prev_pts, None, **self.lk_params)
+        if next_pts is None or not st.all():
+            return None
+
+        # Forward-backward check rejects corners that slid along an edge
+        back_pts, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, next_pts, None, **self.lk_params)
+        if back_pts is None or not st_back.all():
+            return None
+        fb_error = np.linalg.norm((back_pts - prev_pts).reshape(4, 2), axis=1)
+        if fb_error.max() > self.max_fb_error:
+            return None
+
+        quad = order_points(next_pts.reshape(4, 2))
+        if not cv2.isContourConvex(quad.reshape(-1, 1, 2)):
+            return None
+
+        prev_area = cv2.contourArea(self.quad.astype(np.float32))
+        area = cv2.contourArea(quad)
+        if prev_area <= 1 or abs(area - prev_area) / prev_area > self.max_area_change:
+            return None
+
+        return self._refine(gray, quad)
+
+    def update(self, img_bgr):
+        """
+        Locate the board in a new frame.
+        :param img_bgr: Full resolution BGR frame
+        :return: (4, 2) float32 quad in tl, tr, br, bl order, or None
+        """
+        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+
+        need_detect = self.quad is None or self.prev_gray is None or self.prev_gray.shape != gray.shape
+        if self.redetect_every and self.frames_since_detect >= self.redetect_every:
+            need_detect = True
+
+        if need_detect:
+            return self._detect(img_bgr, gray)
+
+        quad = self._track(gray)
+        if quad is None:
+            # Lost lock: fall back to the full detector on this same frame
+            self.stats["lost"] += 1
+            return self._detect(img_bgr, gray)
+
+        self.stats["track"] += 1
+        self.frames_since_detect += 1
+        self.quad = quad
+        self.prev_gray = gray
+        return self.quad
+
+
+def track_chessboard_stream(source=0):
+    """Live board localization from a camera or video file. Press [Q] to quit."""
+    cap = cv2.VideoCapture(source)
+    tracker = QuadTracker()
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        quad = tracker.update(frame)
+
+        show = frame.copy()
+        if quad is not None:
+            cv2.polylines(show, [quad.astype(int)], True, (0, 0, 255), 3)
+        cv2.putText(show, f"detect={tracker.stats['detect']} track={tracker.stats['track']} lost={tracker.stats['lost']}",
+                    (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        cv2.imshow("board_tracking", show)
+
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+
+    cap.release()
+    cv2.destroyAllWindows()
+
+
 def detect_and_transform_chessboard(image_path: str, debug: bool = True):
     img = cv2.imread(image_path)
     if img is None:
@@ -0,0 +1,191 @@
+import cv2
+import numpy as np
+import pandas as pd
+import os
+import time
+import argparse
+
+# Replaces the manual click sessions of relocalize_board.py / verify_warp.py:
+# find the 7x7 inner corners of the empty board, fit the 9x9 lattice and
+# write the 64 square ROIs straight into the geometry CSV.
+
+INPUT_IMAGE_PATH = "chess_data/Empty_Board_1.jpg"
+CSV_PATH = "chess_data/chessboardcfg.csv"
+
+PATTERN_SIZE = (7, 7)
+DETECT_SCALE = 0.5      # Corner search runs on a half-size image, refinement on full size
+SUBPIX_WIN = (5, 5)
+SUBPIX_CRITERIA = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_MAX_ITER, 50, 0.001)
+
+# ROI padding in square sizes. The boxes must contain the standing piece,
+# which projects upwards in the image, so the top gets extra room.
+PAD_SIDE = 0.15
+PAD_TOP = 0.6
+PAD_BOTTOM = 0.05
+
+
+def detect_inner_corners(gray):
+    """
+    Find the 7x7 inner corners at sub-pixel accuracy.
+    :return: (7, 7, 2) float32 array in detector order, or None
+    """
+    small = cv2.resize(gray, (0, 0), fx=DETECT_SCALE, fy=DETECT_SCALE, interpolation=cv2.INTER_AREA)
+    ok, corners = cv2.findChessboardCornersSB(small, PATTERN_SIZE, flags=cv2.CALIB_CB_NORMALIZE_IMAGE)
+    if ok:
+        corners = corners / DETECT_SCALE
+    else:
+        # Classic detector as fallback (slower on clutter, but tolerant of the board hinge)
+        ok, corners = cv2.findChessboardCorners(
+            gray, PATTERN_SIZE, flags=cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE)
+        if not ok:
+            return None
+
+    corners = corners.astype(np.float32).reshape(-1, 1, 2)
+    cv2.cornerSubPix(gray, corners, SUBPIX_WIN, (-1, -1), SUBPIX_CRITERIA)
+    return corners.reshape(PATTERN_SIZE[1], PATTERN_SIZE[0], 2)
+
+
+def orient_grid(grid):
+    """
+    Reorder the corner grid so that grid[i][j] is the corner between
+    files i/i+1 and ranks j/j+1, i.e. i runs A -> H and j runs 1 -> 8.
+    With the current camera mounting the A file is at the bottom of the
+    image and rank 1 on the right (same as chessboardcfg.csv).
+    """
+    # Axis 0 must be the one that mostly changes the image y coordinate
+    step0 = np.abs(np.diff(grid, axis=0)).mean(axis=(0, 1))
+    step1 = np.abs(np.diff(grid, axis=1)).mean(axis=(0, 1))
+    if step0[1] < step1[1]:
+        grid = grid.transpose(1, 0, 2)
+
+    # Files A -> H go up the image, ranks 1 -> 8 go left
+    if grid[-1, :, 1].mean() > grid[0, :, 1].mean():
+        grid = grid[::-1, :]
+    if grid[:, -1, 0].mean() > grid[:, 0, 0].mean():
+        grid = grid[:, ::-1]
+    return np.ascontiguousarray(grid)
+
+
+def fit_lattice(grid):
+    """
+    Least-squares homography from board units to image pixels fitted on all
+    49 inner corners, then all 9x9 lattice points projected in one call.
+    :return: (lattice (9, 9, 2), H_board2img, reprojection RMS in px)
+    """
+    idx = np.arange(1, 8, dtype=np.float32)
+    ii, jj = np.meshgrid(idx, idx, indexing="ij")
+    board_pts = np.stack([jj, ii], axis=-1).reshape(-1, 2)
+
+    H, _ = cv2.findHomography(board_pts, grid.reshape(-1, 2), 0)
+
+    reproj = cv2.perspectiveTransform(board_pts.reshape(-1, 1, 2), H).reshape(-1, 2)
+    rms = float(np.sqrt(np.mean(np.sum((reproj - grid.reshape(-1, 2)) ** 2, axis=1))))
+
+    full = np.arange(0, 9, dtype=np.float32)
+    ii, jj = np.meshgrid(full, full, indexing="ij")
+    lattice_pts = np.stack([jj, ii], axis=-1).reshape(-1, 1, 2)
+    lattice = cv2.perspectiveTransform(lattice_pts, H).reshape(9, 9, 2)
+    return lattice, H, rms
+
+
+def lattice_to_rois(lattice, img_shape):
+    """
+    Turn the 9x9 lattice into 64 padded bounding boxes (vectorized).
+    :return: DataFrame in the chessboardcfg.csv format, ordered A1, A2, ..., H8
+    """
+    # Corners of every square: (8, 8, 4, 2) for files x ranks
+    quads = np.stack([lattice[:-1, :-1], lattice[:-1, 1:], lattice[1:, 1:], lattice[1:, :-1]], axis=2)
+
+    x_min, y_min = quads[..., 0].min(axis=2), quads[..., 1].min(axis=2)
+    x_max, y_max = quads[..., 0].max(axis=2), quads[..., 1].max(axis=2)
+    w, h = x_max - x_min, y_max - y_min
+
+    img_h, img_w = img_shape[:2]
+    x1 = np.clip(np.round(x_min - PAD_SIDE * w), 0, img_w - 1).astype(int)
+    x2 = np.clip(np.round(x_max + PAD_SIDE * w), 1, img_w).astype(int)
+    y1 = np.clip(np.round(y_min - PAD_TOP * h), 0, img_h - 1).astype(int)
+    y2 = np.clip(np.round(y_max + PAD_BOTTOM * h), 1, img_h).astype(int)
+
+    files = "ABCDEFGH"
+    labels = [f"{files[f]}{r + 1}" for f in range(8) for r in range(8)]
+    return pd.DataFrame({
+        "label_name": labels,
+        "bbox_x": x1.ravel(),
+        "bbox_y": y1.ravel(),
+        "bbox_width": (x2 - x1).ravel(),
+        "bbox_height": (y2 - y1).ravel(),
+    })
+
+
+def calibrate(img_bgr):
+    """
+    Full automatic calibration of one empty-board image.
+    :return: dict with 'rois' (DataFrame), 'lattice', 'H', 'rms' and 'board_corners'
+             (outer corners in image tl, tr, br, bl order, as used for warping), or None
+    """
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY) if img_bgr.ndim == 3 else img_bgr
+
+    grid = detect_inner_corners(gray)
+    if grid is None:
+        return None
+
+    lattice, H, rms = fit_lattice(orient_grid(grid))
+    return {
+        "rois": lattice_to_rois(lattice, gray.shape),
+        "lattice": lattice,
+        "H": H,
+        "rms": rms,
+        "board_corners": np.float32([lattice[8, 8], lattice[8, 0], lattice[0, 0], lattice[0, 8]]),
+    }
+
+
+def draw_calibration(img_bgr, result):
+    """Debug view: lattice lines and ROI boxes."""
+    out = img_bgr.copy()
+    lattice = result["lattice"].astype(int)
+    for k in range(9):
+        cv2.polylines(out, [lattice[k, :].reshape(-1, 1, 2)], False, (0, 255, 0), 1)
+        cv2.polylines(out, [lattice[:, k].reshape(-1, 1, 2)], False, (0, 255, 0), 1)
+    for _, row in result["rois"].iterrows():
+        x, y, w, h = row["bbox_x"], row["bbox_y"], row["bbox_width"], row["bbox_height"]
+        cv2.rectangle(out, (x, y), (x + w, y + h), (0, 0, 255), 1)
+        cv2.putText(out, row["label_name"], (x + 3, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 255), 1)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Automatic 64-square ROI calibration from an empty board image.")
+    parser.add_argument("image", nargs="?", default=INPUT_IMAGE_PATH, help="Empty board capture")
+    parser.add_argument("--out", default=CSV_PATH, help="Geometry CSV to write")
+    parser.add_argument("--preview", default=None, help="Optional path for a debug overlay image")
+    args = parser.parse_args()
+
+    img = cv2.imread(args.image)
+    if img is None:
+        print(f"Error: {args.image} not found.")
+        return
+
+    t0 = time.perf_counter()
+    result = calibrate(img)
+    elapsed = (time.perf_counter() - t0) * 1000
+
+    if result is None:
+        print("Error: 7x7 inner corners not found. Is the board empty and fully visible?")
+        return
+
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    result["rois"].to_csv(args.out, index=False)
+
+    print(f"Calibrated in {elapsed:.0f} ms, lattice fit RMS {result['rms']:.3f} px")
+    print(f"Board corners (tl, tr, br, bl): {np.round(result['board_corners'], 1).tolist()}")
+    print(f"Saved 64 ROIs to {args.out}")
+
+    if args.preview:
+        cv2.imwrite(args.preview, draw_calibration(img, result))
+        print(f"Preview saved to {args.preview}")
+
+
+if __name__ == "__main__":
+    main()
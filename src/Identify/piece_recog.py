@@ -1,7 +1,12 @@
 import os
+import sys
 import cv2
 import numpy as np
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Vision.PatchPack import PatchPack, has_pack
+
 
 NORM_SIZE = 96
 MIN_FG_RATIO = 0.03
@@ -9,6 +14,12 @@ CANNY1, CANNY2 = 60, 160
 MATCH_METHOD = cv2.TM_CCOEFF_NORMED
 TOPK = 3
 
+# Packed copy of the templates (see Vision/PatchPack.py), used instead of the
+# template folders when it exists. Pack at the original image size:
+#   python Vision/PatchPack.py Identify/templates Identify/templates_pack --split templates --patch-size 1280 960
+TEMPLATE_PACK = "templates_pack"
+TEMPLATE_SPLIT = "templates"
+
 
 
 def script_dir():
@@ -30,12 +41,12 @@ def center_crop(img, pad_ratio=0.12):
 
 def segment_foreground(square_bgr):
     """
-    Input: square BGR image
+    Input: square BGR (or already grayscale) image
     Output: mask (0/255), foreground ratio
     """
     roi = center_crop(square_bgr, 0.12)
 
-    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+    gray = roi if roi.ndim == 2 else cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
     gray = cv2.GaussianBlur(gray, (5, 5), 0)
 
     th = cv2.adaptiveThreshold(
@@ -84,11 +95,38 @@ def shape_descriptor(square_bgr):
     return desc, fg_ratio
 
 
-def load_templates(template_root="/templates"):
+def load_templates_from_pack(pack_root):
+    """
+    Load template library from a memory-mapped PatchPack split
+    Return: dict[label] = [desc1, desc2, ...]
+    """
+    patches, index = PatchPack(pack_root).load(TEMPLATE_SPLIT)
+
+    db = {}
+
+    for i, label in enumerate(index['label']):
+
+        desc, _ = shape_descriptor(patches[i])
+
+        if desc is not None:
+            db.setdefault(label, []).append(desc)
+
+    if not db:
+        raise RuntimeError("No valid templates loaded")
+
+    return db
+
+
+def load_templates(template_root="/templates", pack_root=TEMPLATE_PACK):
     """
-    Load template library
+    Load template library (from pack_root instead when it holds a pack)
     Return: dict[label] = [desc1, desc2, ...]
     """
+    pack_path = os.path.join(script_dir(), pack_root)
+
+    if has_pack(pack_path):
+        return load_templates_from_pack(pack_path)
+
     root = os.path.join(script_dir(), template_root)
 
     if not os.path.isdir(root):
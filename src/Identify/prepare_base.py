@@ -1,27 +1,31 @@
 import cv2
-import numpy as np
+import glob
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Vision.BackgroundModel import BoardBackgroundModel, DEFAULT_BOARD_CORNERS
 
 def generate_base():
     folder = "chess_data"
-    files = [os.path.join(folder, f"Empty_Board_{i}.jpg") for i in range(1, 6)]
+    files = sorted(glob.glob(os.path.join(folder, "Empty_Board_*.jpg")))
+    if not files:
+        print(f"Error: no Empty_Board_N.jpg found in {folder}!")
+        return
 
-    print("Reading and averaging 5 images...")
-    imgs = []
+    # Streaming average: one frame in memory at a time, however many captures there are
+    model = BoardBackgroundModel(corners=DEFAULT_BOARD_CORNERS, size=800, alpha=0.0, grayscale=False)
+
+    print(f"Reading and averaging {len(files)} images...")
     for f in files:
         img = cv2.imread(f)
         if img is None:
             print(f"Error: {f} not found!")
             return
-        imgs.append(img.astype(np.float32))
-
-    avg_img = np.mean(imgs, axis=0).astype(np.uint8)
+        model.update(img)
 
-    src_pts = np.float32([[349, 296], [878, 277], [966, 807], [262, 825]])
-    dst_pts = np.float32([[0, 0], [800, 0], [800, 800], [0, 800]])
-
-    M = cv2.getPerspectiveTransform(src_pts, dst_pts)
-    warped_base = cv2.warpPerspective(avg_img, M, (800, 800))
+    warped_base = model.reference()
 
     output_path = "chess_data/Empty_Board.jpg"
     cv2.imwrite(output_path, warped_base)
@@ -29,5 +33,3 @@ def generate_base():
 
 if __name__ == "__main__":
     generate_base()
-
-
@@ -2,6 +2,10 @@ import cv2
 import numpy as np
 import pandas as pd
 import os
+import glob
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 CSV_PATH = "chess_data/chessboardcfg.csv"
 
@@ -11,6 +15,14 @@ START_FILE_INDEX = 951
 
 HOG_WIN_SIZE = (64, 128)
 
+# Gamma correction table, built once at import instead of on every call
+GAMMA = 1.2
+GAMMA_LUT = np.clip(((np.arange(256) / 255.0) ** (1.0 / GAMMA)) * 255, 0, 255).astype(np.uint8)
+
+# Per-worker state for batch processing (set by _init_worker)
+_worker_rois = None
+_worker_output_dir = None
+
 
 # Image Preprocessing Function
 def preprocess_for_hog(img):
@@ -18,14 +30,14 @@ def preprocess_for_hog(img):
     if img is None:
         return None
 
-    # Turn to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    # Turn to grayscale (skip if the caller already passes a gray ROI)
+    if img.ndim == 3:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = img
 
     # A. Gamma implementation
-    gamma = 1.2
-    inv_gamma = 1.0 / gamma
-    table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in np.arange(0, 256)]).astype("uint8")
-    gray = cv2.LUT(gray, table)
+    gray = cv2.LUT(gray, GAMMA_LUT)
 
     # B. Histogram Equalization
     gray = cv2.equalizeHist(gray)
@@ -35,6 +47,125 @@ def preprocess_for_hog(img):
 
     return processed_img
 
+
+def load_rois(csv_path):
+    """
+    Load the board geometry CSV once.
+    :return: (labels, rois) where rois is an (N, 4) int array of x, y, w, h
+    """
+    df = pd.read_csv(csv_path)
+    labels = df['label_name'].astype(str).tolist()
+    rois = df[['bbox_x', 'bbox_y', 'bbox_width', 'bbox_height']].to_numpy(dtype=np.int32)
+    return labels, rois
+
+
+def patch_prefix(image_path):
+    """
+    Deterministic, collision-free prefix for all patches of one capture.
+    The file stem keeps names readable, the path hash keeps two 'board.jpg'
+    from different folders apart.
+    """
+    abs_path = os.path.abspath(image_path)
+    stem = os.path.splitext(os.path.basename(abs_path))[0]
+    digest = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:8]
+    return f"{stem}_{digest}"
+
+
+def expand_inputs(inputs):
+    """Expand a list of paths and/or glob patterns into a sorted, de-duplicated list."""
+    paths = set()
+    for item in inputs:
+        matches = glob.glob(item)
+        if matches:
+            paths.update(matches)
+        elif os.path.isfile(item):
+            paths.add(item)
+    return sorted(paths)
+
+
+def crop_and_preprocess(full_img, rois):
+    """
+    Crop every ROI out of one full-board image and preprocess it.
+    The grayscale conversion is done once for the whole frame, not per square.
+    :return: list of processed patches (None where the ROI is empty)
+    """
+    gray = cv2.cvtColor(full_img, cv2.COLOR_BGR2GRAY) if full_img.ndim == 3 else full_img
+    img_h, img_w = gray.shape[:2]
+
+    patches = []
+    for x, y, w, h in rois:
+        roi = gray[max(0, y):min(y + h, img_h), max(0, x):min(x + w, img_w)]
+        patches.append(preprocess_for_hog(roi) if roi.size else None)
+    return patches
+
+
+def _init_worker(labels, rois, output_dir):
+    global _worker_rois, _worker_output_dir
+    # One OpenCV thread per process, parallelism comes from the pool
+    cv2.setNumThreads(1)
+    _worker_rois = (labels, rois)
+    _worker_output_dir = output_dir
+
+
+def _process_one(image_path):
+    labels, rois = _worker_rois
+    full_img = cv2.imread(image_path)
+    if full_img is None:
+        return image_path, 0
+
+    prefix = patch_prefix(image_path)
+    count = 0
+    for label, processed_img in zip(labels, crop_and_preprocess(full_img, rois)):
+        if processed_img is None:
+            continue
+        save_path = os.path.join(_worker_output_dir, f"{prefix}_{label}.jpg")
+        if cv2.imwrite(save_path, processed_img):
+            count += 1
+    return image_path, count
+
+
+def batch_process(inputs, csv_path=CSV_PATH, output_dir=OUTPUT_DIR, workers=None):
+    """
+    Crop and preprocess all 64 squares of many full-board captures in parallel.
+    Patches are saved as <stem>_<pathhash>_<square>.jpg, so re-running on the
+    same captures overwrites instead of duplicating.
+    :param inputs: list of image paths and/or glob patterns
+    :param csv_path: board geometry CSV (label_name, bbox_x, bbox_y, bbox_width, bbox_height)
+    :param output_dir: folder the patches are written to
+    :param workers: number of worker processes (default: CPU count)
+    :return: total number of patches written
+    """
+    if not os.path.exists(csv_path):
+        print(f"Error: CSV file {csv_path} does not exist.")
+        return 0
+
+    image_paths = expand_inputs(inputs)
+    if not image_paths:
+        print("Error: No input images matched.")
+        return 0
+
+    os.makedirs(output_dir, exist_ok=True)
+    labels, rois = load_rois(csv_path)
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Processing {len(image_paths)} images with {workers} workers -> {output_dir}")
+
+    total = 0
+    failed = []
+    chunksize = max(1, len(image_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(labels, rois, output_dir)) as pool:
+        for image_path, count in pool.map(_process_one, image_paths, chunksize=chunksize):
+            if count == 0:
+                failed.append(image_path)
+            total += count
+
+    for image_path in failed:
+        print(f"Warning: No patches written for {image_path}")
+    print(f"Processed {total} preprocessed samples from {len(image_paths) - len(failed)} images.")
+    return total
+
+
 def batch_process_sequential():
     if not os.path.exists(CSV_PATH):
         print(f"Error: CSV file {CSV_PATH} does not exist.")
@@ -43,7 +174,7 @@ def batch_process_sequential():
         print(f"Error: Input image {INPUT_IMAGE_PATH} does not exist.")
         return
 
-    df = pd.read_csv(CSV_PATH)
+    labels, rois = load_rois(CSV_PATH)
 
     full_img = cv2.imread(INPUT_IMAGE_PATH)
     if full_img is None:
@@ -60,13 +191,7 @@ def batch_process_sequential():
     current_index = START_FILE_INDEX
     count = 0
 
-    for index, row in df.iterrows():
-        x, y, w, h = int(row['bbox_x']), int(row['bbox_y']), int(row['bbox_width']), int(row['bbox_height'])
-
-        roi_img = full_img[y:y+h, x:x+w]
-
-        processed_img = preprocess_for_hog(roi_img)
-
+    for processed_img in crop_and_preprocess(full_img, rois):
         if processed_img is not None:
             file_name = f"{current_index:03}.jpg"
             save_path = os.path.join(OUTPUT_DIR, file_name)
@@ -78,5 +203,22 @@ def batch_process_sequential():
 
     print(f"Processed {count} preprocessed samples (file numbers {START_FILE_INDEX:03} to {current_index-1:03}).")
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Crop and preprocess board squares for HOG training.")
+    parser.add_argument("inputs", nargs="*", help="Full-board images or glob patterns (e.g. 'chess_data/board_*.jpg')")
+    parser.add_argument("--csv", default=CSV_PATH, help="Board geometry CSV")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="Output directory for patches")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if not args.inputs:
+        # No inputs given: keep the old single-image numbered mode
+        batch_process_sequential()
+        return
+
+    batch_process(args.inputs, csv_path=args.csv, output_dir=args.out, workers=args.workers)
+
+
 if __name__ == "__main__":
-    batch_process_sequential()
+    main()
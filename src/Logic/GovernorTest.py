@@ -0,0 +1,117 @@
+# Governor policy check with stand-in sensors (runs on any machine)
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chess
+import chess.engine
+from Logic.engine_governor import EngineGovernor
+from Logic.chess_logic_manager import ChessLogicManager
+
+
+class FakeSource:
+    """Stand-in for read_cpu_temp / read_cpu_load; set .value between decisions."""
+    def __init__(self, value=None):
+        self.value = value
+
+    def __call__(self):
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+# (temp C, load %, active subsystems) -> (threads, hash MB, time scale, ponder), with max_threads=4
+DECISION_TABLE = [
+    ((None, None, []),                (4, 64, 1.0, True)),    # no sensors: nominal
+    ((50.0, 10.0, []),                (4, 64, 1.0, True)),
+    ((65.0, 10.0, []),                (3, 64, 1.0, True)),    # warm
+    ((75.0, 10.0, []),                (2, 16, 0.75, False)),  # hot
+    ((80.0, 10.0, []),                (1, 16, 0.5, False)),   # critical
+    ((50.0, 90.0, []),                (3, 64, 1.0, True)),    # busy CPU
+    ((70.0, 90.0, []),                (3, 64, 1.0, True)),    # warm and busy: one thread given up, not two
+    ((50.0, 10.0, ["arm"]),           (3, 64, 1.0, True)),
+    ((50.0, 10.0, ["arm", "vision"]), (2, 64, 1.0, True)),
+    ((76.0, 10.0, ["vision"]),        (1, 16, 0.75, False)),
+    ((85.0, 99.0, ["arm", "vision"]), (1, 16, 0.5, False)),   # never below one thread
+    ((OSError("sensor gone"), 10.0, []), (4, 64, 1.0, True)),  # failing source counts as unknown
+]
+
+
+def run_governor_test():
+    temp, load = FakeSource(), FakeSource()
+    governor = EngineGovernor(temp_source=temp, load_source=load, max_threads=4,
+                              max_hash=64, min_hash=16, min_interval=0.0)
+    failures = 0
+
+    print("\n===== Governor decision table =====")
+    for (t, l, active), expected in DECISION_TABLE:
+        temp.value, load.value = t, l
+        for name in active:
+            governor.set_activity(name, True)
+
+        decision = governor.decide(force=True)
+        got = (decision["threads"], decision["hash"], decision["limit_scale"], decision["ponder"])
+        ok = got == expected
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  temp={t!s:>18} load={l!s:>5} active={','.join(active) or '-':12s}"
+              f" -> threads={got[0]} hash={got[1]} x{got[2]} ponder={'on' if got[3] else 'off'}"
+              + ("" if ok else f"  (expected {expected})"))
+
+        for name in active:
+            governor.set_activity(name, False)
+
+    print("\n===== Limit scaling =====")
+    temp.value, load.value = 77.0, 10.0
+    governor.decide(force=True)
+    limit = governor.scale_limit(chess.engine.Limit(time=1.0, depth=12))
+    ok = limit.time == 0.75 and limit.depth == 12
+    failures += not ok
+    print(f"{'PASS' if ok else 'FAIL'}  hot: 1.0s -> {limit.time}s, depth {limit.depth}")
+
+    print("\n===== Decision reuse and logging =====")
+    cached = EngineGovernor(temp_source=temp, load_source=load, max_threads=4, min_interval=3600.0)
+    temp.value = 50.0
+    first = cached.decide()
+    temp.value = 80.0
+    ok = cached.decide() is first
+    failures += not ok
+    print(f"{'PASS' if ok else 'FAIL'}  sources not re-read within min_interval")
+
+    temp.value = 50.0
+    with cached.activity("arm"):
+        ok = cached.decide()["threads"] == 3
+    failures += not ok
+    print(f"{'PASS' if ok else 'FAIL'}  activity change forces a new decision")
+
+    cached.decide(force=True)   # Arm idle again: back to 4 threads, logged once
+    logged = len(cached.history)
+    cached.decide(force=True)
+    ok = len(cached.history) == logged
+    failures += not ok
+    print(f"{'PASS' if ok else 'FAIL'}  unchanged decision not logged again ({logged} entries)")
+
+    print("\n===== Ceiling from the engine settings =====")
+    manager = ChessLogicManager(cache_path=None, syzygy_path=None)
+    manager.governor.temp_source, manager.governor.load_source = temp, load
+    temp.value, load.value = 40.0, 5.0
+    options = manager.governor.engine_options(force=True)
+    ok = options == {"Threads": 1, "Hash": 16}
+    failures += not ok
+    print(f"{'PASS' if ok else 'FAIL'}  cool and idle keeps Stockfish's defaults: {options}")
+
+    temp.value = 82.0
+    manager.governor.decide(force=True)
+    manager._last_search = None
+    manager._start_ponder(chess.Move.from_uci("e2e4"))
+    ok = manager.ponder_handle is None
+    failures += not ok
+    print(f"{'PASS' if ok else 'FAIL'}  no pondering when critical")
+    manager.position_cache.close()
+
+    print(f"\n{failures} failure(s)")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_governor_test() else 1)
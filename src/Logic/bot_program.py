@@ -1,6 +1,7 @@
 # Abandoned
 import chess
 from chess_engine import ZoraChessEngine
+from transition_index import TransitionIndex
 import time
 # UPDATED: Importing Teammate B's file "MovePiece.py"
 # import MovePiece # Abandoned
@@ -33,14 +34,10 @@ def is_valid_transition(prev_fen, current_fen, is_robot_turn):
         return False, "No_Move"
 
     # 3. Validation Logic
-    # We generate all legal moves from the previous state and see if
-    # any of them result in the current state.
-    for move in prev_board.legal_moves:
-        prev_board.push(move)
-        # Compare only piece placement (ignoring move counters)
-        if prev_board.fen().split(' ')[0] == curr_board.fen().split(' ')[0]:
-            return True, "Legal"
-        prev_board.pop()  # Undo and try next move
+    # Index the legal moves of the previous state by how they change the
+    # bitboards and look up the observed state (piece placement only).
+    if TransitionIndex(prev_board).find_board(curr_board) is not None:
+        return True, "Legal"
 
     # 4. If no legal move matches the new state
     return False, "Illegal_State"
@@ -1,13 +1,144 @@
 import chess
 import chess.engine
+import math
 import os
+import threading
+from concurrent.futures import Future, InvalidStateError
 from Utils.Logger import get_logger
 
 logger = get_logger(__name__)
 
 
+class SearchHandle:
+    """
+    Handle to an engine search that runs in the background.
+    Returned immediately by ZoraChessEngine.start_search(); the caller can poll
+    done(), block on result(), stop the search early or cancel it.
+    """
+    def __init__(self, board, analysis=None, info_callback=None):
+        """
+        :param board: Position being searched (a private copy is kept)
+        :param analysis: python-chess SimpleAnalysisResult, None for an already finished handle
+        :param info_callback: Optional callable(info_dict) for every engine 'info' update
+        """
+        self.board = board.copy(stack=False)
+        self.info = {}
+        self.ponder_move = None
+        self._analysis = analysis
+        self._future = Future()
+        self._info_callback = info_callback
+        self._thread = None
+
+        if analysis is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    @classmethod
+    def completed(cls, board, uci):
+        """A handle that is already resolved, e.g. for a move that did not need the engine."""
+        handle = cls(board)
+        handle._future.set_result(uci)
+        return handle
+
+    def _run(self):
+        try:
+            for info in self._analysis:
+                self.info.update(info)
+                if self._info_callback is not None:
+                    try:
+                        self._info_callback(info)
+                    except Exception as e:
+                        logger.error(f"Search info callback failed: {e}")
+
+            best = self._analysis.wait()
+            self.ponder_move = best.ponder
+            uci = best.move.uci() if best.move else None
+            self._future.set_result(uci)
+        except InvalidStateError:
+            # Cancelled while the engine was finishing
+            pass
+        except Exception as e:
+            try:
+                self._future.set_exception(e)
+            except InvalidStateError:
+                pass
+
+    def done(self):
+        return self._future.done()
+
+    def cancelled(self):
+        return self._future.cancelled()
+
+    def result(self, timeout=None):
+        """
+        Block until the search finishes.
+        :param timeout: Seconds to wait; raises concurrent.futures.TimeoutError if exceeded
+        :return: Best move in UCI format (None if the position has no legal moves)
+        """
+        return self._future.result(timeout=timeout)
+
+    def stop(self):
+        """Ask the engine to finish now; the handle resolves with the best move found so far."""
+        if self._analysis is not None and not self.done():
+            self._analysis.stop()
+
+    def cancel(self):
+        """Abort the search and discard its result."""
+        if self.done():
+            return False
+        cancelled = self._future.cancel()
+        if self._analysis is not None:
+            self._analysis.stop()
+        return cancelled
+
+    def exception(self):
+        """Exception raised by a finished search, None otherwise."""
+        if not self.done() or self.cancelled():
+            return None
+        return self._future.exception()
+
+    def add_done_callback(self, fn):
+        """Call fn(handle) once the search finishes (from the search thread)."""
+        self._future.add_done_callback(lambda _: fn(self))
+
+
+# Options that change playing strength; Threads/Hash only change speed
+STRENGTH_OPTIONS = ("Skill Level", "UCI_Elo", "UCI_LimitStrength")
+
+# Stockfish's own defaults, in effect for any option that is not configured
+ENGINE_DEFAULTS = {"Threads": 1, "Hash": 16}
+
+
+def time_bucket(seconds):
+    """Round a search time to half-octave steps (..., 0.5, 0.707, 1, 1.414, 2, ...) for cache keys."""
+    if seconds <= 0:
+        return 0.0
+    return round(2.0 ** (round(2.0 * math.log2(seconds)) / 2.0), 3)
+
+
+def settings_key(options, limit=1.0):
+    """
+    Short description of the search settings, used to key cached moves.
+    :param limit: The chess.engine.Limit actually searched with, or a time in seconds
+    """
+    opts = ";".join(f"{k}={options[k]}" for k in sorted(options) if k in STRENGTH_OPTIONS)
+    if not isinstance(limit, chess.engine.Limit):
+        limit = chess.engine.Limit(time=limit)
+    key = f"{opts};time={time_bucket(limit.time) if limit.time is not None else None}"
+    if limit.depth is not None:
+        key += f";depth={limit.depth}"
+    if limit.nodes is not None:
+        key += f";nodes={limit.nodes}"
+    return key
+
+
 class ZoraChessEngine:
-    def __init__(self, engine_path=None):
+    def __init__(self, engine_path=None, options=None, nice=None):
+        """
+        :param engine_path: Stockfish binary (default: Raspberry Pi OS package path)
+        :param options: Extra UCI options, e.g. {"Threads": 2, "Hash": 64}
+        :param nice: Optional niceness increment for the engine process (Linux)
+        """
         # Default to the standard Raspberry Pi installation path
         if engine_path is None:
             self.engine_path = "/usr/games/stockfish"
@@ -18,38 +149,91 @@ class ZoraChessEngine:
         if not os.path.exists(self.engine_path):
             raise FileNotFoundError(f"Stockfish engine not found at {self.engine_path}. Run 'sudo apt install stockfish'.")
 
+        self.engine = None
+        # UCI options applied on start; they also define which cached results are reusable
+        self.options = {"Skill Level": 8}
+        if options:
+            self.options.update(options)
+        self.nice = nice
 
     def start(self):
         """Start the engine process."""
         try:
-            self.engine = chess.engine.SimpleEngine.popen_uci(self.engine_path)
-            self.engine.configure({"Skill Level": 8})
-            logger.info(f"Engine started successfully: {self.engine.id.get('name')} with Skill Level 8.")
+            popen_args = {}
+            if self.nice:
+                # Lower the engine's priority so vision and servo threads are not starved
+                popen_args["preexec_fn"] = lambda: os.nice(self.nice)
+            self.engine = chess.engine.SimpleEngine.popen_uci(self.engine_path, **popen_args)
+            self.engine.configure(self.options)
+            logger.info(f"Engine started successfully: {self.engine.id.get('name')} with {self.options}.")
         except Exception as e:
             logger.error(f"Failed to start engine: {e}")
             raise e
 
-    def get_best_move(self, fen_string, time_limit=1.0):
+    def start_search(self, fen_string, time_limit=1.0, limit=None, info_callback=None):
         """
-        Core Function: Calculates the best move for a given board state.
-        :param fen_string: The standard FEN string representing the board.
-        :param time_limit: Thinking time limit in seconds.
-        :return: The best move in UCI format (e.g., 'e2e4').
+        Start a search and return immediately.
+        :param fen_string: FEN string (or chess.Board) of the position to search.
+        :param time_limit: Thinking time limit in seconds (ignored if limit is given).
+        :param limit: Optional chess.engine.Limit, e.g. for depth/node limits or infinite analysis.
+        :param info_callback: Optional callable(info_dict) receiving streaming search info.
+        :return: SearchHandle resolving to the best move in UCI format.
         """
         if not self.engine:
             logger.warning("Engine not started. Attempting to start automatically...")
             self.start()
 
-        board = chess.Board(fen_string)
+        board = fen_string if isinstance(fen_string, chess.Board) else chess.Board(fen_string)
+        if limit is None:
+            limit = chess.engine.Limit(time=time_limit)
+
+        # A new command pre-empts any search still running on this engine
+        analysis = self.engine.analysis(board, limit)
+        return SearchHandle(board, analysis, info_callback=info_callback)
+
+    def settings_key(self, limit=1.0):
+        """Short description of the search settings, used to key cached moves."""
+        return settings_key(self.options, limit)
+
+    def set_options(self, options):
+        """
+        Change UCI options (e.g. Threads/Hash). Applied at once if the engine is
+        running, so only call this between searches.
+        :return: True if anything changed
+        """
+        changed = {k: v for k, v in options.items() if self.options.get(k) != v}
+        if not changed:
+            return False
+        self.options.update(changed)
+        if self.engine:
+            self.engine.configure(changed)
+        return True
 
-        # Ask Stockfish to find the best move
-        result = self.engine.play(board, chess.engine.Limit(time=time_limit))
+    def is_alive(self):
+        """Health check: True if the engine process answers a ping."""
+        if not self.engine:
+            return False
+        try:
+            self.engine.ping()
+            return True
+        except Exception:
+            return False
 
-        # Return the move in UCI string format
-        return result.move.uci()
+    def get_best_move(self, fen_string, time_limit=1.0):
+        """
+        Core Function: Calculates the best move for a given board state.
+        :param fen_string: The standard FEN string representing the board.
+        :param time_limit: Thinking time limit in seconds.
+        :return: The best move in UCI format (e.g., 'e2e4').
+        """
+        return self.start_search(fen_string, time_limit=time_limit).result()
 
     def quit(self):
         """Stop the engine and release resources."""
         if self.engine:
-            self.engine.quit()
+            try:
+                self.engine.quit()
+            except Exception as e:
+                logger.warning(f"Engine did not quit cleanly: {e}")
+            self.engine = None
             logger.info("Engine stopped.")
@@ -1,19 +1,103 @@
+import time
+import threading
 import chess
-from Logic.chess_engine import ZoraChessEngine
+import chess.engine
+from Logic.chess_engine import ZoraChessEngine, SearchHandle, ENGINE_DEFAULTS
+from Logic.position_cache import PositionCache
+from Logic.time_manager import TimeManager
+from Logic.engine_governor import EngineGovernor
+from Logic.tablebase import TablebaseProber
+from Logic.transition_index import TransitionIndex
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
 
 class ChessLogicManager:
-    def __init__(self, robot_color=chess.BLACK):
+    def __init__(self, robot_color=chess.BLACK, cache_path="cache/positions.sqlite", book_path=None,
+                 engine_pool=None, pool_client=None, syzygy_path="syzygy", syzygy_max_pieces=5):
         """
         :param robot_color: chess.WHITE or chess.BLACK, indicating which side the robot is playing.
+        :param cache_path: SQLite file for the persistent move cache (None = memory only).
+        :param book_path: Optional Polyglot opening book (.bin).
+        :param engine_pool: Optional shared EnginePool; without it the manager runs its own engine.
+        :param pool_client: Scheduling key in the pool (default: one per manager).
+        :param syzygy_path: Folder with Syzygy tables (None = no tablebase probing).
+        :param syzygy_max_pieces: Largest piece count probed in the tablebase.
         """
         self.board = chess.Board()
-        self.engine = ZoraChessEngine()
+        self.engine_pool = engine_pool
+        self.pool_client = pool_client or f"logic-{id(self):x}"
+        self.engine = ZoraChessEngine() if engine_pool is None else None
         self.robot_color = robot_color
         self.taken_by_white = []
         self.taken_by_black = []
 
+        # Search time per robot move: clock, phase and complexity aware
+        self.time_manager = TimeManager(default_time=1.0)
+        self._turn_forced = False
+
+        # Adapts engine threads/hash/time to CPU temperature, load and robot activity.
+        # The configured engine settings are the ceiling; the governor only scales down.
+        options = dict(ENGINE_DEFAULTS)
+        options.update((engine_pool or self.engine).options)
+        self.governor = EngineGovernor(max_threads=options["Threads"], max_hash=options["Hash"])
+
+        # Pondering: keep searching the expected human reply on the human's time
+        self.enable_ponder = True
+        self.ponder_topup = 0.2     # Extra search after a ponder-hit, in seconds
+        self.ponder_handle = None   # Running ponder search
+        self.ponder_move = None     # Human reply the ponder search assumes
+        self.ponder_started_at = 0.0
+        self._ponder_hit = None     # Ponder search to reuse for the next robot move
+        self._last_search = None
+        self.ponder_stats = {"hits": 0, "misses": 0, "saved_time": 0.0}
+
+        # Known positions (opening book + earlier searches) are answered without the engine
+        self.position_cache = PositionCache(db_path=cache_path, book_path=book_path)
+
+        # Endgames with few pieces are answered perfectly by the tablebase
+        self.tablebase = TablebaseProber(syzygy_path, max_pieces=syzygy_max_pieces)
+
+        # Legal-move index of the current position for matching vision observations
+        self._transition_index = None
+
+    @property
+    def time_limit(self):
+        """Nominal search time per move in seconds (the TimeManager scales it per position)."""
+        return self.time_manager.default_time
+
+    @time_limit.setter
+    def time_limit(self, seconds):
+        self.time_manager.default_time = seconds
+
     def start_engine(self):
-        self.engine.start()
+        # A shared pool is started and shut down by its owner
+        if self.engine is not None:
+            self.engine.start()
+
+    def _start_search(self, board, time_limit=1.0, limit=None, info_callback=None, preemptible=False):
+        """Search on the own engine or, if configured, on the shared pool."""
+        self._apply_governor()
+        if self.engine_pool is not None:
+            return self.engine_pool.submit_search(board, time_limit=time_limit, limit=limit,
+                                                  info_callback=info_callback, client=self.pool_client,
+                                                  preemptible=preemptible)
+        return self.engine.start_search(board, time_limit=time_limit, limit=limit, info_callback=info_callback)
+
+    def _apply_governor(self):
+        """Push the governor's current Threads/Hash to the engine(s); called between searches."""
+        if self.governor is None:
+            return
+        options = self.governor.engine_options()
+        if self.engine_pool is not None:
+            self.engine_pool.set_options(options)
+        elif self.engine.engine is not None:
+            self.engine.set_options(options)
+
+    def _settings_key(self, limit):
+        """Cache key for a search with this limit (after time allocation and governor scaling)."""
+        source = self.engine_pool if self.engine_pool is not None else self.engine
+        return source.settings_key(limit)
 
     def _record_capture(self, move, mover_color):
         """Helper to track which piece was captured."""
@@ -34,6 +118,7 @@ class ChessLogicManager:
         try:
             move = chess.Move.from_uci(uci_str)
             if move in self.board.legal_moves:
+                self._check_ponder(move)
                 is_capture = self.board.is_capture(move)
                 self._record_capture(move, self.board.turn) # Record before pushing
                 self.board.push(move)
@@ -50,13 +135,76 @@ class ChessLogicManager:
         except Exception as e:
             return False, str(e)
 
-    def get_robot_move(self):
+    def start_robot_search(self, info_callback=None):
         """
-        Get the best move for the robot.
-        :return: (best_move_uci, move_info)
+        Start searching the robot's reply in the background.
+        :param info_callback: Optional callable(info_dict) for streaming engine updates
+        :return: SearchHandle resolving to the best move in UCI format
+        """
+        self.time_manager.start_turn()
+
+        forced = self.time_manager.forced_move(self.board)
+        self._turn_forced = forced is not None
+        tb_move = self.tablebase.probe(self.board) if forced is None else None
+        if forced is not None:
+            # Only one legal reply: no search, no ponder to reuse
+            self.cancel_ponder()
+            handle = SearchHandle.completed(self.board, forced.uci())
+        elif tb_move is not None:
+            self.cancel_ponder()
+            logger.info(f"Tablebase reply {tb_move}, engine skipped")
+            handle = SearchHandle.completed(self.board, tb_move)
+        else:
+            limit, _ = self.time_manager.allocate(self.board)
+            if self.governor is not None:
+                limit = self.governor.scale_limit(limit)
+            settings = self._settings_key(limit)
+            handle = self._take_ponder_hit(limit.time)
+            if handle is None:
+                handle = self._lookup_cached_move(settings)
+            if handle is None:
+                handle = self._start_search(self.board.fen(), limit=limit, info_callback=info_callback)
+
+            if not handle.done():
+                handle.add_done_callback(lambda h: self._store_search_result(h, settings))
+
+        handle.add_done_callback(lambda h: self.time_manager.search_done())
+        self._last_search = handle
+        return handle
+
+    def finish_robot_turn(self):
+        """
+        Call once the robot's move has been executed physically; charges the
+        robot's clock and updates the arm latency estimate.
+        :return: Response time of this turn in seconds
+        """
+        return self.time_manager.end_turn(forced=self._turn_forced)
+
+    def _lookup_cached_move(self, settings):
+        if self.position_cache is None:
+            return None
+        uci = self.position_cache.lookup(self.board, settings)
+        if uci is None or chess.Move.from_uci(uci) not in self.board.legal_moves:
+            return None
+        logger.info(f"Cached reply {uci}, engine skipped")
+        return SearchHandle.completed(self.board, uci)
+
+    def _store_search_result(self, handle, settings):
+        if handle.cancelled() or handle.exception() is not None:
+            return
+        self.position_cache.store(handle.board, handle.result(), settings)
+
+    def get_tablebase_stats(self):
+        return self.tablebase.get_stats()
+
+    def get_cache_stats(self):
+        return self.position_cache.get_stats() if self.position_cache else {}
+
+    def apply_robot_move(self, best_move_uci):
+        """
+        Push the robot's chosen move onto the board.
+        :return: move_info dict
         """
-        current_fen = self.board.fen()
-        best_move_uci = self.engine.get_best_move(current_fen)
         move = chess.Move.from_uci(best_move_uci)
 
         is_capture = self.board.is_capture(move)
@@ -71,6 +219,120 @@ class ChessLogicManager:
             "is_game_over": self.board.is_game_over(),
             "result": self.board.result() if self.board.is_game_over() else None
         }
+
+        # Think on the human's time, assuming the reply the engine expects
+        last = self._last_search
+        self._last_search = None
+        if last is not None and last.done() and not last.cancelled() and last.ponder_move is not None:
+            self._start_ponder(last.ponder_move)
+
+        return info
+
+    # ---------------- Pondering ----------------
+
+    def _ponder_allowed(self):
+        return self.governor is None or self.governor.decide()["ponder"]
+
+    def _start_ponder(self, ponder_move):
+        if not self.enable_ponder or self.board.is_game_over():
+            return
+        if not self._ponder_allowed():
+            logger.debug("Pondering skipped: CPU too hot")
+            return
+        if ponder_move not in self.board.legal_moves:
+            return
+
+        board = self.board.copy(stack=False)
+        board.push(ponder_move)
+        if board.is_game_over():
+            return
+
+        # Infinite search; it is stopped by the next robot turn or cancelled on a miss.
+        # In a shared pool it yields its engine when other searches are waiting.
+        self.ponder_handle = self._start_search(board, limit=chess.engine.Limit(), preemptible=True)
+        self.ponder_move = ponder_move
+        self.ponder_started_at = time.monotonic()
+        logger.debug(f"Pondering on expected reply {ponder_move.uci()}")
+        if self.governor is not None:
+            self._watch_ponder(self.ponder_handle)
+
+    def _watch_ponder(self, handle):
+        """Re-check the governor while a ponder search runs; stop it once the CPU gets hot."""
+        def check():
+            if handle.done() or handle is not self.ponder_handle:
+                return
+            if not self._ponder_allowed():
+                logger.info("Pondering stopped: CPU too hot")
+                # A stopped ponder never counts as a hit, so the robot's turn searches afresh
+                handle.stop()
+                return
+            self._watch_ponder(handle)
+
+        timer = threading.Timer(max(0.5, self.governor.min_interval), check)
+        timer.daemon = True
+        timer.start()
+
+    def _check_ponder(self, human_move):
+        """Compare the human move with the pondered one before it is pushed."""
+        handle = self.ponder_handle
+        if handle is None:
+            return
+        self.ponder_handle = None
+
+        if human_move == self.ponder_move and not handle.done():
+            self.ponder_stats["hits"] += 1
+            self._ponder_hit = handle
+            logger.info(f"Ponder-hit on {human_move.uci()}")
+        else:
+            self.ponder_stats["misses"] += 1
+            handle.cancel()
+            logger.debug(f"Ponder-miss: expected {self.ponder_move.uci()}, got {human_move.uci()}")
+        self.ponder_move = None
+
+    def _take_ponder_hit(self, time_budget):
+        """Turn a ponder-hit into the robot's search, topped up for at most ponder_topup seconds."""
+        handle = self._ponder_hit
+        self._ponder_hit = None
+        if handle is None:
+            return None
+        if handle.board.fen() != self.board.fen():
+            handle.cancel()
+            return None
+
+        pondered = time.monotonic() - self.ponder_started_at
+        topup = max(0.0, min(self.ponder_topup, time_budget - pondered))
+        if topup <= 0.0:
+            handle.stop()
+        else:
+            threading.Timer(topup, handle.stop).start()
+
+        self.ponder_stats["saved_time"] += max(0.0, time_budget - topup)
+        logger.info(f"Reusing {pondered:.2f}s of ponder search, top-up {topup:.2f}s")
+        return handle
+
+    def cancel_ponder(self):
+        for handle in (self.ponder_handle, self._ponder_hit):
+            if handle is not None:
+                handle.cancel()
+        self.ponder_handle = None
+        self._ponder_hit = None
+        self.ponder_move = None
+
+    def get_ponder_stats(self):
+        """Ponder-hit rate and total search time saved (seconds)."""
+        total = self.ponder_stats["hits"] + self.ponder_stats["misses"]
+        stats = dict(self.ponder_stats)
+        stats["hit_rate"] = self.ponder_stats["hits"] / total if total else 0.0
+        return stats
+
+    def get_robot_move(self):
+        """
+        Get the best move for the robot (blocking).
+        :return: (best_move_uci, move_info)
+        """
+        best_move_uci = self.start_robot_search().result()
+        info = self.apply_robot_move(best_move_uci)
+        self.finish_robot_turn()
         return best_move_uci, info
 
     def get_board_matrix(self):
@@ -89,15 +351,55 @@ class ChessLogicManager:
             matrix.append(row)
         return matrix
 
+    def get_transition_index(self):
+        """TransitionIndex of the current position, rebuilt only after the board changed."""
+        index = self._transition_index
+        if index is None or index.board.fen() != self.board.fen():
+            index = TransitionIndex(self.board)
+            self._transition_index = index
+        return index
+
+    def match_board_matrix(self, matrix, layout="vision"):
+        """
+        Legal moves from the current position that explain an observed board.
+        :param matrix: 8x8 matrix of colour codes ('W'/'B'/'.'), piece symbols or occupancy booleans
+        :param layout: "vision" (detector layout) or "logic" (get_board_matrix layout)
+        :return: List of moves in UCI format (empty if no legal move matches)
+        """
+        return [move.uci() for move in self.get_transition_index().lookup_matrix(matrix, layout)]
+
+    def restore_game(self, moves, start_fen=chess.STARTING_FEN):
+        """
+        Rebuild the board and capture lists from a move list (e.g. the game journal).
+        :param moves: Moves in UCI format, played from start_fen
+        """
+        self.cancel_ponder()
+        self.board.set_fen(start_fen)
+        self.taken_by_white = []
+        self.taken_by_black = []
+        for uci in moves:
+            move = chess.Move.from_uci(uci)
+            if move not in self.board.legal_moves:
+                raise ValueError(f"Illegal move {uci} in {self.board.fen()}")
+            self._record_capture(move, self.board.turn)
+            self.board.push(move)
+
     def get_current_fen(self):
         return self.board.fen()
 
     def reset_game(self, robot_color=chess.BLACK):
+        self.cancel_ponder()
+        self.time_manager.reset()
         self.board.reset()
         self.robot_color = robot_color
 
     def stop(self):
-        self.engine.quit()
+        self.cancel_ponder()
+        if self.engine is not None:
+            self.engine.quit()
+        if self.position_cache is not None:
+            self.position_cache.close()
+        self.tablebase.close()
 
 
 
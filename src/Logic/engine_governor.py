@@ -0,0 +1,161 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+import psutil
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+THERMAL_PATH = "/sys/class/thermal/thermal_zone0/temp"
+
+
+def read_cpu_temp(path=THERMAL_PATH):
+    """CPU temperature in degrees Celsius, None if the sensor is not available."""
+    try:
+        with open(path, "r") as f:
+            return int(f.read()) / 1000
+    except (OSError, ValueError):
+        return None
+
+
+def read_cpu_load():
+    """System-wide CPU load in percent since the previous call."""
+    return psutil.cpu_percent(interval=None)
+
+
+class EngineGovernor:
+    """
+    Picks engine Threads/Hash and a search time scale from CPU temperature,
+    CPU load and what the rest of the robot is doing. A hot Pi throttles all
+    cores, so giving Stockfish fewer threads before that happens keeps vision
+    and servo timing intact. It only ever scales down from max_threads/max_hash,
+    which should be the engine's configured settings. Pondering is switched
+    off from hot_temp on.
+
+    temp_source and load_source are plain callables, so the policy can be fed
+    recorded or synthetic values on any machine.
+    """
+    def __init__(self, temp_source=read_cpu_temp, load_source=read_cpu_load,
+                 max_threads=None, max_hash=64, min_hash=16,
+                 warm_temp=65.0, hot_temp=75.0, critical_temp=80.0,
+                 busy_load=85.0, min_interval=2.0):
+        """
+        :param temp_source: Callable returning degrees Celsius (or None if unknown)
+        :param load_source: Callable returning CPU load in percent (or None if unknown)
+        :param max_threads: Engine threads when cool and idle (default: all cores but one)
+        :param max_hash: Hash in MB when cool
+        :param min_hash: Hash in MB when hot (never more than max_hash)
+        :param warm_temp: From here one thread is given up
+        :param hot_temp: From here threads are halved and searches shortened
+        :param critical_temp: From here the engine runs single-threaded at half time
+        :param busy_load: CPU load (%) above which one thread is given up
+        :param min_interval: Seconds a decision is reused before the sources are read again
+        """
+        self.temp_source = temp_source
+        self.load_source = load_source
+        self.max_threads = max_threads or max(1, (os.cpu_count() or 1) - 1)
+        self.max_hash = max_hash
+        self.min_hash = min(min_hash, max_hash)
+        self.warm_temp = warm_temp
+        self.hot_temp = hot_temp
+        self.critical_temp = critical_temp
+        self.busy_load = busy_load
+        self.min_interval = min_interval
+
+        self._activity = {}
+        self._lock = threading.Lock()
+        self._decision = None
+        self._decided_at = 0.0
+        self.history = []   # (timestamp, decision) for every change
+
+    # ---------------- Activity flags ----------------
+
+    def set_activity(self, name, active):
+        """Mark a subsystem ('vision', 'arm', ...) as busy or idle."""
+        with self._lock:
+            count = self._activity.get(name, 0) + (1 if active else -1)
+            self._activity[name] = max(0, count)
+            self._decided_at = 0.0  # Re-evaluate on the next decide()
+
+    @contextmanager
+    def activity(self, name):
+        """with governor.activity("arm"): ... marks the subsystem busy for the block."""
+        self.set_activity(name, True)
+        try:
+            yield
+        finally:
+            self.set_activity(name, False)
+
+    def active(self):
+        with self._lock:
+            return sorted(name for name, count in self._activity.items() if count > 0)
+
+    # ---------------- Policy ----------------
+
+    def _read(self, source):
+        try:
+            return source()
+        except Exception as e:
+            logger.warning(f"Governor source failed: {e}")
+            return None
+
+    def decide(self, force=False):
+        """
+        :return: dict with 'threads', 'hash', 'limit_scale', 'ponder', 'temp', 'load', 'active', 'reasons'
+        """
+        now = time.monotonic()
+        if not force and self._decision is not None and now - self._decided_at < self.min_interval:
+            return self._decision
+
+        temp = self._read(self.temp_source)
+        load = self._read(self.load_source)
+        active = self.active()
+
+        threads, hash_mb, scale, ponder = self.max_threads, self.max_hash, 1.0, True
+        reasons = []
+
+        if temp is not None:
+            if temp >= self.critical_temp:
+                threads, hash_mb, scale, ponder = 1, self.min_hash, 0.5, False
+                reasons.append(f"critical {temp:.1f}C")
+            elif temp >= self.hot_temp:
+                threads, hash_mb, scale, ponder = max(1, self.max_threads // 2), self.min_hash, 0.75, False
+                reasons.append(f"hot {temp:.1f}C")
+            elif temp >= self.warm_temp:
+                threads = max(1, threads - 1)
+                reasons.append(f"warm {temp:.1f}C")
+
+        if load is not None and load >= self.busy_load:
+            threads = max(1, min(threads, self.max_threads - 1))
+            reasons.append(f"load {load:.0f}%")
+
+        # Leave a core to every subsystem that is working right now
+        for name in active:
+            threads = max(1, threads - 1)
+            reasons.append(f"{name} active")
+
+        decision = {"threads": threads, "hash": hash_mb, "limit_scale": scale, "ponder": ponder,
+                    "temp": temp, "load": load, "active": active, "reasons": reasons}
+
+        previous = self._decision
+        if previous is None or any(previous[k] != decision[k] for k in ("threads", "hash", "limit_scale", "ponder")):
+            logger.info(f"Governor: Threads={threads}, Hash={hash_mb}MB, time x{scale}"
+                        f"{'' if ponder else ', ponder off'} ({', '.join(reasons) or 'nominal'})")
+            self.history.append((time.time(), decision))
+
+        self._decision = decision
+        self._decided_at = now
+        return decision
+
+    def engine_options(self, force=False):
+        """UCI options for the current decision."""
+        decision = self.decide(force)
+        return {"Threads": decision["threads"], "Hash": decision["hash"]}
+
+    def scale_limit(self, limit):
+        """Shorten a chess.engine.Limit's time according to the current decision."""
+        scale = self.decide()["limit_scale"]
+        if limit.time is not None and scale != 1.0:
+            limit.time = round(limit.time * scale, 3)
+        return limit
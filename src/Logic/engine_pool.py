@@ -0,0 +1,310 @@
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import InvalidStateError
+import chess
+import chess.engine
+from Logic.chess_engine import ZoraChessEngine, SearchHandle, settings_key
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PooledSearch(SearchHandle):
+    """
+    SearchHandle for a search submitted to the EnginePool. It resolves once a
+    pool engine has finished it; stop() and cancel() work both while the
+    search is still queued and while it is running.
+    """
+    def __init__(self, board, limit, client, info_callback=None, preemptible=False):
+        super().__init__(board, info_callback=info_callback)
+        self.limit = limit
+        self.client = client
+        self.preemptible = preemptible
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.attempts = 0
+        self._inner = None
+        self._stop_requested = False
+        self._lock = threading.Lock()
+
+    def _attach(self, inner):
+        """Called by the pool worker once the engine has accepted the search."""
+        with self._lock:
+            self._inner = inner
+            self.info = inner.info
+            stop_requested = self._stop_requested
+        if self.cancelled():
+            inner.cancel()
+        elif stop_requested:
+            inner.stop()
+
+    def stop(self):
+        with self._lock:
+            self._stop_requested = True
+            inner = self._inner
+        if inner is not None and not self.done():
+            inner.stop()
+
+    def cancel(self):
+        if self.done():
+            return False
+        cancelled = self._future.cancel()
+        with self._lock:
+            inner = self._inner
+        if inner is not None:
+            inner.cancel()
+        return cancelled
+
+
+class EnginePool:
+    """
+    N Stockfish processes shared by any number of clients (logic managers,
+    analysis tools, a second board). Every engine is owned by one worker
+    thread; queued searches are handed out round-robin per client so one busy
+    client cannot starve the others. Crashed engines are restarted and the
+    interrupted search is retried once.
+
+    Total engine threads are capped at the CPU count minus reserved_cores and
+    the processes run niced, so vision and servo threads keep their CPU time.
+    """
+    def __init__(self, size=2, engine_path=None, threads=1, hash_mb=32, skill_level=8,
+                 reserved_cores=1, nice=10, health_interval=10.0, max_retries=1):
+        """
+        :param size: Number of engine processes
+        :param engine_path: Stockfish binary (default: Raspberry Pi OS package path)
+        :param threads: UCI Threads per engine (reduced if the CPU cap is exceeded)
+        :param hash_mb: UCI Hash per engine in MB
+        :param skill_level: UCI Skill Level for all engines
+        :param reserved_cores: Cores kept free for vision, servo and UI threads
+        :param nice: Niceness increment of the engine processes (None = unchanged)
+        :param health_interval: Seconds between pings of an idle engine
+        :param max_retries: How often a search interrupted by a crash is retried
+        """
+        budget = max(1, (os.cpu_count() or 1) - reserved_cores)
+        if size > budget:
+            logger.warning(f"Engine pool of {size} exceeds the CPU budget, using {budget} engines.")
+            size = budget
+        if size * threads > budget:
+            threads = max(1, budget // size)
+            logger.warning(f"Engine threads capped to {threads} per engine ({budget} cores available).")
+
+        self.size = size
+        self.max_threads = threads
+        self.options = {"Skill Level": skill_level, "Threads": threads, "Hash": hash_mb}
+        self.health_interval = health_interval
+        self.max_retries = max_retries
+
+        self.engines = [ZoraChessEngine(engine_path, options=self.options, nice=nice) for _ in range(size)]
+        self.running = [None] * size   # Search currently running on each engine
+
+        self._queues = OrderedDict()   # client -> deque of PooledSearch
+        self._cond = threading.Condition()
+        self._workers = []
+        self._shutdown = False
+
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0,
+                      "restarts": 0, "preempted": 0, "queue_wait": 0.0}
+
+    def start(self):
+        """Start all engine processes and their worker threads."""
+        if self._workers:
+            return
+        self._shutdown = False
+        for slot, engine in enumerate(self.engines):
+            engine.start()
+            worker = threading.Thread(target=self._worker, args=(slot,), name=f"EnginePool-{slot}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"Engine pool started: {self.size} engines with {self.options}")
+
+    def settings_key(self, limit=1.0):
+        """Cache key of the pool's search settings (same format as ZoraChessEngine)."""
+        return settings_key(self.options, limit)
+
+    def set_options(self, options):
+        """
+        Change engine options for all engines; each engine picks them up before
+        its next search. Threads stay within the pool's CPU budget.
+        """
+        options = dict(options)
+        if "Threads" in options:
+            options["Threads"] = max(1, min(options["Threads"], self.max_threads))
+        merged = dict(self.options)
+        merged.update(options)
+        self.options = merged
+
+    def submit_search(self, fen_or_board, time_limit=1.0, limit=None, info_callback=None,
+                      client="default", preemptible=False):
+        """
+        Queue a search and return immediately.
+        :param fen_or_board: FEN string or chess.Board of the position
+        :param time_limit: Thinking time in seconds (ignored if limit is given)
+        :param limit: Optional chess.engine.Limit
+        :param info_callback: Optional callable(info_dict) for streaming search info
+        :param client: Scheduling key; searches of different clients are interleaved fairly
+        :param preemptible: Background search (e.g. pondering) that is stopped early
+                            when other work is waiting and no engine is free
+        :return: PooledSearch resolving to the best move in UCI format
+        """
+        board = fen_or_board if isinstance(fen_or_board, chess.Board) else chess.Board(fen_or_board)
+        if limit is None:
+            limit = chess.engine.Limit(time=time_limit)
+
+        job = PooledSearch(board, limit, client, info_callback=info_callback, preemptible=preemptible)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Engine pool is shut down.")
+            self._queues.setdefault(client, deque()).append(job)
+            self.stats["submitted"] += 1
+            self._preempt_locked()
+            self._cond.notify()
+        return job
+
+    def _preempt_locked(self):
+        """If every engine is busy, stop the oldest preemptible search to free one."""
+        if None in self.running:
+            return
+        candidates = [job for job in self.running if job.preemptible and not job._stop_requested]
+        if candidates:
+            job = min(candidates, key=lambda j: j.started_at)
+            job.stop()
+            self.stats["preempted"] += 1
+            logger.debug(f"Preempted background search of client {job.client}")
+
+    def _next_job_locked(self):
+        """Round-robin over clients: take the head of the first non-empty queue, then rotate."""
+        for client in list(self._queues):
+            queue = self._queues[client]
+            self._queues.move_to_end(client)
+            while queue:
+                job = queue.popleft()
+                if not job.cancelled():
+                    return job
+                self.stats["cancelled"] += 1
+            del self._queues[client]
+        return None
+
+    def _worker(self, slot):
+        engine = self.engines[slot]
+        while True:
+            with self._cond:
+                job = self._next_job_locked()
+                while job is None and not self._shutdown:
+                    if not self._cond.wait(timeout=self.health_interval):
+                        break
+                    job = self._next_job_locked()
+                if self._shutdown:
+                    return
+                if job is not None:
+                    job.started_at = time.monotonic()
+                    self.running[slot] = job
+
+            if job is None:
+                # Idle timeout: health check
+                if not engine.is_alive():
+                    self._restart(slot)
+                continue
+
+            try:
+                self._run(slot, job)
+            finally:
+                with self._cond:
+                    self.running[slot] = None
+                    if any(self._queues.values()):
+                        self._preempt_locked()
+
+    def _count(self, key, value=1):
+        with self._cond:
+            self.stats[key] += value
+
+    def _resolve(self, job, uci=None, error=None):
+        """Hand the outcome to the caller; a no-op if the search was cancelled meanwhile."""
+        try:
+            if error is None:
+                job._future.set_result(uci)
+            else:
+                job._future.set_exception(error)
+        except InvalidStateError:
+            return False
+        return True
+
+    def _run(self, slot, job):
+        engine = self.engines[slot]
+        self._count("queue_wait", job.started_at - job.submitted_at)
+        try:
+            if not engine.engine:
+                self._restart(slot)
+            engine.set_options(self.options)
+            inner = engine.start_search(job.board, limit=job.limit, info_callback=job._info_callback)
+            job._attach(inner)
+            uci = inner.result()
+            job.ponder_move = inner.ponder_move
+            self._count("completed" if self._resolve(job, uci) else "cancelled")
+        except chess.engine.EngineTerminatedError as e:
+            logger.error(f"Engine {slot} terminated during search: {e}")
+            self._restart(slot)
+            self._retry(job, e)
+        except Exception as e:
+            if job.cancelled():
+                self._count("cancelled")
+                return
+            logger.error(f"Search on engine {slot} failed: {e}")
+            self._count("failed")
+            self._resolve(job, error=e)
+
+    def _retry(self, job, error):
+        job.attempts += 1
+        if job.attempts > self.max_retries or job.cancelled():
+            self._count("failed")
+            self._resolve(job, error=error)
+            return
+        with self._cond:
+            # Back to the front of its client's queue, it already waited its turn
+            job._inner = None
+            self._queues.setdefault(job.client, deque()).appendleft(job)
+            self._cond.notify()
+
+    def _restart(self, slot):
+        engine = self.engines[slot]
+        logger.warning(f"Restarting engine {slot}")
+        engine.quit()
+        try:
+            engine.start()
+            self._count("restarts")
+        except Exception as e:
+            logger.error(f"Engine {slot} failed to restart: {e}")
+
+    def pending(self):
+        """Number of queued (not yet started) searches."""
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats["busy"] = sum(job is not None for job in self.running)
+            stats["pending"] = sum(len(q) for q in self._queues.values())
+        started = stats["completed"] + stats["failed"]
+        stats["avg_queue_wait"] = stats["queue_wait"] / started if started else 0.0
+        return stats
+
+    def shutdown(self):
+        """Cancel queued searches, stop running ones and quit all engines."""
+        with self._cond:
+            self._shutdown = True
+            for queue in self._queues.values():
+                for job in queue:
+                    job.cancel()
+            self._queues.clear()
+            running = [job for job in self.running if job is not None]
+            self._cond.notify_all()
+        for job in running:
+            job.cancel()
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+        self._workers = []
+        for engine in self.engines:
+            engine.quit()
+        logger.info("Engine pool stopped.")
@@ -0,0 +1,111 @@
+import os
+import time
+import chess
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+# One record per line, fsync'd before the call returns:
+#   S <robot_color> <fen>      new game (truncates the journal)
+#   H <uci>                    human move accepted by the logic
+#   R <uci>                    robot move applied to the logic, arm about to move
+#   A <captured_count>         arm finished the last robot move
+#   E <result>                 game over
+# A line without its trailing newline was cut off by a crash and is ignored.
+
+
+class GameJournal:
+    """
+    Append-only write-ahead log of the running game, so a crash or reboot
+    can resume from the last move instead of resetting the pieces.
+    """
+    def __init__(self, path="cache/game_journal.log"):
+        self.path = path
+        journal_dir = os.path.dirname(path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        self._file = None
+
+    def _drop_torn_tail(self):
+        """Cut a partial last record so new records start on a fresh line."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _append(self, line):
+        if self._file is None:
+            self._drop_torn_tail()
+            self._file = open(self.path, "a", encoding="ascii")
+        self._file.write(line + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def start_game(self, robot_color, fen=chess.STARTING_FEN):
+        """Begin a new journal; the previous game is discarded."""
+        self.close()
+        self._file = open(self.path, "w", encoding="ascii")
+        self._append(f"S {robot_color} {fen}")
+
+    def record_human(self, uci):
+        self._append(f"H {uci}")
+
+    def record_robot(self, uci):
+        self._append(f"R {uci}")
+
+    def record_arm_done(self, captured_count):
+        self._append(f"A {captured_count}")
+
+    def record_end(self, result):
+        self._append(f"E {result}")
+
+    def replay(self):
+        """
+        Read the journal back.
+        :return: dict with 'robot_color', 'fen', 'moves' [(side, uci)], 'captured_count',
+                 'arm_pending' (robot move logged but arm not confirmed) and 'result',
+                 or None if there is no game to resume
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        t0 = time.perf_counter()
+        with open(self.path, "r", encoding="ascii", errors="replace") as f:
+            data = f.read()
+
+        lines = data.split("\n")
+        if lines and lines[-1]:
+            logger.warning(f"Journal ends with a torn record, ignoring: {lines[-1]!r}")
+        lines = lines[:-1]
+
+        state = None
+        for line in lines:
+            kind, _, arg = line.partition(" ")
+            if kind == "S":
+                color, _, fen = arg.partition(" ")
+                state = {"robot_color": color, "fen": fen, "moves": [], "captured_count": 0,
+                         "arm_pending": False, "result": None}
+            elif state is None:
+                continue
+            elif kind == "H":
+                state["moves"].append(("human", arg))
+            elif kind == "R":
+                state["moves"].append(("robot", arg))
+                state["arm_pending"] = True
+            elif kind == "A":
+                state["captured_count"] = int(arg)
+                state["arm_pending"] = False
+            elif kind == "E":
+                state["result"] = arg
+
+        if state is not None:
+            elapsed = (time.perf_counter() - t0) * 1000
+            logger.info(f"Journal replayed: {len(state['moves'])} moves in {elapsed:.1f} ms")
+        return state
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,154 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+import chess
+import chess.polyglot
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PositionCache:
+    """
+    Move cache consulted before the engine is asked to search.
+    Lookup order: Polyglot opening book (optional) -> in-memory LRU -> on-disk
+    SQLite store. Positions are keyed by their Zobrist hash, which already
+    ignores move counters, plus a settings key so results from different
+    engine strengths never mix.
+    """
+    def __init__(self, db_path="cache/positions.sqlite", capacity=4096, book_path=None,
+                 max_age=None, randomness=0.0, book_mode="weighted", seed=None):
+        """
+        :param db_path: SQLite file for persistent entries (None = memory only)
+        :param capacity: Max entries kept in the in-memory LRU
+        :param book_path: Optional Polyglot .bin opening book
+        :param max_age: Entries older than this many seconds are searched again (None = never expire)
+        :param randomness: Probability of ignoring book and cache and searching fresh
+        :param book_mode: "weighted" picks book moves by weight, "best" always the heaviest
+        :param seed: Random seed, for reproducible games in tests
+        """
+        self.capacity = capacity
+        self.max_age = max_age
+        self.randomness = randomness
+        self.book_mode = book_mode
+        self.rng = random.Random(seed)
+
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"book": 0, "memory": 0, "disk": 0, "miss": 0, "skipped": 0, "stored": 0}
+
+        self.db = None
+        if db_path:
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS positions ("
+                "key TEXT, settings TEXT, move TEXT, created REAL, "
+                "PRIMARY KEY (key, settings))"
+            )
+            self.db.commit()
+
+        self.book = None
+        if book_path:
+            if os.path.exists(book_path):
+                self.book = chess.polyglot.open_reader(book_path)
+                logger.info(f"Opening book loaded: {book_path}")
+            else:
+                logger.warning(f"Opening book not found: {book_path}")
+
+    @staticmethod
+    def position_key(board):
+        """Normalized position key (Zobrist hash as 16 hex digits)."""
+        return f"{chess.polyglot.zobrist_hash(board):016x}"
+
+    def _probe_book(self, board):
+        if self.book is None:
+            return None
+        try:
+            if self.book_mode == "best":
+                entry = self.book.find(board)
+            else:
+                entry = self.book.weighted_choice(board, random=self.rng)
+        except IndexError:
+            return None
+        return entry.move.uci()
+
+    def _is_fresh(self, created):
+        return self.max_age is None or (time.time() - created) <= self.max_age
+
+    def lookup(self, board, settings=""):
+        """
+        :return: Move in UCI format, or None if the engine has to search
+        """
+        # Checked first, so book lines vary as well and not only cached replies
+        if self.randomness > 0 and self.rng.random() < self.randomness:
+            self.stats["skipped"] += 1
+            return None
+
+        book_move = self._probe_book(board)
+        if book_move is not None:
+            self.stats["book"] += 1
+            return book_move
+
+        key = (self.position_key(board), settings)
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and self._is_fresh(entry[1]):
+                self.memory.move_to_end(key)
+                self.stats["memory"] += 1
+                return entry[0]
+
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT move, created FROM positions WHERE key = ? AND settings = ?", key
+                ).fetchone()
+                if row is not None and self._is_fresh(row[1]):
+                    self._remember(key, row[0], row[1])
+                    self.stats["disk"] += 1
+                    return row[0]
+
+            self.stats["miss"] += 1
+            return None
+
+    def _remember(self, key, uci, created):
+        self.memory[key] = (uci, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def store(self, board, uci, settings=""):
+        """Remember the engine's move for this position."""
+        if uci is None:
+            return
+        key = (self.position_key(board), settings)
+        created = time.time()
+        with self.lock:
+            self._remember(key, uci, created)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO positions (key, settings, move, created) VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], uci, created)
+                )
+                self.db.commit()
+            self.stats["stored"] += 1
+
+    def get_stats(self):
+        """Hit counters plus overall hit rate over all lookups."""
+        stats = dict(self.stats)
+        hits = stats["book"] + stats["memory"] + stats["disk"]
+        lookups = hits + stats["miss"] + stats["skipped"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+        if self.db is not None:
+            self.db.close()
+            self.db = None
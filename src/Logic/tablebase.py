@@ -0,0 +1,108 @@
+import os
+import time
+import chess
+import chess.syzygy
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TablebaseProber:
+    """
+    Perfect endgame moves from local Syzygy tables. The tablebase stays open
+    for the whole game; without tables every probe is a cheap miss and the
+    engine searches as usual.
+    """
+    def __init__(self, path="syzygy", max_pieces=5):
+        """
+        :param path: Folder with .rtbw/.rtbz files (several folders separated by os.pathsep)
+        :param max_pieces: Only positions with at most this many pieces are probed
+        """
+        self.path = path
+        self.max_pieces = max_pieces
+        self.tablebase = None
+        self.stats = {"hits": 0, "misses": 0, "skipped": 0, "probe_time": 0.0}
+
+        if path:
+            self._open(path)
+
+    def _open(self, path):
+        tablebase = chess.syzygy.Tablebase()
+        loaded = 0
+        for directory in path.split(os.pathsep):
+            if os.path.isdir(directory):
+                loaded += tablebase.add_directory(directory)
+        if loaded == 0:
+            tablebase.close()
+            logger.info(f"No Syzygy tables found in {path}, tablebase probing disabled.")
+            return
+        self.tablebase = tablebase
+        logger.info(f"Syzygy tablebase opened: {loaded} tables from {path}")
+
+    def is_available(self):
+        return self.tablebase is not None
+
+    def applies_to(self, board):
+        """Cheap pre-check: few enough pieces and no castling rights (not covered by Syzygy)."""
+        return (self.tablebase is not None
+                and chess.popcount(board.occupied) <= self.max_pieces
+                and not board.castling_rights)
+
+    def _rank_move(self, board, move):
+        """
+        Sort key for a root move: checkmate first, then the best WDL for the mover.
+        Winning: zeroing moves and the shortest DTZ. Losing: the longest DTZ.
+        """
+        board.push(move)
+        try:
+            if board.is_checkmate():
+                return (3, 0, 0)
+            wdl = -self.tablebase.probe_wdl(board)
+            dtz = self.tablebase.probe_dtz(board)
+            zeroing = int(board.halfmove_clock == 0)
+        finally:
+            board.pop()
+
+        if wdl > 0:
+            # Opponent's DTZ is negative; closer to zero wins faster
+            return (wdl, zeroing, dtz)
+        if wdl < 0:
+            # Opponent's DTZ is positive; a larger value resists longer
+            return (wdl, 0, dtz)
+        return (0, 0, 0)
+
+    def probe(self, board):
+        """
+        :return: Best move in UCI format, or None if the position is not covered
+        """
+        if not self.applies_to(board):
+            self.stats["skipped"] += 1
+            return None
+
+        t0 = time.perf_counter()
+        work = board.copy(stack=False)
+        try:
+            best = max(work.legal_moves, key=lambda m: self._rank_move(work, m), default=None)
+        except KeyError:
+            # chess.syzygy.MissingTableError: table for this material not installed
+            best = None
+        self.stats["probe_time"] += time.perf_counter() - t0
+
+        if best is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return best.uci()
+
+    def get_stats(self):
+        """Hit counts and average probe latency in milliseconds."""
+        stats = dict(self.stats)
+        probes = stats["hits"] + stats["misses"]
+        stats["avg_probe_ms"] = 1000.0 * stats["probe_time"] / probes if probes else 0.0
+        stats["available"] = self.is_available()
+        return stats
+
+    def close(self):
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
@@ -0,0 +1,164 @@
+import time
+import chess
+import chess.engine
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+# Non-pawn material (in pawns) at or below which the position counts as an endgame
+ENDGAME_MATERIAL = 13
+PIECE_VALUES = {chess.KNIGHT: 3, chess.BISHOP: 3, chess.ROOK: 5, chess.QUEEN: 9}
+
+
+class TimeManager:
+    """
+    Decides how long the engine may think for each robot move.
+
+    Without a game clock every move gets about default_time, scaled by game
+    phase and position complexity. With a clock (base + increment) the budget
+    is taken from the robot's remaining time, minus the time the arm needs to
+    play the move physically (learned from earlier turns). A move with only
+    one legal reply is played without searching.
+    """
+    def __init__(self, default_time=1.0, min_time=0.1, max_time=4.0,
+                 base_time=None, increment=0.0, moves_to_go=30, latency_budget=0.0,
+                 opening_moves=8, phase_factors=None, depth_caps=None, nodes_cap=None):
+        """
+        :param default_time: Nominal search time in seconds when no clock is running
+        :param min_time: Lower bound of a single search
+        :param max_time: Upper bound of a single search
+        :param base_time: Robot's clock in seconds (None = no clock)
+        :param increment: Seconds added to the robot's clock after every move
+        :param moves_to_go: Moves the remaining clock time is spread over
+        :param latency_budget: Initial estimate of the physical move time in seconds
+        :param opening_moves: Full moves treated as opening
+        :param phase_factors: Time multipliers per phase ("opening", "middlegame", "endgame")
+        :param depth_caps: Optional depth limit per phase
+        :param nodes_cap: Optional node limit for every search
+        """
+        self.default_time = default_time
+        self.min_time = min_time
+        self.max_time = max_time
+        self.moves_to_go = moves_to_go
+        self.latency_budget = latency_budget
+        self.opening_moves = opening_moves
+        # Balanced so an untimed game averages below default_time: only middlegames
+        # with more than ~37 legal moves get more than default_time (at most 1.2x)
+        self.phase_factors = phase_factors or {"opening": 0.4, "middlegame": 0.8, "endgame": 0.6}
+        self.depth_caps = depth_caps or {"opening": 14, "middlegame": None, "endgame": None}
+        self.nodes_cap = nodes_cap
+
+        self.base_time = None
+        self.increment = 0.0
+        self.remaining = None
+        self.set_clock(base_time, increment)
+
+        self._turn_started = None
+        self._search_finished = None
+        self.stats = {"turns": 0, "forced": 0, "allocated": 0.0, "response": 0.0}
+
+    def set_clock(self, base_time, increment=0.0):
+        """Start a new clock for the robot (base_time None = untimed game)."""
+        self.base_time = base_time
+        self.increment = increment
+        self.remaining = base_time
+
+    def reset(self):
+        self.set_clock(self.base_time, self.increment)
+        self._turn_started = None
+        self._search_finished = None
+
+    def phase(self, board):
+        """'opening', 'middlegame' or 'endgame' from move number and material."""
+        material = sum(PIECE_VALUES.get(p.piece_type, 0) for p in board.piece_map().values())
+        if material <= ENDGAME_MATERIAL:
+            return "endgame"
+        if board.fullmove_number <= self.opening_moves:
+            return "opening"
+        return "middlegame"
+
+    @staticmethod
+    def forced_move(board):
+        """The only legal move, or None if the engine has a real choice."""
+        moves = list(board.legal_moves)
+        return moves[0] if len(moves) == 1 else None
+
+    def allocate(self, board):
+        """
+        Search limit for the side to move.
+        :return: (chess.engine.Limit, phase name)
+        """
+        phase = self.phase(board)
+        n_moves = board.legal_moves.count()
+
+        if self.remaining is None:
+            budget = self.default_time
+        else:
+            # Spread what is left over the remaining moves; the arm's move time is charged too
+            available = max(0.0, self.remaining - self.latency_budget)
+            budget = available / self.moves_to_go + 0.8 * self.increment
+            # Never bet more than a quarter of the clock on one move
+            budget = min(budget, 0.25 * available)
+
+        # More candidate moves need a wider search; answering a check has few
+        # real options, so it never gets more than 0.8 of the budget
+        complexity = min(1.5, max(0.6, n_moves / 30.0))
+        if board.is_check():
+            complexity = min(complexity, 0.8)
+
+        seconds = budget * self.phase_factors.get(phase, 1.0) * complexity
+        seconds = min(self.max_time, max(self.min_time, seconds))
+        if self.remaining is not None:
+            seconds = min(seconds, max(0.01, self.remaining - self.latency_budget))
+
+        limit = chess.engine.Limit(time=round(seconds, 3), depth=self.depth_caps.get(phase),
+                                   nodes=self.nodes_cap)
+        self.stats["allocated"] += seconds
+        logger.debug(f"Time allocation: {seconds:.2f}s ({phase}, {n_moves} moves)")
+        return limit, phase
+
+    # ---------------- Clock bookkeeping ----------------
+
+    def start_turn(self):
+        """The robot's clock starts running (human move has been registered)."""
+        self._turn_started = time.monotonic()
+        self._search_finished = None
+
+    def search_done(self):
+        """The engine has committed to a move; physical execution starts now."""
+        if self._turn_started is not None and self._search_finished is None:
+            self._search_finished = time.monotonic()
+
+    def end_turn(self, forced=False):
+        """
+        The robot's move is complete on the board. Charges the clock and updates the
+        latency estimate with how long the arm took.
+        :return: Total response time of this turn in seconds
+        """
+        if self._turn_started is None:
+            return 0.0
+        now = time.monotonic()
+        elapsed = now - self._turn_started
+        if self._search_finished is not None:
+            physical = now - self._search_finished
+            self.latency_budget = physical if self.stats["turns"] == 0 else 0.7 * self.latency_budget + 0.3 * physical
+
+        if self.remaining is not None:
+            self.remaining = self.remaining - elapsed + self.increment
+            if self.remaining <= 0:
+                logger.warning("Robot clock has run out.")
+
+        self.stats["turns"] += 1
+        self.stats["forced"] += int(forced)
+        self.stats["response"] += elapsed
+        self._turn_started = None
+        self._search_finished = None
+        return elapsed
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        turns = stats["turns"]
+        stats["avg_response"] = stats["response"] / turns if turns else 0.0
+        stats["latency_budget"] = self.latency_budget
+        stats["remaining"] = self.remaining
+        return stats
@@ -0,0 +1,163 @@
+import time
+import chess
+
+# Matrix layouts:
+#   "logic"  - ChessLogicManager.get_board_matrix(): row 0 = rank 8, col 0 = file a
+#   "vision" - ChessBoardDetector / VisionSystem:    row 0 = file H, col 0 = rank 8
+LAYOUTS = ("logic", "vision")
+
+
+def cell_square(r, c, layout="logic"):
+    """Square of matrix cell (r, c) in the given layout."""
+    if layout == "logic":
+        return chess.square(c, 7 - r)
+    if layout == "vision":
+        return chess.square(7 - r, 7 - c)
+    raise ValueError(f"Unknown matrix layout: {layout}")
+
+
+def matrix_to_masks(matrix, layout="logic"):
+    """
+    Convert an 8x8 matrix to bitboards.
+    Cells may be piece symbols ('P', 'n', ...) in the logic layout, colour codes
+    ('W', 'B', '.') in the vision layout, or plain occupancy values (True/False, 1/0).
+    :return: (occupied, white, black); white/black are None for occupancy-only matrices
+    """
+    occupied = white = black = 0
+    colored = False
+    for r in range(8):
+        for c in range(8):
+            cell = matrix[r][c]
+            if isinstance(cell, str):
+                if cell in (".", "", " "):
+                    continue
+                colored = True
+                bit = chess.BB_SQUARES[cell_square(r, c, layout)]
+                # The detector reports colours ('W'/'B'), the logic matrix piece symbols
+                is_white = cell.upper() == "W" if layout == "vision" else cell.isupper()
+                if is_white:
+                    white |= bit
+                else:
+                    black |= bit
+                occupied |= bit
+            elif cell:
+                occupied |= chess.BB_SQUARES[cell_square(r, c, layout)]
+    if not colored:
+        return occupied, None, None
+    return occupied, white, black
+
+
+class TransitionIndex:
+    """
+    All legal moves of one position, indexed by how they change the board's
+    bitboards. Built once per position (one push/pop per legal move, no FEN
+    rendering); afterwards matching an observed board is a dict lookup.
+    Keys are XOR deltas against the position before the move:
+      - (white delta, black delta) for colour-aware observations
+      - occupancy delta for occupancy-only observations
+    """
+    def __init__(self, board):
+        self.board = board.copy(stack=False)
+        self.white = board.occupied_co[chess.WHITE]
+        self.black = board.occupied_co[chess.BLACK]
+        self.occupied = board.occupied
+
+        self.by_colors = {}
+        self.by_occupancy = {}
+        work = self.board.copy(stack=False)
+        for move in work.legal_moves:
+            work.push(move)
+            color_key = (self.white ^ work.occupied_co[chess.WHITE], self.black ^ work.occupied_co[chess.BLACK])
+            occ_key = self.occupied ^ work.occupied
+            work.pop()
+            self.by_colors.setdefault(color_key, []).append(move)
+            self.by_occupancy.setdefault(occ_key, []).append(move)
+
+    def lookup_masks(self, occupied, white=None, black=None):
+        """
+        Legal moves that produce the observed bitboards.
+        Colour masks are used when given; occupancy alone cannot tell a capture
+        from a move to an empty square, so it may return several moves.
+        """
+        if white is not None and black is not None:
+            return list(self.by_colors.get((self.white ^ white, self.black ^ black), ()))
+        return list(self.by_occupancy.get(self.occupied ^ occupied, ()))
+
+    def lookup_matrix(self, matrix, layout="vision"):
+        """Legal moves matching an 8x8 matrix in 'vision' or 'logic' layout."""
+        return self.lookup_masks(*matrix_to_masks(matrix, layout))
+
+    def find_board(self, board_after):
+        """
+        The legal move that turns this position into board_after's piece placement
+        (piece types are checked too, e.g. for under-promotions), or None.
+        """
+        candidates = self.lookup_masks(board_after.occupied,
+                                       board_after.occupied_co[chess.WHITE],
+                                       board_after.occupied_co[chess.BLACK])
+        if len(candidates) == 1 and not candidates[0].promotion:
+            return candidates[0]
+        target = board_after.board_fen()
+        for move in candidates:
+            work = self.board.copy(stack=False)
+            work.push(move)
+            if work.board_fen() == target:
+                return move
+        return None
+
+    def __len__(self):
+        return sum(len(moves) for moves in self.by_colors.values())
+
+
+def _fen_transition(prev_board, curr_board):
+    """Reference implementation: push every legal move and compare FEN placement."""
+    for move in prev_board.legal_moves:
+        prev_board.push(move)
+        if prev_board.fen().split(' ')[0] == curr_board.fen().split(' ')[0]:
+            prev_board.pop()
+            return move
+        prev_board.pop()
+    return None
+
+
+def benchmark(plies=60, repeats=20):
+    """Compare FEN-based and indexed transition checks over a played-out game."""
+    board = chess.Board()
+    pairs = []
+    while len(pairs) < plies and not board.is_game_over():
+        before = board.copy(stack=False)
+        # Deterministic, capture-happy game so the index sees captures and checks
+        moves = sorted(board.legal_moves, key=lambda m: (not board.is_capture(m), m.uci()))
+        board.push(moves[len(pairs) % len(moves)])
+        pairs.append((before, board.copy(stack=False)))
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for before, after in pairs:
+            _fen_transition(before, after)
+    t_fen = (time.perf_counter() - t0) / (repeats * len(pairs))
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for before, after in pairs:
+            TransitionIndex(before).find_board(after)
+    t_build = (time.perf_counter() - t0) / (repeats * len(pairs))
+
+    indexes = [(TransitionIndex(before), after) for before, after in pairs]
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for index, after in indexes:
+            index.find_board(after)
+    t_lookup = (time.perf_counter() - t0) / (repeats * len(pairs))
+
+    for (index, after), (before, _) in zip(indexes, pairs):
+        assert index.find_board(after) == _fen_transition(before, after)
+
+    print(f"Positions: {len(pairs)}, repeats: {repeats}")
+    print(f"FEN push/compare:      {t_fen * 1e6:8.1f} us per check")
+    print(f"Index build + lookup:  {t_build * 1e6:8.1f} us per check")
+    print(f"Lookup on built index: {t_lookup * 1e6:8.1f} us per check")
+
+
+if __name__ == "__main__":
+    benchmark()
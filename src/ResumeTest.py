@@ -0,0 +1,75 @@
+# Resume check: an interrupted game picked up on the human's turn must accept a vision move
+import os
+import sys
+import tempfile
+
+import coordinator
+from coordinator import GameCoordinator
+
+
+class FakeVision:
+    """
+    Stand-in for VisionSystem. A frame is the list of moves on the physical
+    board; get_move_uci reports the move that leads from the base frame to it.
+    """
+    moves = []      # Physical board, shared with the test
+
+    def __init__(self):
+        self.background_updates = 0
+
+    def capture_frame(self):
+        return list(FakeVision.moves)
+
+    def update_background(self, frame):
+        self.background_updates += 1
+
+    def get_move_uci(self, base_frame, frame):
+        if base_frame is None or len(frame) != len(base_frame) + 1 or frame[:-1] != base_frame:
+            return None
+        return frame[-1]
+
+    def close(self):
+        pass
+
+
+def resume_test():
+    failures = 0
+    journal = os.path.join(tempfile.mkdtemp(), "game_journal.log")
+    coordinator.VisionSystem = FakeVision
+
+    # 1. Play until it is the human's turn again, then "crash"
+    first = GameCoordinator(None, enable_vision=False, enable_arm=False, journal_path=journal)
+    first.begin_game("black")
+    first.handle_manual_move("e2e4")
+    robot_uci, _ = first.execute_robot_response()
+    first.close_all()
+    FakeVision.moves = ["e2e4", robot_uci]
+    print(f"Played e2e4 {robot_uci}, game interrupted.")
+
+    # 2. Resume with vision: the base frame must come from the resume itself
+    resumed = GameCoordinator(None, enable_vision=True, enable_arm=False, journal_path=journal)
+    vision = resumed.vision
+    try:
+        ok = resumed.resumed and resumed.logic.board.turn != resumed.logic.robot_color
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  resumed on the human's turn")
+
+        ok = resumed.base_frame is not None and vision.background_updates == 1
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  base frame captured and fed to the background model")
+
+        # 3. The human moves a piece on the board
+        FakeVision.moves.append("d2d4")
+        ok, result = resumed.handle_user_move_event()
+        ok = ok and result == "d2d4"
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  vision move after resume: {result}")
+    finally:
+        resumed.close_all()
+
+    print(f"\n{failures} failure(s)")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if resume_test() else 1)
@@ -1,6 +1,11 @@
 import time
+import numpy as np
 from ServoControl.ArmManager import ArmManager
+from ServoControl.Gripper import Gripper
 from ServoControl.BoardConfig import BoardManager
+from ServoControl.IKTable import IKTable
+from ServoControl.MotionCache import MotionCache, calibration_version
+from ServoControl.TurnPlanner import TurnPlanner
 from Utils.Logger import get_logger
 
 logger = get_logger(__name__)
@@ -10,29 +15,64 @@ class ArmAction:
     High-level controller to bridge UI/Logic with physical arm movements.
     Translates UCI moves (e.g., 'e2e4') into coordinated servo actions.
     """
-    def __init__(self, pca_channels):
+    def __init__(self, pca_channels, bus=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param pca_channels: The 'channels' attribute of a PCA9685 object (or SimPCA9685)
+        :param bus: Optional ServoBus for block writes per control tick
+        :param clock: Monotonic time source (a VirtualClock for offline benchmarks)
+        :param sleep: Sleep function matching the clock
+        """
         # Initialize the underlying manager with your PCA9685 channels
-        self.manager = ArmManager(pca_channels=pca_channels)
+        self.manager = ArmManager(pca_channels=pca_channels, clock=clock, sleep=sleep, bus=bus)
+        self.clock = clock
         self.board = BoardManager()
 
         # Consistent heights as per your requirements
         self.Z_SAFE = 5.0 # Height for safe travel
         self.Z_PICK = 2.0 # Height for gripping/releasing pieces
 
+        # Every square and capture slot at both heights is solved once here
+        self.ik_table = IKTable(self.board, heights=(self.Z_SAFE, self.Z_PICK))
+        self.manager.solve_ik = self.ik_table.solve
+
+        # Planned trajectories of the recurring motions; pick/place for every
+        # square and capture slot up front, transfers on first use
+        version = calibration_version(self.manager.config_path, self.board,
+                                      (self.Z_SAFE, self.Z_PICK), self.manager.control_rate)
+        self.motion_cache = MotionCache(self.manager.plan_segments, version,
+                                        rate_hz=self.manager.control_rate)
+        slots = list(self.board.coords_table.values()) + list(self.board.capture_coords)
+        self.motion_cache.warm([(kind, self._primitive_waypoints(kind, xy, xy))
+                                for xy in slots for kind in ("pick", "place")])
+
+        # Orders the pieces of a whole turn (captures, castling rook, ...)
+        self.turn_planner = TurnPlanner(self)
+
+        # Progress hook: called with (phase, planned seconds or None) as a motion
+        # advances; set by the MotionExecutor
+        self.on_phase = None
+
+    def _phase(self, name, planned=None):
+        if self.on_phase is not None:
+            self.on_phase(name, planned)
+
     def initialize(self):
         """Initializes servos and moves to 90-degree start position."""
         logger.info("Initializing arm to starting position...")
         self.manager.arm_init() #
 
-    def rest(self):
+    def rest(self, abort=None):
         """Moves arm out of vision range to allow clear board capture."""
         logger.info("Moving arm to rest position for camera capture...")
-        self.manager.arm_rest() #
+        self._phase("rest")
+        return self.manager.arm_rest(abort=abort) #
 
-    def execute_uci_move(self, uci, side="white"):
+    def execute_uci_move(self, uci, side="white", abort=None):
         """
         Processes a full UCI move (e.g., 'e2e4' or 'e2e4q').
         Handles piece removal if it's a capture move.
+        :param abort: Optional threading.Event; the arm stops at the next control tick
+        :return: True if the move was completed
         """
         start_sq = uci[:2]
         end_sq = uci[2:4]
@@ -43,22 +83,246 @@ class ArmAction:
 
         logger.info(f"Executing UCI Move: {uci} | Start: {start_coords} -> End: {end_coords}")
 
-        # 2. Basic Pick and Place Flow
-        # Move to start, pick up piece
-        self.manager.goto_coordinate(start_coords[0], start_coords[1], self.Z_SAFE)
-        self.manager.grip() # Uses internal z=2/z=5 logic
+        # 2. Pick and place along continuous straight-line paths
+        t0 = self.clock()
+        bus_before = self.manager.bus.get_stats() if self.manager.bus is not None else None
+        gripper_before = self.manager.gripper.get_stats()
+        if not self.transfer(start_coords, end_coords, abort=abort):
+            return False
+        self._report_travel(uci, start_coords, end_coords, self.clock() - t0)
+        self._report_gripper(uci, gripper_before)
+        if bus_before is not None:
+            self._report_bus_load(uci, bus_before)
+
+        # 3. Return to rest to clear vision range (the gripper closes on the way)
+        return self.rest(abort=abort) and self.manager.gripper.wait(abort)
+
+    def _primitive_waypoints(self, kind, start_coords, end_coords):
+        """
+        Via-points of a motion primitive:
+          pick     - descend onto the start square
+          transfer - lift from start, travel, descend onto end (also used for capture-bin drops)
+          link     - same path without a piece, from one released piece to the next pick
+          place    - lift from the end square after releasing
+        """
+        sx, sy = start_coords[0], start_coords[1]
+        ex, ey = end_coords[0], end_coords[1]
+        if kind == "pick":
+            return [(sx, sy, self.Z_SAFE), (sx, sy, self.Z_PICK)]
+        if kind == "place":
+            return [(ex, ey, self.Z_PICK), (ex, ey, self.Z_SAFE)]
+        return [(sx, sy, self.Z_PICK), (sx, sy, self.Z_SAFE), (ex, ey, self.Z_SAFE), (ex, ey, self.Z_PICK)]
+
+    def _run_primitive(self, kind, start_coords, end_coords, abort=None, cue=None):
+        waypoints = self._primitive_waypoints(kind, start_coords, end_coords)
+        segments = self.motion_cache.get(kind, waypoints)
+        self._phase(kind, sum(seg.duration for seg in segments))
+        return self.manager.run_segments(segments, waypoints[-1], abort=abort, cue=cue)
+
+    def _close_lead(self, segments):
+        """
+        Seconds before the end of a descent at which the jaws are within the
+        gripper's close_tolerance of the pick height. The descent is a vertical
+        line, so height is read as the joint-space fraction still to travel.
+        """
+        last = segments[-1]
+        fraction = self.manager.gripper.close_tolerance / (self.Z_SAFE - self.Z_PICK)
+        times = np.append(np.arange(0.0, last.duration, 1.0 / self.manager.control_rate), last.duration)
+        angles = np.asarray(last.sample(times))
+        span = np.abs(angles[-1] - angles[0]).max()
+        if span == 0:
+            return 0.0
+        outside = np.nonzero(np.abs(angles - angles[-1]).max(axis=1) > fraction * span)[0]
+        if len(outside) == 0:
+            return last.duration
+        return last.duration - times[outside[-1]]
+
+    def _wait_gripper(self, phase, abort=None):
+        gripper = self.manager.gripper
+        self._phase(phase, gripper.remaining())
+        return gripper.wait(abort)
+
+    def _primitive_time(self, kind, start_coords, end_coords):
+        segments = self.motion_cache.get(kind, self._primitive_waypoints(kind, start_coords, end_coords))
+        return sum(seg.duration for seg in segments)
+
+    def transfer(self, start_coords, end_coords, kind="transfer", abort=None):
+        """
+        Carry a piece from start to end (see _carry).
+        :return: False if a step failed or was aborted
+        """
+        return self._carry([(kind, start_coords, end_coords)], abort=abort)
+
+    def _carry(self, legs, abort=None):
+        """
+        Carry pieces along (kind, start_coords, end_coords) legs. Only the
+        gripper stops the arm: approach + descend, then per piece lift + travel
+        + descend as one blended path; between pieces the arm goes straight
+        from the released piece down to the next one, then lifts at the end.
+        All but the approach come from the motion cache.
+        The jaws open during the descent and start closing just above the
+        piece; the arm waits only for what is left of grip and release.
+        :return: False if a step failed or was aborted
+        """
+        gripper = self.manager.gripper
+        first = legs[0][1]
+
+        self._phase("approach")
+        if not self.manager.goto_coordinate(first[0], first[1], self.Z_SAFE, abort=abort):
+            return False
+        gripper.command("open", "open")
+        descent = ("pick", first, first)
+        for i, (kind, start_coords, end_coords) in enumerate(legs):
+            # The final descent of a link is the same vertical line as a pick
+            pick = self.motion_cache.get("pick", self._primitive_waypoints("pick", start_coords, start_coords))
+            grip_cue = (self._close_lead(pick), lambda: gripper.command("close", "grip"))
+            done = (self._run_primitive(*descent, abort, cue=grip_cue)
+                    and self._wait_gripper("grip", abort)
+                    and self._run_primitive(kind, start_coords, end_coords, abort))
+            if not done:
+                return False
+            gripper.command("open", "release")
+            if not self._wait_gripper("release", abort):
+                return False
+            if i + 1 < len(legs):
+                descent = ("link", end_coords, legs[i + 1][1])
 
-        # Move to end, release piece
-        self.manager.goto_coordinate(end_coords[0], end_coords[1], self.Z_SAFE)
-        self.manager.loose() # Uses internal z=2/z=5 logic
+        last = legs[-1][2]
+        if not self._run_primitive("place", last, last, abort):
+            return False
+        # Closing overlaps the next move; callers wait for it at the end
+        gripper.command("close", "close")
+        self.manager.current_angles[5] = gripper.angles["close"]
+        return True
 
-        # 3. Return to rest to clear vision range
-        self.rest()
+    def estimate_legs_time(self, legs, start_angles=None):
+        """
+        Planned duration of _carry(legs) followed by the return to rest.
+        :param start_angles: Absolute J1-J4 servo angles to start from (None = current pose)
+        :raises ValueError: if a point is unreachable
+        """
+        gripper = self.manager.gripper
+        first = legs[0][1]
+        total = self.manager.move_time(first[0], first[1], self.Z_SAFE, from_angles=start_angles)
+        descent = ("pick", first, first)
+        for i, (kind, start_coords, end_coords) in enumerate(legs):
+            pick = self.motion_cache.get("pick", self._primitive_waypoints("pick", start_coords, start_coords))
+            total += (self._primitive_time(*descent) + self._primitive_time(kind, start_coords, end_coords)
+                      + gripper.planned_dead_time(self._close_lead(pick)))
+            if i + 1 < len(legs):
+                descent = ("link", end_coords, legs[i + 1][1])
+        last = legs[-1][2]
+        total += self._primitive_time("place", last, last)
+        total += self.manager.rest_move_time(last[0], last[1], self.Z_SAFE)
+        return total
+
+    def execute_turn(self, plan, abort=None):
+        """
+        Execute a TurnPlan: all pieces of the move in the planned order, then
+        a single return to rest.
+        :return: True if the turn was completed
+        """
+        logger.info(f"Executing turn {plan.uci}: {', '.join(map(repr, plan.tasks))} "
+                    f"(planned {plan.duration:.2f}s)")
+        # Claim the capture-bin slots the plan assigned
+        for _ in range(plan.drops):
+            self.board.get_next_capture_slot()
+
+        t0 = self.clock()
+        gripper_before = self.manager.gripper.get_stats()
+        bus_before = self.manager.bus.get_stats() if self.manager.bus is not None else None
+        self.manager.control_loop.reset_stats()
+        if not self._carry(plan.legs, abort=abort):
+            return False
+        if not (self.rest(abort=abort) and self.manager.gripper.wait(abort)):
+            return False
+        logger.info(f"Turn {plan.uci} done in {self.clock() - t0:.2f}s (planned {plan.duration:.2f}s)")
+        self._report_gripper(plan.uci, gripper_before)
+        if bus_before is not None:
+            self._report_bus_load(plan.uci, bus_before)
+        self._report_control_loop(plan.uci)
+        for note in plan.notes:
+            logger.warning(note)
+        return True
+
+    def estimate_travel_time(self, start_coords, end_coords, kind="transfer"):
+        """
+        Planned time of one pick-and-place, from above the start square to
+        above the end square, without moving the arm.
+        :return: dict with 'point_to_point' (previous goto/grip/loose sequence, with
+                 its fixed pauses) and 'continuous' (transfer()) in seconds
+        """
+        gripper = self.manager.gripper
+        sx, sy = start_coords[0], start_coords[1]
+        ex, ey = end_coords[0], end_coords[1]
+        src_safe, src_pick = (sx, sy, self.Z_SAFE), (sx, sy, self.Z_PICK)
+        dst_safe, dst_pick = (ex, ey, self.Z_SAFE), (ex, ey, self.Z_PICK)
+
+        # grip: 4 pauses, loose: 3 pauses of 0.5s each
+        point_to_point = self.manager.joint_move_time(
+            [src_safe, src_pick, src_safe, dst_safe, dst_pick, dst_safe]) + 7 * 0.5
+        continuous = 0.0
+        for primitive, a, b in (("pick", start_coords, start_coords), (kind, start_coords, end_coords),
+                                ("place", end_coords, end_coords)):
+            segments = self.motion_cache.get(primitive, self._primitive_waypoints(primitive, a, b))
+            continuous += sum(seg.duration for seg in segments)
+            if primitive == "pick":
+                continuous += gripper.planned_dead_time(self._close_lead(segments))
+        return {"point_to_point": point_to_point, "continuous": continuous}
+
+    def estimate_move_time(self, uci, side="white", capture=False):
+        """
+        Planned duration of a full robot move from the rest pose and back,
+        including the capture-bin drop for captures (used as the motion ETA).
+        """
+        tasks = self.turn_planner.tasks_for_uci(uci, capture=capture)
+        return self.turn_planner.plan(tasks, side=side, uci=uci, from_rest=True).duration
+
+    def _report_travel(self, uci, start_coords, end_coords, elapsed, kind="transfer"):
+        try:
+            est = self.estimate_travel_time(start_coords, end_coords, kind)
+        except ValueError as e:
+            logger.warning(f"Travel time estimate for {uci} failed: {e}")
+            return
+        logger.info(f"Travel time {uci}: {elapsed:.2f}s measured | planned {est['continuous']:.2f}s "
+                    f"continuous vs {est['point_to_point']:.2f}s point-to-point")
+
+    def _report_gripper(self, uci, before):
+        after = self.manager.gripper.get_stats()
+        dead_time = after["dead_time"] - before["dead_time"]
+        logger.info(f"Gripper dead time {uci}: {dead_time:.2f}s "
+                    f"(fixed pauses before: {Gripper.legacy_dead_time():.2f}s)")
+
+    def _report_control_loop(self, uci):
+        stats = self.manager.control_loop.get_stats()
+        logger.info(f"Control loop {uci}: {stats['ticks']} ticks, {stats['overruns']} overruns, "
+                    f"jitter {stats['jitter_mean_ms']:.2f} ms mean / {stats['jitter_max_ms']:.2f} ms max, "
+                    f"drift {stats['drift_max_ms']:.1f} ms max")
+
+    def _report_bus_load(self, uci, before):
+        after = self.manager.bus.get_stats()
+        delta = {key: after[key] - before[key] for key in after}
+        logger.info(f"Bus load {uci}: {delta['transactions']} transactions, {delta['bytes']} bytes, "
+                    f"{delta['channel_writes']} channel writes ({delta['skipped']} unchanged skipped)")
+
+    def prepare_move(self, uci, side="white", capture=False, abort=None):
+        """
+        Travel at safe height to the first square a move will touch (the captured
+        piece for captures), while the move is not final yet.
+        :param abort: threading.Event to stop the travel when the move changes
+        :return: True if the arm arrived
+        """
+        square = uci[2:4] if capture else uci[:2]
+        coords = self.board.get_slot_coords(side, square)
+        logger.info(f"Pre-positioning over {square} for expected move {uci}")
+        self._phase("approach")
+        return self.manager.goto_coordinate(coords[0], coords[1], self.Z_SAFE, abort=abort)
 
-    def handle_capture(self, target_sq, side="white"):
+    def handle_capture(self, target_sq, side="white", abort=None):
         """
         Logic for removing a captured piece from the board before moving
         the robot's own piece to that square.
+        :return: True if the piece was dropped in the capture bin
         """
         logger.info(f"Capture detected on {target_sq}. Removing piece...")
 
@@ -67,20 +331,20 @@ class ArmAction:
         # Get next available slot in the physical captured piece area
         bin_coords = self.board.get_next_capture_slot()
 
-        # Pick from board
-        self.manager.goto_coordinate(target_coords[0], target_coords[1], self.Z_SAFE)
-        self.manager.grip()
-
-        # Drop in capture bin
-        self.manager.goto_coordinate(bin_coords[0], bin_coords[1], self.Z_SAFE)
-        self.manager.loose()
+        # Pick from board, drop in capture bin
+        t0 = self.clock()
+        if not self.transfer(target_coords, bin_coords, kind="drop", abort=abort):
+            return False
+        self._report_travel(f"x{target_sq}", target_coords, bin_coords, self.clock() - t0, kind="drop")
+        return True
 
-def execute_command(self, uci, status, side="white"):
+    def execute_command(self, uci, status, side="white", abort=None):
         """
         The unified entry point for the Main program.
         :param uci: uci string (e.g., 'e2e4')
         :param status: 'Move', 'Capt', 'Same', 'Multi', etc.
         :param side: "white" or "black" perspective
+        :return: "Same", "Multi", "Success" or "Failed"
         """
         if status == 'Same' or uci is None:
             logger.info("No move required.")
@@ -90,19 +354,9 @@ def execute_command(self, uci, status, side="white"):
             logger.warning("Ambiguous move (Multi). Arm stands by for safety.")
             return "Multi"
 
-        # 1. Handle Capture first if necessary
-        if status == 'Capt':
-            # In a capture like 'e2d3', the piece to remove is at 'd3'
-            target_sq = uci[2:4]
-            logger.info(f"Status is CAPT. Removing piece at {target_sq} first.")
-            self.handle_capture(target_sq, side=side)
-
-        # 2. Execute the actual move
-        # This moves the piece from start_sq to end_sq
+        # Capture removal and the move itself as one turn, then a single rest
+        # so the camera has a clear view for next turn
         logger.info(f"Status is {status}. Executing move: {uci}")
-        self.execute_uci_move(uci, side=side)
-
-        # 3. Always return to rest so the camera has a clear view for next turn
-        self.rest()
-
-        return "Success"
+        tasks = self.turn_planner.tasks_for_uci(uci, capture=(status == 'Capt'))
+        plan = self.turn_planner.plan(tasks, side=side, uci=uci)
+        return "Success" if self.execute_turn(plan, abort=abort) else "Failed"
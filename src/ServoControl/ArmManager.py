@@ -1,6 +1,12 @@
 import time
 import json
+import numpy as np
 from ServoControl.Servo import ServoDevice
+from ServoControl.Trajectory import JointTrajectory, load_limits
+from ServoControl.CartesianPath import plan_cartesian_motion
+from ServoControl.kinematics import solve_ik
+from ServoControl.Gripper import Gripper
+from ServoControl.ControlLoop import ControlLoop
 from Utils.Logger import get_logger
 import os
 
@@ -8,11 +14,20 @@ logger = get_logger(__name__)
 
 
 class ArmManager:
+    REST_ANGLES = [0, -50, -30, 0]  # Out of the camera's view
 
-    def __init__(self, pca_channels, config_file="armconfig.json"):
+    def __init__(self, pca_channels, config_file="armconfig.json", clock=time.monotonic, sleep=time.sleep, bus=None):
+        """
+        :param pca_channels: The 'channels' attribute of a PCA9685 object (or a simulated stand-in)
+        :param config_file: Servo calibration and motion limits, relative to src/
+        :param clock: Monotonic time source for trajectory execution
+        :param sleep: Sleep function matching the clock (replaceable for simulation)
+        :param bus: Optional ServoBus (PCA9685Bus / MemoryBus); each control tick is then one block write
+        """
         current_dir = os.path.dirname(os.path.abspath(__file__))
         src_dir = os.path.dirname(current_dir)
         config_path = os.path.join(src_dir, config_file)
+        self.config_path = config_path
 
         if not os.path.exists(config_path):
             logger.error(f"Config file not found: {config_path}")
@@ -22,11 +37,13 @@ class ArmManager:
             config_data = json.load(f)
 
         # Initialize exactly 6 servos as a fixed list for faster access
+        self.bus = bus
         self.servos = []
         for cfg in config_data['servos']:
             s = ServoDevice(
                 pca_channels=pca_channels,
-                channel=cfg['channel']
+                channel=cfg['channel'],
+                bus=bus
             )
             # Injecting calibration parameters directly
             s.offset = 90 + cfg['zero_adjusting']
@@ -36,6 +53,27 @@ class ArmManager:
             self.servos.append(s)
 
         self.servo_count = 6
+        if bus is not None:
+            used = [s.channel_num for s in self.servos]
+            bus.mark_idle(ch for ch in range(min(used), max(used)) if ch not in used)
+
+        # Jerk-limited trajectories for J1-J4, executed at a fixed control rate
+        self.joint_limits = load_limits(config_data['servos'])
+        motion_cfg = config_data.get('motion', {})
+        self.control_rate = motion_cfg.get('rate_hz', 50)
+        # Straight-line gripper moves: limits in cm/s, cm/s^2, cm/s^3
+        self.cartesian_limits = motion_cfg.get('cartesian')
+        self.blend_radius = motion_cfg.get('blend_radius', 1.0)
+        # One deadline-scheduled loop for all servo motion (joints, gripper, single servos)
+        self.control_loop = ControlLoop(self.control_rate, clock=clock, sleep=sleep,
+                                        cpu=motion_cfg.get('control_cpu'),
+                                        priority=motion_cfg.get('control_priority'))
+        for s in self.servos:
+            s.loop = self.control_loop
+        # IK for single points; ArmAction swaps in a precomputed IKTable
+        self.solve_ik = solve_ik
+        # Gripper ramps are written by the same control ticks as the joints
+        self.gripper = Gripper(self.servos[5], config_data.get('gripper'), loop=self.control_loop, bus=bus)
         self.current_pos = [0, 0, 0]  # Default position for the end effector
         self.current_angles = [0, 0, 0, 0, 0, 0]
         logger.info("6-axis hardware interface initialized.")
@@ -55,89 +93,216 @@ class ArmManager:
             s.release()
         logger.info("All 6 axes powered down.")
 
-    def move_arm(self, angles):
+    def move_arm(self, angles, abort=None):
         """
         Move the arm to the specified angles.
         :param angles: List of 4 angles in degrees for J1 to J4.
+        :param abort: Optional threading.Event; when set, the arm stops where it is.
+        :return: True if the target was reached, False if aborted or invalid
         """
         if len(angles) != 4:
             logger.error(f"Expected 4 angles, got {len(angles)}.")
-            return
+            return False
 
         target_angles = []
         for i in range(4):
             target = self.servos[i].offset + (float(angles[i]) * self.servos[i].direction)
             target_angles.append(target)
 
+        duration = self._move_servos(target_angles, abort)
+        if duration is None:
+            return False
+
+        logger.info(f"Arm moved to angles (absolute): {[round(a, 2) for a in target_angles]} "
+                    f"in {duration:.2f}s")
+        return True
+
+    def _move_servos(self, target_angles, abort=None):
+        """
+        Joint-space move of J1-J4 to absolute servo angles.
+        :return: Duration of the move in seconds, or None if aborted
+        """
         # Security check
         for i in range(4):
             if self.servos[i].current_angle is None:
                 logger.warning(f"Servo {i} position unknown, defaulting to offset.")
                 self.servos[i].current_angle = self.servos[i].offset
 
-        # calculating
+        # Synchronized S-curve, sampled against absolute deadlines so the
+        # loop does not drift when a servo write takes longer than expected
         current_positions = [self.servos[i].current_angle for i in range(4)]
-        diffs = [target_angles[i] - current_positions[i] for i in range(4)]
+        trajectory = JointTrajectory(current_positions, target_angles, self.joint_limits)
+        if not self._run_trajectory(trajectory, abort):
+            return None
+        return trajectory.duration
 
-        # speed
-        max_diff = max(abs(d) for d in diffs)
-        steps = int(max_diff)
+    def _run_trajectory(self, trajectory, abort=None, cue=None):
+        """
+        Stream a trajectory (absolute servo angles for J1-J4) at the control rate.
+        :param cue: Optional (time, callback); callback() runs once at the first tick at or after time
+        :return: True when the end point was written, False if aborted
+        """
+        pending = [cue]
 
-        # move
-        if steps > 0:
-            increments = [d / steps for d in diffs]
+        def step(t):
+            # Targets are sampled at the actual tick time, so a late tick does not lag behind
+            if pending[0] is not None and t >= pending[0][0]:
+                pending[0][1]()
+                pending[0] = None
+            angles_now = trajectory.sample(t)
+            for j in range(4):
+                self.servos[j].move_to(angles_now[j], flush=False)
+            self.gripper.update(flush=False)
+            self._flush_bus()
 
-            for s in range(steps):
-                for j in range(4):
-                    next_pos = current_positions[j] + (increments[j] * (s + 1))
-                    self.servos[j].move_to(next_pos)
-                time.sleep(0.02)
+        if not self.control_loop.run(trajectory.duration, step, abort):
+            for j in range(4):
+                self.current_angles[j] = self.servos[j].current_angle
+            logger.info("Arm motion aborted.")
+            return False
 
         for j in range(4):
-            self.servos[j].move_to(target_angles[j])
+            self.current_angles[j] = float(self.servos[j].current_angle)
+        return True
+
+    def _flush_bus(self):
+        if self.bus is not None:
+            self.bus.flush()
+
+    def _to_servo_frame(self, angles):
+        """Kinematic joint angles (n, 4) -> absolute servo angles."""
+        offsets = np.array([self.servos[i].offset for i in range(4)], dtype=float)
+        directions = np.array([self.servos[i].direction for i in range(4)], dtype=float)
+        return offsets + np.asarray(angles, dtype=float) * directions
+
+    def plan_path(self, waypoints):
+        """
+        Plan a continuous straight-line/blended move through XYZ via-points.
+        :return: CartesianMotion in absolute servo angles
+        :raises ValueError: if the path leaves the workspace
+        """
+        motion = plan_cartesian_motion(waypoints, self.joint_limits, self.cartesian_limits,
+                                       blend_radius=self.blend_radius)
+        return motion.to_servo_frame(self._to_servo_frame)
+
+    def choose_path(self, waypoints):
+        """
+        Straight-line path through the via-points, unless stopping at each of them
+        with joint-space moves is faster (near the edge of the workspace a straight
+        line crosses poses where the joints have to move very fast).
+        :return: (CartesianMotion or None for point-to-point, planned duration in s)
+        :raises ValueError: if a via-point is unreachable
+        """
+        point_to_point = self.joint_move_time(waypoints)
+        try:
+            motion = self.plan_path(waypoints)
+        except ValueError as e:
+            logger.debug(f"No straight-line path: {e}")
+            return None, point_to_point
+        if motion.duration > point_to_point:
+            return None, point_to_point
+        return motion, motion.duration
+
+    def plan_segments(self, waypoints):
+        """
+        Trajectories (absolute servo angles) that take the gripper through the
+        via-points: one straight-line motion, or one joint-space move per leg
+        when stopping at the via-points is faster.
+        :raises ValueError: if a via-point is unreachable
+        """
+        motion, _ = self.choose_path(waypoints)
+        if motion is not None:
+            return [motion]
+        poses = []
+        for x, y, z in waypoints:
+            angles, status = self.solve_ik(x, y, z)
+            poses.append(self._to_servo_frame(angles))
+        return [JointTrajectory(a, b, self.joint_limits) for a, b in zip(poses, poses[1:])]
 
+    def run_segments(self, segments, end_pos=None, abort=None, cue=None):
+        """
+        Execute planned trajectories back to back. If the arm is not where the
+        first one starts, it is brought there with a joint-space move first.
+        :param end_pos: XYZ of the gripper after the last segment
+        :param cue: Optional (seconds before the end, callback), e.g. to start closing the gripper
+        :return: True if all segments completed
+        """
         for i in range(4):
-            self.current_angles[i] = target_angles[i]
-        logger.info(f"Arm moved to angles (absolute): {[round(a, 2) for a in target_angles]}")
+            if self.servos[i].current_angle is None:
+                self.servos[i].current_angle = self.servos[i].offset
+        if segments:
+            # Compare with what the servos can reach: targets beyond their range are clipped by move_to
+            start = [min(max(float(a), 0.0), self.servos[i].range) for i, a in enumerate(segments[0].sample(0.0))]
+            if max(abs(self.servos[i].current_angle - start[i]) for i in range(4)) > 0.5:
+                if self._move_servos(list(start), abort) is None:
+                    return False
+
+        for i, segment in enumerate(segments):
+            segment_cue = None
+            if cue is not None and i == len(segments) - 1:
+                segment_cue = (max(0.0, segment.duration - cue[0]), cue[1])
+            if not self._run_trajectory(segment, abort, segment_cue):
+                return False
+        if end_pos is not None:
+            self.current_pos = [float(v) for v in end_pos]
+        return True
+
+    def follow_path(self, waypoints, abort=None):
+        """
+        Move the gripper along straight lines through the XYZ via-points without
+        stopping at them (see plan_segments).
+        :param waypoints: List of (x, y, z) in cm
+        :param abort: Optional threading.Event to stop the motion early
+        :return: True if the last via-point was reached
+        """
+        try:
+            segments = self.plan_segments(waypoints)
+        except ValueError as e:
+            logger.error(f"Path failed: {e}")
+            return False
 
-    def arm_rest(self):
+        if not self.run_segments(segments, waypoints[-1], abort):
+            return False
+        logger.info(f"Arm followed {len(waypoints)}-point path in "
+                    f"{sum(seg.duration for seg in segments):.2f}s")
+        return True
+
+    def arm_rest(self, abort=None):
         """Move the arm to a predefined "rest" position."""
-        rest_angles = [0, -50, -30, 0]  # Define your rest angles here
-        self.move_arm(rest_angles)
+        if not self.move_arm(self.REST_ANGLES, abort=abort):
+            return False
         logger.info("Arm moved to rest position.")
+        return True
 
-    def goto_coordinate(self, x, y, z):
+    def goto_coordinate(self, x, y, z, abort=None):
         """
         Move the arm to the specified XYZ coordinate.
         :param x: X coordinate in cm
         :param y: Y coordinate in cm
         :param z: Z coordinate in cm
+        :param abort: Optional threading.Event to stop the motion early
         """
-        from ServoControl.kinematics import solve_ik
-        angles, status = solve_ik(x, y, z)
+        angles, status = self.solve_ik(x, y, z)
 
         if status == "Success":
-            self.move_arm(angles)
+            if not self.move_arm(angles, abort=abort):
+                return False
             self.current_pos = [x, y, z]
             return True
         else:
             logger.error(f"Move failed: {status}")
             return False
 
-    def set_gripper(self, status):
+    def set_gripper(self, status, phase=None, abort=None):
         """
-        Directly control the gripper (S5).
-        :param status: 0 for "close", 30 for "open".
+        Directly control the gripper (S5) and wait until it has settled.
+        :param status: "open" or "close" (angles in armconfig.json 'gripper').
+        :param phase: Settle time to apply ("open", "grip", "release", "close"); defaults to status
         """
-        if status == "open":
-            angle = 30
-        elif status == "close":
-            angle = 15
-        else:
-            logger.error(f"Wrong gripper status {status}")
-
-        self.servos[5].smooth_move(angle,20)
-        self.current_angles[5] = angle
+        if not self.gripper.actuate(status, phase, abort=abort):
+            return False
+        self.current_angles[5] = self.servos[5].current_angle
+        return True
 
     def get_current_pos(self):
         return self.current_pos
@@ -145,34 +310,65 @@ class ArmManager:
     def get_current_angles(self):
         return self.current_angles
 
-    def grip(self):
+    def grip(self, z_safe=5, z_pick=2):
         '''
-        grab the piece at current xy coordinate, move up to safe height after grab
+        grab the piece at current xy coordinate, move up to safe height after grab.
+        Descent and lift are straight vertical paths without intermediate stops.
         '''
         x, y, _ = self.current_pos
         logger.info(f"Executing GRIP at x={x}, y={y}")
 
-        self.goto_coordinate(x, y, 5)
-        time.sleep(0.5)
-        self.set_gripper("open")
-        time.sleep(0.5)
-        self.goto_coordinate(x, y, 2)
-        time.sleep(0.5)
-        self.set_gripper("close")
-        time.sleep(0.5)
-        self.goto_coordinate(x, y, 5)
+        self.gripper.command("open")
+        self.follow_path([self.current_pos, (x, y, z_safe), (x, y, z_pick)])
+        self.set_gripper("close", "grip")
+        self.follow_path([(x, y, z_pick), (x, y, z_safe)])
 
-    def loose(self):
+    def loose(self, z_safe=5, z_pick=2):
         """
         release the piece at current xy coordinate, move up to safe height after release"""
         x, y, _ = self.current_pos
         logger.info(f"Executing LOOSE at x={x}, y={y}")
 
-        self.goto_coordinate(x, y, 2)
-        time.sleep(0.5)
-        self.set_gripper("open")
-        time.sleep(0.5)
-        self.goto_coordinate(x, y, 5)
-        time.sleep(0.5)
+        self.follow_path([self.current_pos, (x, y, z_pick)])
+        self.set_gripper("open", "release")
+        self.follow_path([(x, y, z_pick), (x, y, z_safe)])
         self.set_gripper("close")
 
+    def rest_servo_angles(self):
+        """Absolute servo angles of J1-J4 in the rest pose."""
+        return self._to_servo_frame(self.REST_ANGLES)
+
+    def move_time(self, x, y, z, from_angles=None):
+        """
+        Duration of a joint-space move (goto_coordinate) to an XYZ point.
+        :param from_angles: Absolute J1-J4 servo angles to start from (default: the current pose)
+        :raises ValueError: if the point is unreachable
+        """
+        angles, status = self.solve_ik(x, y, z)
+        if angles is None:
+            raise ValueError(f"({x}, {y}, {z}) unreachable: {status}")
+        if from_angles is None:
+            from_angles = [s.current_angle if s.current_angle is not None else s.offset
+                           for s in self.servos[:4]]
+        return JointTrajectory(from_angles, self._to_servo_frame(angles), self.joint_limits).duration
+
+    def rest_move_time(self, x, y, z):
+        """Duration of a joint-space move between the rest pose and an XYZ point."""
+        return self.move_time(x, y, z, from_angles=self.rest_servo_angles())
+
+    def joint_move_time(self, points):
+        """
+        Duration of stop-and-go joint-space moves (goto_coordinate) through XYZ points.
+        :raises ValueError: if a point is unreachable
+        """
+        total = 0.0
+        previous = None
+        for x, y, z in points:
+            angles, status = self.solve_ik(x, y, z)
+            if angles is None:
+                raise ValueError(f"({x}, {y}, {z}) unreachable: {status}")
+            servo_angles = self._to_servo_frame(angles)
+            if previous is not None:
+                total += JointTrajectory(previous, servo_angles, self.joint_limits).duration
+            previous = servo_angles
+        return total
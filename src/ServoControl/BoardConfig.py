@@ -49,11 +49,6 @@ class BoardManager:
         :param notation: Chess notation like "e4"
         :return: [x, y, z] coordinates for the given slot, P.S. Z is set to a default safe height of 5.0 cm
         """
-        if side == "black":
-            target_index = 63 - raw_index
-        else:
-            target_index = raw_index
-
         file_char = notation[0].lower()
         rank_char = notation[1]
 
@@ -87,5 +82,15 @@ class BoardManager:
             self.captured_count = 0
             return [self.capture_coords[0][0], self.capture_coords[0][1], 5.0]
 
+    def peek_capture_slot(self, offset=0):
+        """
+        Slot get_next_capture_slot() will return after `offset` further calls, without claiming it.
+        """
+        count = self.captured_count
+        for _ in range(offset):
+            count = count + 1 if count < len(self.capture_coords) else 0
+        xy = self.capture_coords[count] if count < len(self.capture_coords) else self.capture_coords[0]
+        return [xy[0], xy[1], 5.0]
+
     def reset_capture_count(self):
         self.captured_count = 0
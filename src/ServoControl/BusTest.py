@@ -0,0 +1,84 @@
+# ServoBus check on the in-memory stand-in bus (no PCA9685 needed)
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ServoControl.ServoBus import MemoryBus, angle_to_counts, FULL_OFF, LED0_ON_L
+
+failures = 0
+
+
+def check(ok, text):
+    global failures
+    failures += not ok
+    print(f"{'PASS' if ok else 'FAIL'}  {text}")
+
+
+def bus_test():
+    print("\n===== Block writes =====")
+    bus = MemoryBus()
+    angles = [90, 45, 135, 90, 0, 180]
+    for ch, angle in enumerate(angles):
+        bus.stage_angle(ch, angle)
+    n = bus.flush()
+    check(n == 1 and len(bus.traffic) == 1, f"6 contiguous channels in one transaction ({n})")
+    check(bus.traffic[0][1:] == (LED0_ON_L, 1 + 6 * 4), f"starts at LED0_ON_L, 25 bytes {bus.traffic[0][1:]}")
+    check(all(bus.channel_counts(ch) == angle_to_counts(a) for ch, a in enumerate(angles)),
+          "register file holds the staged counts")
+
+    print("\n===== Skipping unchanged channels =====")
+    for ch, angle in enumerate(angles):
+        bus.stage_angle(ch, angle)
+    n = bus.flush()
+    check(n == 0 and len(bus.traffic) == 1, "same targets again: no transaction")
+    check(bus.stats["skipped"] == 6, f"6 channel writes skipped ({bus.stats['skipped']})")
+
+    bus.stage_angle(1, 50)
+    bus.stage_angle(3, 95)
+    bus.stage_angle(2, angles[2])
+    n = bus.flush()
+    check(n == 1 and bus.traffic[-1][1:] == (LED0_ON_L + 4, 1 + 3 * 4),
+          f"channels 1 and 3 changed: one block bridging known channel 2 {bus.traffic[-1][1:]}")
+    check(bus.stats["channel_writes"] == 8, f"8 channel writes in total ({bus.stats['channel_writes']})")
+
+    print("\n===== Gaps =====")
+    bus = MemoryBus()
+    bus.stage_angle(0, 90)
+    bus.stage_angle(8, 90)
+    check(bus.flush() == 2, "channels 0 and 8 with unknown channels between: two blocks")
+
+    bus = MemoryBus()
+    bus.mark_idle(range(1, 16))
+    bus.stage_angle(0, 90)
+    bus.stage_angle(8, 90)
+    check(bus.flush() == 1, "same with idle channels between: one block")
+    check(bus.channel_counts(4) == FULL_OFF, "bridged idle channel stays full off")
+
+    print("\n===== Release =====")
+    bus.stage_angle(0, None)
+    bus.flush()
+    check(bus.channel_counts(0) == FULL_OFF, "None releases the servo (full off)")
+
+    print("\n===== Bus load of an interpolated move =====")
+    bus = MemoryBus()
+    start = [90, 90, 90, 90, 90, 30]
+    end = [120, 60, 100, 90, 90, 30]       # Wrist roll and gripper hold still
+    ticks = 50
+    for tick in range(ticks + 1):
+        f = tick / ticks
+        for ch in range(6):
+            bus.stage_angle(ch, start[ch] + f * (end[ch] - start[ch]))
+        bus.flush()
+    stats = bus.stats
+    check(stats["transactions"] <= ticks + 1, f"at most one transaction per tick ({stats['transactions']} for {ticks + 1} ticks)")
+    check(stats["channel_writes"] < 6 * (ticks + 1),
+          f"{stats['channel_writes']} channel writes instead of {6 * (ticks + 1)}, {stats['skipped']} skipped")
+    print(f"      {stats['bytes']} bytes on the bus, {stats['bytes'] / (ticks + 1):.1f} per tick")
+
+    print(f"\n{failures} failure(s)")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if bus_test() else 1)
@@ -0,0 +1,150 @@
+import numpy as np
+from ServoControl.kinematics import solve_ik_batch
+from ServoControl.Trajectory import SCurve
+
+# Straight-line moves of the gripper in XYZ (cm). Corners between segments
+# are rounded with a quadratic blend so the arm passes via-points without
+# stopping; the whole path then follows one S-curve time law along its
+# arc length, slowed down uniformly if any joint would exceed its limits.
+
+DEFAULT_CARTESIAN_LIMITS = {"max_speed": 15.0, "max_acceleration": 60.0, "max_jerk": 400.0}
+MAX_STEP_JUMP = 15.0  # degrees between neighbouring path samples
+
+
+class CartesianPath:
+    """
+    Densely sampled polyline through XYZ via-points with blended corners.
+    """
+    def __init__(self, waypoints, blend_radius=1.0, step=0.25):
+        """
+        :param waypoints: (m, 3) via-points in cm, first = start, last = end
+        :param blend_radius: Max distance from a corner where the blend starts (cm)
+        :param step: Sample spacing along the path (cm)
+        """
+        pts = np.asarray(waypoints, dtype=float)
+        # Drop repeated points, they have no direction
+        keep = np.concatenate([[True], np.linalg.norm(np.diff(pts, axis=0), axis=1) > 1e-6])
+        pts = pts[keep]
+
+        self.waypoints = pts
+        self.points = self._sample(pts, blend_radius, step)
+        seg = np.linalg.norm(np.diff(self.points, axis=0), axis=1)
+        self.s = np.concatenate([[0.0], np.cumsum(seg)])
+        self.length = float(self.s[-1])
+
+    @staticmethod
+    def _line(a, b, step):
+        n = max(2, int(np.ceil(np.linalg.norm(b - a) / step)) + 1)
+        u = np.linspace(0.0, 1.0, n)[:, None]
+        return a + u * (b - a)
+
+    @staticmethod
+    def _blend(a, corner, b, step):
+        n = max(3, int(np.ceil((np.linalg.norm(corner - a) + np.linalg.norm(b - corner)) / step)) + 1)
+        u = np.linspace(0.0, 1.0, n)[:, None]
+        return (1 - u) ** 2 * a + 2 * (1 - u) * u * corner + u ** 2 * b
+
+    def _sample(self, pts, blend_radius, step):
+        if len(pts) == 1:
+            return pts.copy()
+
+        pieces = []
+        cursor = pts[0]
+        for i in range(1, len(pts) - 1):
+            d_in = pts[i] - pts[i - 1]
+            d_out = pts[i + 1] - pts[i]
+            len_in, len_out = np.linalg.norm(d_in), np.linalg.norm(d_out)
+            r = min(blend_radius, 0.5 * len_in, 0.5 * len_out)
+            enter = pts[i] - d_in / len_in * r
+            leave = pts[i] + d_out / len_out * r
+            pieces.append(self._line(cursor, enter, step))
+            if r > 1e-6:
+                pieces.append(self._blend(enter, pts[i], leave, step))
+            cursor = leave
+        pieces.append(self._line(cursor, pts[-1], step))
+
+        # Consecutive pieces share their end points
+        out = [pieces[0]] + [p[1:] for p in pieces[1:]]
+        return np.vstack(out)
+
+    def joint_angles(self):
+        """
+        IK for every sample point, in one batch.
+        :return: (n, 4) joint angles in degrees (kinematics frame)
+        :raises ValueError: if any point of the path is unreachable
+        """
+        angles, ok = solve_ik_batch(self.points)
+        if not ok.all():
+            x, y, z = self.points[np.argmin(ok)]
+            raise ValueError(f"Path point ({x:.2f}, {y:.2f}, {z:.2f}) unreachable")
+
+        # A jump between neighbouring samples means the solver switched elbow
+        # branch or clipped an out-of-reach point; the arm cannot follow that
+        if len(angles) > 1:
+            jump = np.abs(np.diff(angles, axis=0)).max()
+            if jump > MAX_STEP_JUMP:
+                raise ValueError(f"IK discontinuity along the path ({jump:.1f} deg between samples)")
+        return angles
+
+
+class CartesianMotion:
+    """
+    Time-parameterized Cartesian path, with the same duration/sample() interface
+    as JointTrajectory so ArmManager can execute either.
+    """
+    def __init__(self, path, angles, profile, ik_angles=None):
+        self.path = path
+        self.angles = angles
+        self.profile = profile
+        # Kinematics-frame angles, kept when angles are mapped to servo angles
+        self.ik_angles = angles if ik_angles is None else ik_angles
+
+    def to_servo_frame(self, convert):
+        """Same motion with angles mapped by convert((n, 4) -> (n, 4)), e.g. to absolute servo angles."""
+        return CartesianMotion(self.path, convert(self.angles), self.profile, ik_angles=self.ik_angles)
+
+    @property
+    def duration(self):
+        return self.profile.duration
+
+    @property
+    def target(self):
+        return self.angles[-1]
+
+    def sample(self, t):
+        """Joint angles (kinematics frame) at time t; arrays of t give (n, 4)."""
+        s, _, _ = self.profile.evaluate(t)
+        if self.path.length == 0.0:
+            return np.broadcast_to(self.angles[-1], np.shape(s) + (self.angles.shape[1],)).copy()
+        return np.stack([np.interp(s, self.path.s, self.angles[:, j]) for j in range(self.angles.shape[1])],
+                        axis=-1)
+
+
+def plan_cartesian_motion(waypoints, joint_limits, cartesian_limits=None, blend_radius=1.0, step=0.25):
+    """
+    Plan a continuous move through XYZ via-points.
+    :param waypoints: (m, 3) points in cm
+    :param joint_limits: Per-joint limit dicts (see Trajectory.load_limits)
+    :param cartesian_limits: max_speed (cm/s), max_acceleration (cm/s^2), max_jerk (cm/s^3)
+    :return: CartesianMotion
+    :raises ValueError: if part of the path is unreachable
+    """
+    lim = dict(DEFAULT_CARTESIAN_LIMITS)
+    if cartesian_limits:
+        lim.update(cartesian_limits)
+
+    path = CartesianPath(waypoints, blend_radius=blend_radius, step=step)
+    angles = path.joint_angles()
+    v, a, j = lim["max_speed"], lim["max_acceleration"], lim["max_jerk"]
+    profile = SCurve(path.length, v, a, j)
+
+    if path.length > 0 and len(angles) > 1:
+        # Joint speed = dq/ds * ds/dt; stretch time uniformly if any joint is too fast
+        ds = np.diff(path.s)
+        dq_ds = np.abs(np.diff(angles, axis=0)) / np.maximum(ds, 1e-9)[:, None]
+        v_joint = np.array([jl["max_velocity"] for jl in joint_limits[:angles.shape[1]]])
+        factor = float((dq_ds.max(axis=0) * profile.v_peak / v_joint).max())
+        if factor > 1.0:
+            profile = SCurve(path.length, v / factor, a / factor ** 2, j / factor ** 3)
+
+    return CartesianMotion(path, angles, profile)
@@ -0,0 +1,156 @@
+import os
+import math
+import time
+import threading
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def configure_realtime(cpu=None, priority=None):
+    """
+    Pin the calling thread to a core and raise its scheduling priority.
+    Linux only and best effort: anything the OS refuses is logged and skipped.
+    :param cpu: Core index for os.sched_setaffinity (None = unchanged)
+    :param priority: SCHED_FIFO priority 1-99; without permission for that the
+                     thread's nice value is lowered by the same amount instead (None = unchanged)
+    :return: List of what was applied, e.g. ["cpu 3", "SCHED_FIFO 10"]
+    """
+    applied = []
+    if cpu is not None:
+        if hasattr(os, "sched_setaffinity"):
+            try:
+                # pid 0 = the calling thread on Linux
+                os.sched_setaffinity(0, {cpu})
+                applied.append(f"cpu {cpu}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Control loop not pinned to CPU {cpu}: {e}")
+        else:
+            logger.warning("CPU pinning is not supported on this platform.")
+
+    if priority is not None:
+        if hasattr(os, "sched_setscheduler") and hasattr(os, "SCHED_FIFO"):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+                applied.append(f"SCHED_FIFO {priority}")
+            except (OSError, ValueError):
+                try:
+                    # Per-thread nice value; lowering it needs CAP_SYS_NICE as well
+                    tid = threading.get_native_id()
+                    os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) - priority)
+                    applied.append(f"nice -{priority}")
+                except OSError as e:
+                    logger.warning(f"Control loop priority unchanged: {e}")
+        else:
+            logger.warning("Real-time scheduling is not supported on this platform.")
+    return applied
+
+
+class ControlLoop:
+    """
+    Fixed-rate control loop against absolute deadlines (t0 + k * period) on a
+    monotonic clock, so late ticks do not add up to a longer move. Each tick
+    gets the actual time since the start, to sample trajectories at; ticks
+    that are missed entirely are skipped rather than run back to back.
+    Lateness (jitter) and missed ticks (overruns) are recorded.
+    """
+    def __init__(self, rate_hz=50, clock=time.monotonic, sleep=time.sleep, cpu=None, priority=None):
+        """
+        :param rate_hz: Tick rate
+        :param clock: Monotonic time source
+        :param sleep: Sleep function matching the clock
+        :param cpu: Core to pin the motion thread to (Linux, optional)
+        :param priority: Real-time priority of the motion thread (Linux, optional, see configure_realtime)
+        """
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.clock = clock
+        self.sleep = sleep
+        self.cpu = cpu
+        self.priority = priority
+        self.owner_thread = None    # Thread the realtime settings were applied to
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"runs": 0, "ticks": 0, "overruns": 0, "late_sum": 0.0, "late_sq": 0.0,
+                      "late_max": 0.0, "drift_max": 0.0}
+
+    def claim_thread(self):
+        """
+        Apply cpu/priority to the calling thread, which must be the dedicated
+        motion thread (MotionExecutor worker). Runs on other threads (arm_init,
+        calibration from the UI thread) are never pinned or prioritized, since
+        threads and processes started from them would inherit the settings.
+        """
+        if self.owner_thread is not None:
+            if self.owner_thread is not threading.current_thread():
+                logger.warning("Control loop realtime settings already belong to another thread.")
+            return
+        self.owner_thread = threading.current_thread()
+        if self.cpu is None and self.priority is None:
+            return
+        applied = configure_realtime(self.cpu, self.priority)
+        if applied:
+            logger.info(f"Control loop thread {threading.get_native_id()}: {', '.join(applied)}")
+
+    def run(self, duration, step, abort=None):
+        """
+        Call step(t) every period until duration has passed, then step(duration)
+        once more so the end point is always written.
+        :param step: Function of the time since the start in seconds
+        :param abort: Optional threading.Event, checked before every tick
+        :return: True when finished, False if aborted
+        """
+        period = self.period
+        t0 = self.clock()
+        tick = 1
+        while True:
+            # The last tick falls on the end of the motion, not on the next period
+            last = tick * period >= duration
+            deadline = t0 + (duration if last else tick * period)
+            delay = deadline - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+            if abort is not None and abort.is_set():
+                return False
+
+            now = self.clock()
+            late = max(0.0, now - deadline)
+            stats = self.stats
+            stats["ticks"] += 1
+            stats["late_sum"] += late
+            stats["late_sq"] += late * late
+            stats["late_max"] = max(stats["late_max"], late)
+
+            t = now - t0
+            if last or t >= duration:
+                step(duration)
+                break
+            step(t)
+
+            # Deadlines already passed are dropped, not caught up on
+            missed = int((self.clock() - t0) / period) - tick
+            if missed > 0:
+                stats["overruns"] += missed
+                tick += missed
+            tick += 1
+
+        self.stats["runs"] += 1
+        self.stats["drift_max"] = max(self.stats["drift_max"], self.clock() - t0 - duration)
+        return True
+
+    def get_stats(self):
+        """Tick counts plus lateness after the deadline in milliseconds (mean, standard deviation, max)."""
+        stats = self.stats
+        ticks = stats["ticks"]
+        mean = stats["late_sum"] / ticks if ticks else 0.0
+        variance = max(0.0, stats["late_sq"] / ticks - mean * mean) if ticks else 0.0
+        return {
+            "runs": stats["runs"],
+            "ticks": ticks,
+            "overruns": stats["overruns"],
+            "jitter_mean_ms": 1000.0 * mean,
+            "jitter_std_ms": 1000.0 * math.sqrt(variance),
+            "jitter_max_ms": 1000.0 * stats["late_max"],
+            "drift_max_ms": 1000.0 * stats["drift_max"],
+        }
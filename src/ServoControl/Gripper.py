@@ -0,0 +1,142 @@
+from ServoControl.ControlLoop import ControlLoop
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_GRIPPER = {
+    "open_angle": 30.0,        # Absolute servo angles
+    "close_angle": 15.0,
+    "speed": 60.0,             # deg/s of the jaw ramp
+    "settle": {"open": 0.1, "grip": 0.2, "release": 0.15, "close": 0.0},
+    "close_tolerance": 0.3,    # cm above the pick height at which closing starts
+}
+
+# Before the actuation model: smooth_move at 20 deg/s plus a fixed 0.5s pause
+# after each of the four gripper commands of a move, with the arm standing still
+LEGACY_SPEED = 20.0
+LEGACY_PAUSE = 0.5
+
+
+class Gripper:
+    """
+    Actuation model of the gripper servo (S5). A command starts a ramp at the
+    configured speed and returns at once; the ramp is written by update(),
+    which the arm's control loop calls every tick, so the jaws move while the
+    arm moves. wait() blocks only for what is left of ramp + settle time and
+    books that as dead time.
+    """
+    def __init__(self, servo, config=None, loop=None, bus=None):
+        """
+        :param servo: ServoDevice of the gripper
+        :param config: 'gripper' section of armconfig.json (missing keys use DEFAULT_GRIPPER)
+        :param loop: ControlLoop shared with the arm (its clock times the ramps)
+        :param bus: ServoBus to flush while waiting (None = direct writes)
+        """
+        cfg = dict(DEFAULT_GRIPPER)
+        cfg.update(config or {})
+        self.settle = dict(DEFAULT_GRIPPER["settle"])
+        self.settle.update(cfg.get("settle") or {})
+        self.angles = {"open": float(cfg["open_angle"]), "close": float(cfg["close_angle"])}
+        self.speed = float(cfg["speed"])
+        self.close_tolerance = float(cfg["close_tolerance"])
+
+        self.servo = servo
+        self.loop = loop or ControlLoop()
+        self.bus = bus
+
+        self.status = None
+        self._from = None
+        self._to = None
+        self._t0 = 0.0
+        self._ramp = 0.0
+        self._ready_at = 0.0
+        self.stats = {"actuations": 0, "dead_time": 0.0}
+
+    def clock(self):
+        return self.loop.clock()
+
+    def travel_time(self):
+        """Ramp duration between open and closed."""
+        return abs(self.angles["open"] - self.angles["close"]) / self.speed
+
+    def command(self, status, phase=None):
+        """
+        Start opening/closing without blocking.
+        :param status: "open" or "close"
+        :param phase: Settle time key ("open", "grip", "release", "close"); defaults to status
+        """
+        if status not in self.angles:
+            logger.error(f"Wrong gripper status {status}")
+            return
+        now = self.clock()
+        current = self.servo.current_angle
+        self._from = self._to if current is None else current
+        if self._from is None:
+            self._from = self.angles[status]
+        self._to = self.angles[status]
+        self._t0 = now
+        self._ramp = abs(self._to - self._from) / self.speed
+        self._ready_at = now + self._ramp + self.settle.get(phase or status, 0.0)
+        self.status = status
+        self.stats["actuations"] += 1
+
+    def moving(self, now=None):
+        now = self.clock() if now is None else now
+        return self._to is not None and now < self._t0 + self._ramp
+
+    def update(self, now=None, flush=True):
+        """Write the jaw angle for this instant while a ramp is running."""
+        if self._to is None:
+            return
+        now = self.clock() if now is None else now
+        if self._ramp <= 0 or now >= self._t0 + self._ramp:
+            angle = self._to
+        else:
+            angle = self._from + (self._to - self._from) * (now - self._t0) / self._ramp
+        if self.servo.current_angle != angle:
+            self.servo.move_to(angle, flush=flush)
+
+    def remaining(self, now=None):
+        """Seconds until the last command has finished ramping and settling."""
+        now = self.clock() if now is None else now
+        return max(0.0, self._ready_at - now)
+
+    def wait(self, abort=None):
+        """
+        Hold the arm until the gripper is ready.
+        :return: False if aborted
+        """
+        start = self.clock()
+
+        def step(t):
+            self.update(flush=False)
+            if self.bus is not None:
+                self.bus.flush()
+
+        done = self.loop.run(self.remaining(start), step, abort)
+        self.stats["dead_time"] += self.clock() - start
+        return done
+
+    def actuate(self, status, phase=None, abort=None):
+        """Blocking open/close (command + wait)."""
+        self.command(status, phase)
+        return self.wait(abort)
+
+    def planned_dead_time(self, close_lead=0.0):
+        """
+        Arm standstill per pick-and-place: opening overlaps the descent,
+        closing starts close_lead seconds before the pick height is reached,
+        releasing is waited for, closing after the lift overlaps the next move.
+        """
+        ramp = self.travel_time()
+        grip = max(0.0, ramp + self.settle["grip"] - close_lead)
+        release = ramp + self.settle["release"]
+        return grip + release
+
+    @staticmethod
+    def legacy_dead_time(open_angle=30.0, close_angle=15.0):
+        """Standstill of the previous gripper sequence: four smooth_moves plus three fixed pauses."""
+        return 4 * abs(open_angle - close_angle) / LEGACY_SPEED + 3 * LEGACY_PAUSE
+
+    def get_stats(self):
+        return dict(self.stats)
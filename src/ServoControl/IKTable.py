@@ -0,0 +1,98 @@
+import time
+import numpy as np
+from ServoControl.kinematics import solve_ik, solve_ik_batch
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IKTable:
+    """
+    Joint angles for every calibrated board square and capture slot at the
+    standard heights, solved in one batch at startup. Any other point falls
+    back to the live solver.
+    """
+    def __init__(self, board, heights=(5.0, 2.0), decimals=3):
+        """
+        :param board: BoardManager with coords_table and capture_coords
+        :param heights: Z values (cm) to precompute, e.g. (Z_SAFE, Z_PICK)
+        :param decimals: Rounding of the lookup key, in cm
+        """
+        self.decimals = decimals
+        self.stats = {"hits": 0, "misses": 0}
+
+        t0 = time.perf_counter()
+        xy = list(board.coords_table.values()) + list(board.capture_coords)
+        targets = np.array([[p[0], p[1], z] for z in heights for p in xy], dtype=float)
+        angles, ok = solve_ik_batch(targets)
+
+        self.table = {}
+        for target, solution, solved in zip(targets, angles, ok):
+            if solved:
+                self.table[self._key(*target)] = [float(a) for a in solution]
+        self.unreachable = int((~ok).sum())
+
+        elapsed = (time.perf_counter() - t0) * 1000
+        logger.info(f"IK table built: {len(self.table)} poses in {elapsed:.1f} ms"
+                    + (f", {self.unreachable} unreachable" if self.unreachable else ""))
+
+    def _key(self, x, y, z):
+        return (round(float(x), self.decimals), round(float(y), self.decimals), round(float(z), self.decimals))
+
+    def solve(self, x, y, z):
+        """Drop-in replacement for kinematics.solve_ik: (angles, status)."""
+        angles = self.table.get(self._key(x, y, z))
+        if angles is not None:
+            self.stats["hits"] += 1
+            return list(angles), "Success"
+        self.stats["misses"] += 1
+        return solve_ik(x, y, z)
+
+    def verify(self, tolerance=0.01):
+        """
+        Compare every entry with the scalar solver.
+        :return: Largest difference in degrees
+        :raises AssertionError: if it exceeds the tolerance
+        """
+        worst = 0.0
+        for (x, y, z), angles in self.table.items():
+            reference, _ = solve_ik(x, y, z)
+            worst = max(worst, float(np.abs(np.subtract(angles, reference)).max()))
+        assert worst <= tolerance, f"IK table differs from solve_ik by {worst:.4f} deg"
+        return worst
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["entries"] = len(self.table)
+        stats["unreachable"] = self.unreachable
+        return stats
+
+    def __len__(self):
+        return len(self.table)
+
+
+def benchmark(n=5000, seed=0):
+    """Scalar vs. batch IK over random points around the board, checking they agree."""
+    rng = np.random.default_rng(seed)
+    targets = np.column_stack([rng.uniform(6, 30, n), rng.uniform(-10, 35, n), rng.uniform(0, 8, n)])
+
+    t0 = time.perf_counter()
+    scalar = [solve_ik(*t) for t in targets]
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    angles, ok = solve_ik_batch(targets)
+    t_batch = time.perf_counter() - t0
+
+    for (reference, _), solution, solved in zip(scalar, angles, ok):
+        assert (reference is not None) == solved
+        if solved:
+            assert np.abs(np.subtract(reference, solution)).max() <= 0.01
+
+    print(f"Targets: {n}, solved: {int(ok.sum())}")
+    print(f"Scalar solve_ik:  {t_scalar * 1e3:8.1f} ms ({t_scalar / n * 1e6:.1f} us per target)")
+    print(f"solve_ik_batch:   {t_batch * 1e3:8.1f} ms ({t_batch / n * 1e6:.2f} us per target)")
+
+
+if __name__ == "__main__":
+    benchmark()
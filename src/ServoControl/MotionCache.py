@@ -0,0 +1,160 @@
+import io
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from ServoControl.Trajectory import SampledTrajectory
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the planners change in a way that makes stored trajectories stale
+PLANNER_VERSION = 1
+
+
+def calibration_version(config_path, board, heights, rate_hz):
+    """
+    Hash of everything a stored trajectory depends on: armconfig.json (servo
+    calibration, limits, motion settings), the board and capture-slot
+    coordinates, the standard heights and the control rate.
+    """
+    h = hashlib.sha256()
+    with open(config_path, "rb") as f:
+        h.update(f.read())
+    geometry = {
+        "squares": sorted((int(k), list(v)) for k, v in board.coords_table.items()),
+        "capture": [list(p) for p in board.capture_coords],
+        "heights": list(heights),
+        "rate_hz": rate_hz,
+        "planner": PLANNER_VERSION,
+    }
+    h.update(json.dumps(geometry, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+class MotionCache:
+    """
+    Planned, time-parameterized joint trajectories for the recurring arm
+    motions (pick, place, transfer, capture-bin drop), keyed by primitive kind
+    and via-points. Kept in memory and in SQLite; entries from another
+    calibration version are dropped when the cache is opened.
+    """
+    def __init__(self, planner, version, rate_hz=50, db_path="cache/motion_primitives.sqlite"):
+        """
+        :param planner: Function waypoints -> list of trajectories (ArmManager.plan_segments)
+        :param version: Calibration version (see calibration_version)
+        :param rate_hz: Sample rate of the stored trajectories
+        :param db_path: SQLite file for persistent entries (None = memory only)
+        """
+        self.planner = planner
+        self.version = version
+        self.rate_hz = rate_hz
+
+        self.memory = {}
+        self.lock = threading.Lock()
+        self.stats = {"memory": 0, "disk": 0, "planned": 0, "plan_time": 0.0}
+
+        self.db = None
+        if db_path:
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS primitives ("
+                "key TEXT PRIMARY KEY, version TEXT, data BLOB, created REAL)"
+            )
+            stale = self.db.execute("DELETE FROM primitives WHERE version != ?", (version,)).rowcount
+            self.db.commit()
+            if stale:
+                logger.info(f"Calibration changed, {stale} cached motions invalidated.")
+
+    @staticmethod
+    def primitive_key(kind, waypoints):
+        """e.g. 'pick:15.700,-0.500,5.000;15.700,-0.500,2.000'"""
+        return f"{kind}:" + ";".join(f"{x:.3f},{y:.3f},{z:.3f}" for x, y, z in waypoints)
+
+    @staticmethod
+    def _pack(segments):
+        buf = io.BytesIO()
+        arrays = {}
+        for i, seg in enumerate(segments):
+            arrays[f"t{i}"] = seg.times
+            arrays[f"a{i}"] = seg.angles
+        np.savez(buf, **arrays)
+        return buf.getvalue()
+
+    @staticmethod
+    def _unpack(data):
+        with np.load(io.BytesIO(data)) as arrays:
+            count = len(arrays.files) // 2
+            return [SampledTrajectory(arrays[f"t{i}"], arrays[f"a{i}"]) for i in range(count)]
+
+    def get(self, kind, waypoints):
+        """
+        Trajectories for a primitive, planned on first use.
+        :return: List of SampledTrajectory in absolute servo angles
+        :raises ValueError: if the planner cannot reach a via-point
+        """
+        key = self.primitive_key(kind, waypoints)
+        with self.lock:
+            segments = self.memory.get(key)
+            if segments is not None:
+                self.stats["memory"] += 1
+                return segments
+
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT data FROM primitives WHERE key = ? AND version = ?", (key, self.version)
+                ).fetchone()
+                if row is not None:
+                    segments = self._unpack(row[0])
+                    self.memory[key] = segments
+                    self.stats["disk"] += 1
+                    return segments
+
+            t0 = time.perf_counter()
+            segments = [SampledTrajectory.from_trajectory(seg, self.rate_hz) for seg in self.planner(waypoints)]
+            self.stats["plan_time"] += time.perf_counter() - t0
+            self.stats["planned"] += 1
+            self.memory[key] = segments
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO primitives (key, version, data, created) VALUES (?, ?, ?, ?)",
+                    (key, self.version, self._pack(segments), time.time())
+                )
+                self.db.commit()
+            return segments
+
+    def warm(self, primitives):
+        """
+        Plan (or load) a batch of primitives ahead of time.
+        :param primitives: Iterable of (kind, waypoints)
+        """
+        t0 = time.perf_counter()
+        planned_before = self.stats["planned"]
+        count = 0
+        for kind, waypoints in primitives:
+            try:
+                self.get(kind, waypoints)
+                count += 1
+            except ValueError as e:
+                logger.warning(f"Cannot precompute {kind} {waypoints}: {e}")
+        elapsed = (time.perf_counter() - t0) * 1000
+        logger.info(f"Motion cache warmed: {count} primitives "
+                    f"({self.stats['planned'] - planned_before} planned) in {elapsed:.0f} ms")
+
+    def get_stats(self):
+        """Hit counters and average planning time per miss in milliseconds."""
+        stats = dict(self.stats)
+        stats["entries"] = len(self.memory)
+        stats["avg_plan_ms"] = 1000.0 * stats["plan_time"] / stats["planned"] if stats["planned"] else 0.0
+        return stats
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
@@ -0,0 +1,243 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MotionAborted(Exception):
+    """A running motion job was stopped by cancel() or an emergency stop."""
+
+
+class MotionJob:
+    """
+    Handle for a job submitted to the MotionExecutor, used like a Future:
+    done(), result(timeout), cancel(), add_done_callback().
+    """
+    def __init__(self, name, fn, args, kwargs, estimate=None):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.estimate = estimate        # Planned duration in seconds, for the ETA
+        self.abort = threading.Event()
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self._future = Future()
+
+    def done(self):
+        return self._future.done()
+
+    def running(self):
+        return self.started_at is not None and not self.done()
+
+    def cancelled(self):
+        return self._future.cancelled()
+
+    def result(self, timeout=None):
+        return self._future.result(timeout=timeout)
+
+    def exception(self, timeout=None):
+        return self._future.exception(timeout=timeout)
+
+    def add_done_callback(self, fn):
+        self._future.add_done_callback(lambda _: fn(self))
+
+    def cancel(self):
+        """Drop a queued job, or stop a running one at the next control tick."""
+        if self.done():
+            return False
+        if self._future.cancel():
+            return True
+        self.abort.set()
+        return True
+
+
+class MotionExecutor:
+    """
+    Owns the arm: motion jobs are queued and run one after another, in
+    submission order, on a single worker thread, so the UI loop, vision and
+    the engine never block on servo motion. Progress (job, phase, ETA) is
+    published through get_progress().
+    """
+    def __init__(self, arm_action, name="MotionExecutor"):
+        """
+        :param arm_action: ArmAction whose methods the jobs call (abort= is passed to them)
+        """
+        self.arm_action = arm_action
+        arm_action.on_phase = self._on_phase
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._current = None
+        self._phase = None
+        self._phase_started = 0.0
+        self._phase_planned = None
+        self._estopped = False
+        self._shutdown = False
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "aborted": 0, "cancelled": 0}
+
+        self._thread = threading.Thread(target=self._worker, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, name, fn, *args, estimate=None, **kwargs):
+        """
+        Queue fn(*args, abort=<Event>, **kwargs) behind all earlier jobs.
+        :param name: Label for logs and progress, e.g. "move e7e5"
+        :param estimate: Planned duration in seconds (used for the ETA)
+        :return: MotionJob
+        :raises RuntimeError: after an emergency stop (until reset_estop) or shutdown
+        """
+        job = MotionJob(name, fn, args, kwargs, estimate=estimate)
+        with self._cond:
+            if self._estopped:
+                raise RuntimeError("Emergency stop active, motion refused.")
+            if self._shutdown:
+                raise RuntimeError("Motion executor is shut down.")
+            self._queue.append(job)
+            self.stats["submitted"] += 1
+            self._cond.notify()
+        return job
+
+    def _worker(self):
+        # Only this thread gets the control loop's CPU pinning / realtime priority
+        self.arm_action.manager.control_loop.claim_thread()
+        while True:
+            with self._cond:
+                while not self._queue and not self._shutdown:
+                    self._cond.wait()
+                if self._shutdown and not self._queue:
+                    return
+                job = self._queue.popleft()
+                if not job._future.set_running_or_notify_cancel():
+                    self.stats["cancelled"] += 1
+                    continue
+                self._current = job
+                self._phase = None
+                self._phase_planned = None
+                job.started_at = time.monotonic()
+
+            logger.info(f"Motion job started: {job.name}")
+            try:
+                result = job.fn(*job.args, abort=job.abort, **job.kwargs)
+                if job.abort.is_set():
+                    raise MotionAborted(f"{job.name} aborted")
+            except MotionAborted as e:
+                self.stats["aborted"] += 1
+                logger.warning(f"Motion job aborted: {job.name}")
+                self._resolve(job, exception=e)
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Motion job {job.name} failed: {e}")
+                self._resolve(job, exception=e)
+            else:
+                self.stats["completed"] += 1
+                elapsed = time.monotonic() - job.started_at
+                logger.info(f"Motion job finished: {job.name} in {elapsed:.2f}s")
+                self._resolve(job, result=result)
+
+            with self._cond:
+                self._current = None
+                self._cond.notify_all()
+
+    @staticmethod
+    def _resolve(job, result=None, exception=None):
+        try:
+            if exception is not None:
+                job._future.set_exception(exception)
+            else:
+                job._future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _on_phase(self, phase, planned=None):
+        """Progress hook of the ArmAction (worker thread)."""
+        with self._cond:
+            self._phase = phase
+            self._phase_started = time.monotonic()
+            self._phase_planned = planned
+
+    def cancel(self, job):
+        return job.cancel()
+
+    def emergency_stop(self, release=False):
+        """
+        Stop the running job at the next control tick and drop everything
+        queued. New jobs are refused until reset_estop().
+        :param release: Also cut servo torque (the arm will sag)
+        """
+        with self._cond:
+            self._estopped = True
+        current, queued = self._stop_all()
+        if release:
+            self.arm_action.manager.release_all()
+        logger.warning(f"EMERGENCY STOP: {len(queued)} queued motion(s) dropped"
+                       + (f", {current.name} stopped" if current is not None else ""))
+
+    def _stop_all(self):
+        """Cancel queued jobs, abort the running one and wait for the worker to let go."""
+        with self._cond:
+            current = self._current
+            queued = list(self._queue)
+            self._queue.clear()
+        for job in queued:
+            if job._future.cancel():
+                self.stats["cancelled"] += 1
+        if current is not None:
+            current.abort.set()
+            self.wait_idle()
+        return current, queued
+
+    def reset_estop(self):
+        with self._cond:
+            self._estopped = False
+        logger.info("Emergency stop cleared.")
+
+    def is_estopped(self):
+        return self._estopped
+
+    def is_busy(self):
+        with self._cond:
+            return self._current is not None or bool(self._queue)
+
+    def wait_idle(self, timeout=None):
+        """Block until no job is running or queued. :return: True if idle"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._current is not None or self._queue:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def get_progress(self):
+        """
+        :return: dict with 'job', 'phase', 'eta' (seconds left of the running job,
+                 None if unknown), 'queued' and 'estop'
+        """
+        now = time.monotonic()
+        with self._cond:
+            job = self._current
+            progress = {"job": job.name if job else None, "phase": self._phase, "eta": None,
+                        "queued": len(self._queue), "estop": self._estopped}
+            if job is not None:
+                if job.estimate is not None:
+                    progress["eta"] = max(0.0, job.started_at + job.estimate - now)
+                elif self._phase_planned is not None:
+                    progress["eta"] = max(0.0, self._phase_started + self._phase_planned - now)
+        return progress
+
+    def get_stats(self):
+        return dict(self.stats)
+
+    def shutdown(self, wait=True):
+        """Finish queued jobs (wait=True) or abort everything, then stop the worker."""
+        if not wait:
+            self._stop_all()
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        self._thread.join()
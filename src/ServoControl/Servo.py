@@ -1,5 +1,5 @@
-import time
 from adafruit_motor import servo
+from ServoControl.ControlLoop import ControlLoop
 from Utils.Logger import get_logger
 import numpy as np
 
@@ -9,7 +9,7 @@ class ServoDevice:
     """
     General-purpose servo control base class for a single servo connected to PCA9685.
     """
-    def __init__(self, pca_channels, channel, offset=90, direction=1,min_pulse=500, max_pulse=2400, actuation_range=180):
+    def __init__(self, pca_channels, channel, offset=90, direction=1,min_pulse=500, max_pulse=2400, actuation_range=180, bus=None):
         """
         Initialize the servo
         :param pca_channels: The 'channels' attribute of a PCA9685 object
@@ -18,26 +18,42 @@ class ServoDevice:
         :param min_pulse: Minimum pulse width (default 500)
         :param max_pulse: Maximum pulse width (default 2400)
         :param actuation_range: Total physical range of the servo in degrees (default 180)
+        :param bus: Optional ServoBus; writes are then staged and flushed in blocks instead of per channel
         """
         self.offset = offset
         self.direction = direction
         self.channel_num = channel
-        self.servo = servo.Servo(
-            pca_channels[channel],
-            min_pulse=min_pulse,
-            max_pulse=max_pulse,
-            actuation_range=actuation_range
-        )
+        self.bus = bus
+        self.pulse_config = {"min_pulse": min_pulse, "max_pulse": max_pulse, "actuation_range": actuation_range}
+        if bus is None:
+            self.servo = servo.Servo(
+                pca_channels[channel],
+                min_pulse=min_pulse,
+                max_pulse=max_pulse,
+                actuation_range=actuation_range
+            )
+        else:
+            self.servo = None
         self.current_angle = None
         self.range = actuation_range
         self.min_limit = 0.0     # Physical safety floor
         self.max_limit = 180.0   # Physical safety ceiling
+        self.loop = None         # ControlLoop for smooth_move (shared by the ArmManager)
 
-    def move_to(self, angle):
+    def move_to(self, angle, flush=True):
+        """
+        :param flush: With a bus, write immediately; False leaves the write staged
+                      for the caller's next bus.flush() (one block per control tick)
+        """
         if angle < 0: angle = 0
         if angle > self.range: angle = self.range
 
-        self.servo.angle = angle
+        if self.bus is not None:
+            self.bus.stage_angle(self.channel_num, angle, **self.pulse_config)
+            if flush:
+                self.bus.flush()
+        else:
+            self.servo.angle = angle
         self.current_angle = angle
 
     def move_to_radian(self, radian):
@@ -50,6 +66,9 @@ class ServoDevice:
         Control position using a percentage from 0.0 to 1.0
         """
         if 0.0 <= fraction <= 1.0:
+            if self.bus is not None:
+                self.move_to(fraction * self.range)
+                return
             self.servo.fraction = fraction
             self.current_angle = fraction * self.range
 
@@ -64,14 +83,14 @@ class ServoDevice:
             self.current_angle = target_angle
             return
 
-        start = int(self.current_angle)
-        end = int(target_angle)
-        step = 1 if end > start else -1
-        delay = 1 / speed
-
-        for i in range(start, end + step, step):
-            self.move_to(i)
-            time.sleep(delay)
+        # Linear ramp on the shared control loop: the move takes distance/speed
+        # regardless of how long each write takes
+        start = self.current_angle
+        duration = abs(target_angle - start) / speed
+        if self.loop is None:
+            self.loop = ControlLoop()
+        self.loop.run(duration, lambda t: self.move_to(
+            start + (target_angle - start) * (t / duration if duration > 0 else 1.0)))
 
     def init_to(self, angle, speed=50):
         """
@@ -94,5 +113,9 @@ class ServoDevice:
         Release the servo (stop sending PWM signals)
         This reduces heat and jitter noise, but the servo will no longer hold its position
         """
-        self.servo.angle = None
+        if self.bus is not None:
+            self.bus.stage_angle(self.channel_num, None)
+            self.bus.flush()
+        else:
+            self.servo.angle = None
         self.current_angle = None
@@ -0,0 +1,150 @@
+import abc
+import time
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+# PCA9685 registers
+MODE1 = 0x00
+MODE1_AI = 0x20        # Register auto-increment
+LED0_ON_L = 0x06       # 4 registers per channel: ON_L, ON_H, OFF_L, OFF_H
+FULL_OFF = 0x1000      # OFF_H bit 4: output off (servo released)
+
+
+def angle_to_counts(angle, frequency=50, min_pulse=500, max_pulse=2400, actuation_range=180):
+    """
+    12-bit PCA9685 OFF count for a servo angle, rounded exactly like
+    adafruit_motor.servo + adafruit_pca9685 so the bus drives the same pulses.
+    None releases the servo.
+    """
+    if angle is None:
+        return FULL_OFF
+    min_duty = int((min_pulse * frequency) / 1000000 * 0xFFFF)
+    max_duty = (max_pulse * frequency) / 1000000 * 0xFFFF
+    duty_range = int(max_duty - min_duty)
+    fraction = min(max(angle / actuation_range, 0.0), 1.0)
+    duty_cycle = min_duty + int(fraction * duty_range)
+    return (duty_cycle + 1) >> 4
+
+
+class ServoBus(abc.ABC):
+    """
+    Collects the channel targets of one control tick and writes only the
+    channels whose duty count changed, as few auto-increment block writes as
+    possible (one when the changed channels are contiguous or separated only
+    by channels with a known value).
+    """
+    def __init__(self, frequency=50):
+        self.frequency = frequency
+        self.pending = {}
+        self.last = {}
+        self.stats = {"flushes": 0, "transactions": 0, "channel_writes": 0, "skipped": 0, "bytes": 0}
+
+    def mark_idle(self, channels):
+        """
+        Channels nothing else drives: they hold the power-on state (full off), so
+        block writes may span them instead of splitting around them.
+        """
+        for channel in channels:
+            self.last.setdefault(channel, FULL_OFF)
+
+    def stage(self, channel, counts):
+        """Set the OFF count a channel should have after the next flush."""
+        self.pending[channel] = counts
+
+    def stage_angle(self, channel, angle, **pulse_config):
+        self.stage(channel, angle_to_counts(angle, self.frequency, **pulse_config))
+
+    def _blocks(self, changed):
+        """Group changed channels into runs; gaps are bridged with the last written value."""
+        blocks = []
+        for channel in sorted(changed):
+            if blocks:
+                start, values = blocks[-1]
+                gap = range(start + len(values), channel)
+                if all(ch in self.last for ch in gap):
+                    values.extend(self.last[ch] for ch in gap)
+                    values.append(changed[channel])
+                    continue
+            blocks.append((channel, [changed[channel]]))
+        return blocks
+
+    def flush(self):
+        """
+        Write all staged channels that changed.
+        :return: Number of bus transactions
+        """
+        changed = {ch: c for ch, c in self.pending.items() if self.last.get(ch) != c}
+        self.stats["skipped"] += len(self.pending) - len(changed)
+        self.pending = {}
+        if not changed:
+            return 0
+
+        blocks = self._blocks(changed)
+        for start, values in blocks:
+            payload = bytearray([LED0_ON_L + 4 * start])
+            for counts in values:
+                if counts == FULL_OFF:
+                    payload += bytes([0, 0, 0, FULL_OFF >> 8])
+                else:
+                    payload += bytes([0, 0, counts & 0xFF, counts >> 8])
+            self._write(payload)
+            self.stats["transactions"] += 1
+            self.stats["bytes"] += len(payload)
+
+        self.last.update(changed)
+        self.stats["flushes"] += 1
+        self.stats["channel_writes"] += len(changed)
+        return len(blocks)
+
+    @abc.abstractmethod
+    def _write(self, payload):
+        """Send one register block: payload[0] is the start register, the rest its bytes."""
+
+    def get_stats(self):
+        return dict(self.stats)
+
+
+class PCA9685Bus(ServoBus):
+    """ServoBus on a real adafruit_pca9685.PCA9685 (frequency already set)."""
+    def __init__(self, pca):
+        super().__init__(frequency=pca.frequency)
+        self.pca = pca
+        # Setting the frequency enables auto-increment already; make sure of it
+        mode1 = pca.mode1_reg
+        if not mode1 & MODE1_AI:
+            pca.mode1_reg = mode1 | MODE1_AI
+        logger.info(f"PCA9685 servo bus ready ({self.frequency:.1f} Hz, auto-increment on)")
+
+    def _write(self, payload):
+        with self.pca.i2c_device as i2c:
+            i2c.write(payload)
+
+
+class MemoryBus(ServoBus):
+    """
+    Stand-in bus without hardware: keeps the register file and a log of
+    every transaction, so bus load can be measured and checked in tests.
+    """
+    def __init__(self, frequency=50, clock=time.monotonic):
+        super().__init__(frequency=frequency)
+        self.clock = clock
+        self.registers = bytearray(256)
+        for channel in range(16):
+            # Power-on state: every output full off
+            self.registers[LED0_ON_L + 4 * channel + 3] = FULL_OFF >> 8
+        self.traffic = []   # (time, start register, payload length)
+
+    def _write(self, payload):
+        register = payload[0]
+        self.registers[register:register + len(payload) - 1] = payload[1:]
+        self.traffic.append((self.clock(), register, len(payload)))
+
+    def channel_counts(self, channel):
+        """OFF count currently in the registers of a channel."""
+        base = LED0_ON_L + 4 * channel
+        return self.registers[base + 2] | (self.registers[base + 3] << 8)
+
+    def reset_traffic(self):
+        self.traffic = []
+        self.stats = {key: 0 for key in self.stats}
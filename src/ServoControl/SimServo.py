@@ -0,0 +1,349 @@
+import csv
+import json
+import time
+import threading
+from contextlib import contextmanager
+from Utils.Logger import get_logger
+from ServoControl.ServoBus import MODE1, LED0_ON_L, FULL_OFF
+
+logger = get_logger(__name__)
+
+# Unloaded MG996R-class servo at 5-6V: about 0.17s per 60 deg
+DEFAULT_SLEW_RATE = 350.0
+
+# A short game with castling on both sides, captures and recaptures
+DEFAULT_GAME = ("e2e4 e7e5 g1f3 b8c6 f1c4 g8f6 d2d3 f8c5 e1g1 d7d6 c2c3 e8g8 "
+                "b2b4 c5b6 a2a4 a7a6 c1g5 h7h6 g5f6 d8f6 c4d5 c6e7 d5b7 c8b7").split()
+
+
+class VirtualClock:
+    """
+    Simulated monotonic time for offline runs. sleep() advances the clock at
+    once (speedup=None) or after delay / speedup real seconds, so a motion
+    runs faster than real time with the same timing as on the arm.
+    Meant to be driven by one motion thread.
+    """
+    def __init__(self, start=0.0, speedup=None):
+        self.now = start
+        self.speedup = speedup
+        self.lock = threading.Lock()
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        if self.speedup:
+            time.sleep(seconds / self.speedup)
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+
+class SimServoModel:
+    """
+    One hobby servo: the horn follows the commanded pulse at a limited slew
+    rate. Position is unknown until the first pulse and again after release.
+    """
+    def __init__(self, slew_rate=DEFAULT_SLEW_RATE, min_pulse=500, max_pulse=2400, actuation_range=180):
+        self.slew_rate = slew_rate
+        self.min_pulse = min_pulse
+        self.max_pulse = max_pulse
+        self.actuation_range = actuation_range
+        self.commanded = None
+        self._t = 0.0
+        self._angle = None     # Modeled angle at self._t
+
+    def pulse_to_angle(self, pulse_us):
+        fraction = (pulse_us - self.min_pulse) / (self.max_pulse - self.min_pulse)
+        return min(max(fraction, 0.0), 1.0) * self.actuation_range
+
+    def position(self, t):
+        """Modeled angle at time t (not before the last command)."""
+        if self._angle is None or self.commanded is None:
+            return self._angle
+        step = self.slew_rate * max(0.0, t - self._t)
+        error = self.commanded - self._angle
+        return self.commanded if abs(error) <= step else self._angle + (step if error > 0 else -step)
+
+    def command(self, t, angle):
+        """New target at time t (None = pulses off). :return: Modeled angle at t"""
+        current = self.position(t)
+        self._t = t
+        if angle is None:
+            # Released: the horn is pushed around by the load, position unknown
+            self._angle = None
+        elif current is None:
+            self._angle = angle
+        else:
+            self._angle = current
+        self.commanded = angle
+        return current
+
+
+class SimChannel:
+    """PWM output of one SimPCA9685 channel, used by adafruit_motor.servo.Servo like a PCA9685 channel."""
+    def __init__(self, pca, index):
+        self._pca = pca
+        self._index = index
+
+    @property
+    def frequency(self):
+        return self._pca.frequency
+
+    @frequency.setter
+    def frequency(self, _):
+        raise AttributeError("frequency cannot be set on individual channels")
+
+    @property
+    def duty_cycle(self):
+        on, off = self._pca.pwm_regs[self._index]
+        if on == 0x1000:
+            return 0xFFFF
+        return off << 4
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        if not 0 <= value <= 0xFFFF:
+            raise ValueError(f"Out of range: value {value} not 0 <= value <= 65,535")
+        # Same rounding as adafruit_pca9685
+        if value == 0xFFFF:
+            self._pca.set_pwm(self._index, 0x1000, 0)
+        else:
+            self._pca.set_pwm(self._index, 0, (value + 1) >> 4)
+
+
+class _SimI2CDevice:
+    def __init__(self, pca):
+        self._pca = pca
+
+    def write(self, buf, *, start=0, end=None):
+        self._pca._write_registers(bytes(buf[start:end]))
+
+
+class SimPCA9685:
+    """
+    Drop-in stand-in for adafruit_pca9685.PCA9685 with a servo on every
+    channel: `channels` for adafruit_motor.servo.Servo, and `i2c_device`,
+    `frequency`, `mode1_reg` for PCA9685Bus block writes. Every pulse change
+    is recorded with the commanded and the modeled servo angle, so motions
+    can be timed and compared without the Pi and the arm.
+    """
+    def __init__(self, clock=time.monotonic, frequency=50, slew_rate=DEFAULT_SLEW_RATE, servo_config=None):
+        """
+        :param clock: Time source for the timeline (VirtualClock.monotonic for virtual time)
+        :param frequency: PWM frequency in Hz
+        :param slew_rate: Servo speed in deg/s for every channel
+        :param servo_config: Optional {channel: dict(slew_rate, min_pulse, max_pulse, actuation_range)}
+        """
+        self.clock = clock
+        self.mode1_reg = 0x11           # Power-on: SLEEP | ALLCALL
+        self._frequency = None
+        self.frequency = frequency
+        self.pwm_regs = [(0, FULL_OFF)] * 16
+        self.servos = []
+        for channel in range(16):
+            cfg = {"slew_rate": slew_rate}
+            cfg.update((servo_config or {}).get(channel, {}))
+            self.servos.append(SimServoModel(**cfg))
+        self.channels = [SimChannel(self, i) for i in range(16)]
+        self._device = _SimI2CDevice(self)
+        self.timeline = []              # (time, channel, commanded angle, modeled angle)
+        self.channel_stats = {}         # Running per-channel counters behind summary()
+        self.stats = {"pwm_writes": 0, "i2c_transactions": 0, "i2c_bytes": 0}
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, freq):
+        self._frequency = float(freq)
+        # Like the chip after a prescale change: awake, restart and auto-increment set
+        self.mode1_reg = (self.mode1_reg & ~0x10) | 0xA0
+
+    @property
+    @contextmanager
+    def i2c_device(self):
+        yield self._device
+
+    def _write_registers(self, payload):
+        """Decode a register write (MODE1 or LEDn blocks, auto-increment)."""
+        self.stats["i2c_transactions"] += 1
+        self.stats["i2c_bytes"] += len(payload)
+        register, data = payload[0], payload[1:]
+        if register == MODE1 and data:
+            self.mode1_reg = data[0]
+            return
+        if register < LED0_ON_L or (register - LED0_ON_L) % 4:
+            logger.warning(f"SimPCA9685: unaligned register write at 0x{register:02x} ignored")
+            return
+        first = (register - LED0_ON_L) // 4
+        for i in range(len(data) // 4):
+            on_l, on_h, off_l, off_h = data[4 * i:4 * i + 4]
+            self.set_pwm(first + i, on_l | (on_h << 8), off_l | (off_h << 8))
+
+    def _angle(self, channel, on, off):
+        """Commanded servo angle from a channel's registers (None = no pulses)."""
+        if off & FULL_OFF or on & 0x1000 or off == 0:
+            return None
+        pulse_us = (off - on) / 4096 * 1e6 / self.frequency
+        return self.servos[channel].pulse_to_angle(pulse_us)
+
+    def set_pwm(self, channel, on, off):
+        if self.pwm_regs[channel] == (on, off):
+            return
+        self.pwm_regs[channel] = (on, off)
+        self.stats["pwm_writes"] += 1
+        now = self.clock()
+        commanded = self._angle(channel, on, off)
+        modeled = self.servos[channel].command(now, commanded)
+        self.timeline.append((now, channel, commanded, modeled))
+
+        entry = self.channel_stats.setdefault(channel, {"writes": 0, "max_lag": 0.0})
+        entry["writes"] += 1
+        if commanded is not None and modeled is not None:
+            entry["max_lag"] = max(entry["max_lag"], abs(commanded - modeled))
+
+    def position(self, channel, t=None):
+        """Modeled angle of a channel's servo now (or at time t, not before its last command)."""
+        return self.servos[channel].position(self.clock() if t is None else t)
+
+    def reset_timeline(self):
+        self.timeline = []
+        self.reset_summary()
+
+    def reset_summary(self):
+        """Start a new summary window (e.g. per turn); the timeline is kept."""
+        self.channel_stats = {}
+
+    def sample_timeline(self, rate_hz=100, channels=None, start=None, end=None):
+        """
+        Commanded and modeled angle of each channel at a fixed rate.
+        :return: List of (time, channel, commanded, modeled)
+        """
+        channels = sorted({ch for _, ch, _, _ in self.timeline}) if channels is None else channels
+        if not self.timeline:
+            return []
+        start = self.timeline[0][0] if start is None else start
+        end = self.clock() if end is None else end
+        rows = []
+        for channel in channels:
+            events = [e for e in self.timeline if e[1] == channel]
+            model = SimServoModel(slew_rate=self.servos[channel].slew_rate)
+            i = 0
+            n = 0
+            t = start
+            while t <= end:
+                while i < len(events) and events[i][0] <= t:
+                    model.commanded, model._t, model._angle = events[i][2], events[i][0], events[i][3]
+                    if model._angle is None and model.commanded is not None:
+                        model._angle = model.commanded
+                    i += 1
+                rows.append((t, channel, model.commanded, model.position(t)))
+                n += 1
+                t = start + n / rate_hz
+        rows.sort(key=lambda row: (row[0], row[1]))
+        return rows
+
+    def summary(self):
+        """
+        Per channel since the last reset_summary(): number of pulse changes, largest
+        lag of the servo behind a new command (deg) and the longest time it needed
+        to reach a command from there (s). The last command of every motion
+        segment counts, so "settle" bounds how long the arm was still moving after
+        the motion code considered a waypoint reached.
+        """
+        return {channel: dict(entry, settle=entry["max_lag"] / self.servos[channel].slew_rate)
+                for channel, entry in self.channel_stats.items()}
+
+    def export_csv(self, path, rate_hz=None):
+        """Write the timeline (every pulse change, or sampled at rate_hz) as CSV."""
+        rows = self.timeline if rate_hz is None else self.sample_timeline(rate_hz)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["time", "channel", "commanded", "modeled"])
+            for t, channel, commanded, modeled in rows:
+                writer.writerow([f"{t:.6f}", channel,
+                                 "" if commanded is None else f"{commanded:.3f}",
+                                 "" if modeled is None else f"{modeled:.3f}"])
+        return len(rows)
+
+    def export_json(self, path, rate_hz=None):
+        """Write the timeline, slew rates and summary as JSON."""
+        rows = self.timeline if rate_hz is None else self.sample_timeline(rate_hz)
+        data = {
+            "frequency": self.frequency,
+            "slew_rates": {ch: self.servos[ch].slew_rate for ch in sorted({r[1] for r in rows})},
+            "summary": self.summary(),     # Since the last reset_summary()
+            "stats": dict(self.stats),
+            "timeline": [{"t": t, "channel": ch, "commanded": c, "modeled": m} for t, ch, c, m in rows],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+        return len(rows)
+
+    def get_stats(self):
+        return dict(self.stats)
+
+    def deinit(self):
+        pass
+
+
+def benchmark_game(moves=DEFAULT_GAME, side="black", speedup=None, use_bus=True, export=None):
+    """
+    Play a game's moves with the arm on a SimPCA9685 and report planned vs.
+    simulated time per turn. Every move is executed as a robot turn.
+    :param speedup: None = virtual time (as fast as possible), else times faster than real time
+    :param use_bus: Block writes through PCA9685Bus (else per-channel writes via adafruit_motor)
+    :param export: Path prefix for <prefix>.csv and <prefix>.json timelines
+    :return: List of dicts per move
+    """
+    import chess
+    from ServoControl.ServoBus import PCA9685Bus
+    from ServoControl.ArmActions import ArmAction
+
+    clock = VirtualClock(speedup=speedup)
+    pca = SimPCA9685(clock=clock.monotonic)
+    bus = PCA9685Bus(pca) if use_bus else None
+    arm = ArmAction(pca.channels, bus=bus, clock=clock.monotonic, sleep=clock.sleep)
+    arm.initialize()
+    arm.rest()
+
+    board = chess.Board()
+    results = []
+    wall = time.perf_counter()
+    for uci in moves:
+        plan = arm.turn_planner.plan_move(board, uci, side=side)
+        pca.reset_summary()
+        t0 = clock.monotonic()
+        ok = arm.execute_turn(plan)
+        elapsed = clock.monotonic() - t0
+        board.push_uci(uci)
+        settle = max((entry["settle"] for entry in pca.summary().values()), default=0.0)
+        results.append({"uci": uci, "ok": ok, "pieces": len(plan.tasks),
+                        "planned": plan.duration, "simulated": elapsed, "settle": settle})
+    wall = time.perf_counter() - wall
+
+    for r in results:
+        print(f"{r['uci']:6s} {r['pieces']} piece(s)  planned {r['planned']:6.2f}s  "
+              f"simulated {r['simulated']:6.2f}s  servo settle {r['settle'] * 1000:5.1f} ms"
+              + ("" if r["ok"] else "  FAILED"))
+    total = sum(r["simulated"] for r in results)
+    print(f"{len(results)} turns: {total:.1f}s of arm time simulated in {wall:.1f}s "
+          f"({total / wall:.0f}x real time), {pca.stats['i2c_transactions']} I2C transactions")
+    print(f"Control loop (last turn): {arm.manager.control_loop.get_stats()}")
+
+    if export:
+        pca.export_csv(f"{export}.csv")
+        pca.export_json(f"{export}.json", rate_hz=50)
+        print(f"Timeline written to {export}.csv / {export}.json")
+    arm.motion_cache.close()
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_game(export="cache/sim_timeline")
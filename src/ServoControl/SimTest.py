@@ -0,0 +1,83 @@
+# Offline motion check: robot turns on the simulated PCA9685 in virtual time
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chess
+from ServoControl.SimServo import VirtualClock, SimPCA9685
+from ServoControl.ServoBus import PCA9685Bus
+from ServoControl.ArmActions import ArmAction
+
+# Planned and simulated turn time may differ by this much (control loop ticks, gripper waits)
+TOLERANCE_ABS = 0.05
+TOLERANCE_REL = 0.01
+MAX_SETTLE = 0.02
+
+# Position before the move, move, pieces the arm has to carry
+TURNS = [
+    ("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1", "e7e5", 1),
+    ("rnbqkbnr/pppp1ppp/8/4p3/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 2", "e5d4", 2),      # capture
+    ("rnbqk2r/pppp1ppp/5n2/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 4 4", "e8g8", 2),  # castling
+]
+
+
+def sim_test():
+    failures = 0
+    clock = VirtualClock()
+    pca = SimPCA9685(clock=clock.monotonic)
+    arm = ArmAction(pca.channels, bus=PCA9685Bus(pca), clock=clock.monotonic, sleep=clock.sleep)
+    arm.initialize()
+    arm.rest()
+
+    print("\n===== Planned vs simulated turn time =====")
+    wall = time.perf_counter()
+    simulated_total = 0.0
+    try:
+        for fen, uci, pieces in TURNS:
+            board = chess.Board(fen)
+            plan = arm.turn_planner.plan_move(board, uci, side="black", from_rest=True)
+            pca.reset_summary()
+            t0 = clock.monotonic()
+            ok = arm.execute_turn(plan)
+            simulated = clock.monotonic() - t0
+            simulated_total += simulated
+
+            tolerance = max(TOLERANCE_ABS, TOLERANCE_REL * plan.duration)
+            settle = max((entry["settle"] for entry in pca.summary().values()), default=0.0)
+            passed = (ok and len(plan.tasks) == pieces and abs(simulated - plan.duration) <= tolerance
+                      and settle <= MAX_SETTLE)
+            failures += not passed
+            print(f"{'PASS' if passed else 'FAIL'}  {uci}: {len(plan.tasks)} piece(s), planned {plan.duration:.3f}s, "
+                  f"simulated {simulated:.3f}s (+-{tolerance:.3f}s), settle {settle * 1000:.1f} ms"
+                  + ("" if ok else ", execute_turn failed"))
+
+        print("\n===== Back at rest =====")
+        rest = arm.manager.rest_servo_angles()
+        now = clock.monotonic()
+        for servo, angle in zip(arm.manager.servos, rest):
+            modeled = pca.position(servo.channel_num, now)
+            # The bus writes whole duty counts: about 0.1 deg per count at 50 Hz
+            passed = modeled is not None and abs(modeled - angle) < 0.5
+            failures += not passed
+            print(f"{'PASS' if passed else 'FAIL'}  channel {servo.channel_num}: modeled "
+                  f"{'released' if modeled is None else f'{modeled:.2f}'} deg, rest {angle:.2f} deg")
+
+        print("\n===== Timeline =====")
+        times = [t for t, _, _, _ in pca.timeline]
+        passed = len(times) > 0 and all(a <= b for a, b in zip(times, times[1:]))
+        failures += not passed
+        print(f"{'PASS' if passed else 'FAIL'}  {len(times)} pulse changes in time order")
+
+        wall = time.perf_counter() - wall
+        print(f"      {simulated_total:.1f}s of arm time in {wall:.2f}s wall time")
+    finally:
+        arm.motion_cache.close()
+
+    print(f"\n{failures} failure(s)")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if sim_test() else 1)
@@ -0,0 +1,201 @@
+import numpy as np
+
+# Jerk-limited (7-segment S-curve) joint trajectories.
+# All joints move along one straight line in joint space with a shared,
+# normalized time law s(t) in [0, 1], so they start and arrive together.
+# The limits of s are the tightest joint limits divided by that joint's
+# travel, which makes the profile time-optimal for the synchronized move.
+
+DEFAULT_LIMITS = {"max_velocity": 120.0, "max_acceleration": 400.0, "max_jerk": 2400.0}
+
+
+class SCurve:
+    """
+    Rest-to-rest S-curve for a distance D with velocity, acceleration and
+    jerk limits. Segments: jerk +J, 0, -J, cruise, -J, 0, +J.
+    """
+    def __init__(self, distance, v_max, a_max, j_max):
+        self.distance = float(distance)
+        D, V, A, J = self.distance, float(v_max), float(a_max), float(j_max)
+
+        if D <= 0:
+            self.durations = np.zeros(7)
+            self.jerks = np.zeros(7)
+            self.duration = 0.0
+            self.v_peak = self.a_peak = 0.0
+            return
+
+        # Accel phase that reaches V (with or without a constant-acceleration part)
+        if V * J >= A * A:
+            tj, ta = A / J, A / J + V / A
+        else:
+            tj = np.sqrt(V / J)
+            ta = 2 * tj
+        v_peak = V
+        tv = D / V - ta
+
+        if tv < 0:
+            # V is never reached: largest peak velocity that still fits in D
+            tv = 0.0
+            v_peak = (-A * A / J + np.sqrt((A * A / J) ** 2 + 4 * A * D)) / 2
+            if v_peak >= A * A / J:
+                tj, ta = A / J, A / J + v_peak / A
+            else:
+                # Not even A is reached: pure jerk phases
+                tj = (D / (2 * J)) ** (1.0 / 3.0)
+                ta = 2 * tj
+                v_peak = J * tj * tj
+
+        tc = max(0.0, ta - 2 * tj)
+        self.durations = np.array([tj, tc, tj, tv, tj, tc, tj])
+        self.jerks = np.array([J, 0.0, -J, 0.0, -J, 0.0, J])
+        self.duration = float(self.durations.sum())
+        self.v_peak = v_peak
+        self.a_peak = J * tj
+
+        # Start state (pos, vel, acc) of every segment, and a final scale so the
+        # profile lands exactly on D despite rounding
+        states = np.zeros((8, 3))
+        for k in range(7):
+            states[k + 1] = self._advance(states[k], self.jerks[k], self.durations[k])
+        self.starts = np.concatenate([[0.0], np.cumsum(self.durations)])
+        self.states = states
+        self._scale = D / states[7, 0] if states[7, 0] > 0 else 1.0
+
+    @staticmethod
+    def _advance(state, jerk, dt):
+        p, v, a = state
+        return np.array([
+            p + v * dt + a * dt ** 2 / 2 + jerk * dt ** 3 / 6,
+            v + a * dt + jerk * dt ** 2 / 2,
+            a + jerk * dt,
+        ])
+
+    def evaluate(self, t):
+        """
+        Position, velocity and acceleration at time(s) t (clamped to [0, duration]).
+        :return: (p, v, a) arrays shaped like t
+        """
+        t = np.clip(np.asarray(t, dtype=float), 0.0, self.duration)
+        if self.duration == 0.0:
+            zeros = np.zeros_like(t)
+            return zeros + self.distance, zeros, zeros
+
+        k = np.clip(np.searchsorted(self.starts, t, side="right") - 1, 0, 6)
+        dt = t - self.starts[k]
+        p0, v0, a0 = self.states[k, 0], self.states[k, 1], self.states[k, 2]
+        j = self.jerks[k]
+        p = p0 + v0 * dt + a0 * dt ** 2 / 2 + j * dt ** 3 / 6
+        v = v0 + a0 * dt + j * dt ** 2 / 2
+        a = a0 + j * dt
+        return p * self._scale, v * self._scale, a * self._scale
+
+
+class JointTrajectory:
+    """
+    Synchronized S-curve move from start to target joint angles (degrees).
+    """
+    def __init__(self, start, target, limits):
+        """
+        :param start: Current angles, one per joint
+        :param target: Target angles, one per joint
+        :param limits: One dict per joint with max_velocity (deg/s),
+                       max_acceleration (deg/s^2) and max_jerk (deg/s^3)
+        """
+        self.start = np.asarray(start, dtype=float)
+        self.target = np.asarray(target, dtype=float)
+        self.delta = self.target - self.start
+
+        travel = np.abs(self.delta)
+        moving = travel > 1e-9
+        if not moving.any():
+            self.profile = SCurve(0.0, 1.0, 1.0, 1.0)
+        else:
+            v = np.array([lim["max_velocity"] for lim in limits], dtype=float)
+            a = np.array([lim["max_acceleration"] for lim in limits], dtype=float)
+            j = np.array([lim["max_jerk"] for lim in limits], dtype=float)
+            # Normalized limits: the joint with the least headroom sets the pace
+            self.profile = SCurve(1.0, (v[moving] / travel[moving]).min(),
+                                  (a[moving] / travel[moving]).min(),
+                                  (j[moving] / travel[moving]).min())
+
+    @property
+    def duration(self):
+        return self.profile.duration
+
+    def sample(self, t):
+        """Joint angles at time t; a scalar t gives one row, an array of n times an (n, joints) array."""
+        s, _, _ = self.profile.evaluate(t)
+        return self.start + np.multiply.outer(s, self.delta)
+
+    def sample_times(self, rate_hz=50.0):
+        """Angles at a fixed control rate, including the exact end point: (times, angles)."""
+        if self.duration == 0.0:
+            return np.zeros(1), self.target[None, :].copy()
+        n = int(np.ceil(self.duration * rate_hz))
+        times = np.minimum(np.arange(1, n + 1) / rate_hz, self.duration)
+        return times, self.sample(times)
+
+
+class SampledTrajectory:
+    """
+    A planned trajectory stored as angle samples (e.g. loaded from the motion
+    cache); linear interpolation between samples.
+    """
+    def __init__(self, times, angles):
+        """
+        :param times: (n,) increasing times starting at 0
+        :param angles: (n, joints) angles at those times
+        """
+        self.times = np.asarray(times, dtype=float)
+        self.angles = np.asarray(angles, dtype=float)
+
+    @classmethod
+    def from_trajectory(cls, trajectory, rate_hz=50.0):
+        """Sample any trajectory with duration/sample() at the control rate, both end points included."""
+        times = np.append(np.arange(0.0, trajectory.duration, 1.0 / rate_hz), trajectory.duration)
+        return cls(times, trajectory.sample(times))
+
+    @property
+    def duration(self):
+        return float(self.times[-1])
+
+    @property
+    def target(self):
+        return self.angles[-1]
+
+    def sample(self, t):
+        """Joint angles at time t; an array of n times gives an (n, joints) array."""
+        return np.stack([np.interp(t, self.times, self.angles[:, j]) for j in range(self.angles.shape[1])],
+                        axis=-1)
+
+
+def check_limits(times, angles, limits, tolerance=1.05):
+    """
+    Finite-difference check of sampled angles (e.g. recorded from a simulated
+    servo backend) against per-joint limits.
+    :return: List of (joint, quantity, observed peak, limit) violations
+    """
+    times = np.asarray(times, dtype=float)
+    angles = np.asarray(angles, dtype=float)
+    violations = []
+    if len(times) < 4:
+        return violations
+
+    dt = np.diff(times)
+    vel = np.diff(angles, axis=0) / dt[:, None]
+    acc = np.diff(vel, axis=0) / dt[1:, None]
+    for joint, lim in enumerate(limits):
+        for name, series, key in (("velocity", vel, "max_velocity"), ("acceleration", acc, "max_acceleration")):
+            peak = float(np.abs(series[:, joint]).max())
+            if peak > lim[key] * tolerance:
+                violations.append((joint, name, peak, lim[key]))
+    return violations
+
+
+def load_limits(servo_configs, joints=4):
+    """Per-joint limits from the armconfig.json servo entries (defaults for missing keys)."""
+    limits = []
+    for cfg in servo_configs[:joints]:
+        limits.append({key: float(cfg.get(key, default)) for key, default in DEFAULT_LIMITS.items()})
+    return limits
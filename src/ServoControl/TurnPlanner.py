@@ -0,0 +1,162 @@
+import itertools
+import chess
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PieceTask:
+    """One physical pick-and-place: the piece on `source` goes to `target` (None = capture bin)."""
+    def __init__(self, role, source, target=None):
+        """
+        :param role: "move", "capture", "rook" (castling) or "en_passant"
+        :param source: Square name, e.g. "e7"
+        :param target: Square name, or None for the capture bin
+        """
+        self.role = role
+        self.source = source
+        self.target = target
+
+    @property
+    def kind(self):
+        """Motion primitive that carries the piece."""
+        return "drop" if self.target is None else "transfer"
+
+    def __repr__(self):
+        return f"{self.role} {self.source}->{self.target or 'bin'}"
+
+
+class TurnPlan:
+    """
+    The robot's whole turn as ordered pick-and-place tasks, executed by
+    ArmAction.execute_turn as one motion with a single return to rest.
+    """
+    def __init__(self, uci, tasks, legs, duration, notes=()):
+        """
+        :param tasks: PieceTasks in execution order
+        :param legs: (kind, start_coords, end_coords) per task, capture-bin slots assigned
+        :param duration: Planned seconds from the start pose back to rest
+        :param notes: Things the arm cannot do and a human must (promotions)
+        """
+        self.uci = uci
+        self.tasks = tasks
+        self.legs = legs
+        self.duration = duration
+        self.notes = list(notes)
+
+    @property
+    def drops(self):
+        return sum(1 for task in self.tasks if task.target is None)
+
+    def __repr__(self):
+        return f"TurnPlan({self.uci}: {', '.join(map(repr, self.tasks))}, {self.duration:.2f}s)"
+
+
+class TurnPlanner:
+    """
+    Turns a chess move into the pieces the arm has to carry (captured piece,
+    en passant victim, castling rook, the moving piece) and orders them for
+    the shortest total motion time, as planned by the arm's motion cache.
+    """
+    def __init__(self, arm_action):
+        """
+        :param arm_action: ArmAction providing coordinates and time estimates
+        """
+        self.arm_action = arm_action
+        self.stats = {"plans": 0, "reordered": 0}
+
+    def tasks_for_move(self, board, move):
+        """
+        :param board: chess.Board BEFORE the move is pushed
+        :param move: chess.Move or UCI string
+        :return: (tasks, notes)
+        """
+        if isinstance(move, str):
+            move = chess.Move.from_uci(move)
+        source = chess.square_name(move.from_square)
+        target = chess.square_name(move.to_square)
+        tasks = [PieceTask("move", source, target)]
+        notes = []
+
+        if board.is_en_passant(move):
+            victim = chess.square(chess.square_file(move.to_square), chess.square_rank(move.from_square))
+            tasks.append(PieceTask("en_passant", chess.square_name(victim)))
+        elif board.is_capture(move):
+            tasks.append(PieceTask("capture", target))
+
+        if board.is_castling(move):
+            rank = chess.square_rank(move.from_square)
+            if board.is_kingside_castling(move):
+                rook_from, rook_to = chess.square(7, rank), chess.square(5, rank)
+            else:
+                rook_from, rook_to = chess.square(0, rank), chess.square(3, rank)
+            tasks.append(PieceTask("rook", chess.square_name(rook_from), chess.square_name(rook_to)))
+
+        if move.promotion:
+            # There are no spare pieces within reach: the pawn is carried and swapped by hand
+            piece = chess.piece_name(move.promotion)
+            notes.append(f"Promotion on {target}: replace the pawn with a {piece}.")
+        return tasks, notes
+
+    def tasks_for_uci(self, uci, capture=False):
+        """Tasks of a plain move or capture when no board is at hand."""
+        tasks = [PieceTask("move", uci[:2], uci[2:4])]
+        if capture:
+            tasks.append(PieceTask("capture", uci[2:4]))
+        return tasks
+
+    @staticmethod
+    def is_valid_order(tasks):
+        """A piece may only be placed on a square no later task still has to pick from."""
+        return all(earlier.target != later.source
+                   for i, earlier in enumerate(tasks) for later in tasks[i + 1:])
+
+    def _legs(self, tasks, side):
+        """(kind, start_coords, end_coords) per task; drops get the next free capture slots in order."""
+        board = self.arm_action.board
+        legs = []
+        drops = 0
+        for task in tasks:
+            start = board.get_slot_coords(side, task.source)
+            if task.target is None:
+                end = board.peek_capture_slot(drops)
+                drops += 1
+            else:
+                end = board.get_slot_coords(side, task.target)
+            legs.append((task.kind, start, end))
+        return legs
+
+    def plan(self, tasks, side="white", uci=None, notes=(), from_rest=False):
+        """
+        Pick the fastest valid order of the tasks.
+        :param from_rest: Time the plan from the rest pose instead of the arm's current pose
+        :return: TurnPlan
+        :raises ValueError: if no order is valid or a square is unreachable
+        """
+        manager = self.arm_action.manager
+        start_angles = manager.rest_servo_angles() if from_rest else None
+
+        best = None
+        for order in itertools.permutations(tasks):
+            if not self.is_valid_order(order):
+                continue
+            legs = self._legs(order, side)
+            duration = self.arm_action.estimate_legs_time(legs, start_angles=start_angles)
+            if best is None or duration < best[2]:
+                best = (list(order), legs, duration)
+        if best is None:
+            raise ValueError(f"No valid order for {tasks}")
+
+        order, legs, duration = best
+        self.stats["plans"] += 1
+        if order != list(tasks):
+            self.stats["reordered"] += 1
+        return TurnPlan(uci, order, legs, duration, notes)
+
+    def plan_move(self, board, uci, side="white", from_rest=False):
+        """Plan a chess move on the position before it (see tasks_for_move)."""
+        tasks, notes = self.tasks_for_move(board, uci)
+        return self.plan(tasks, side=side, uci=uci, notes=notes, from_rest=from_rest)
+
+    def get_stats(self):
+        return dict(self.stats)
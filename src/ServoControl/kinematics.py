@@ -1,4 +1,5 @@
 # Usage example: angles, status = solve_ik(*target)
+#                angles, ok = solve_ik_batch(targets)  # (n, 3) array
 
 import numpy as np
 from Utils.Logger import get_logger
@@ -82,13 +83,61 @@ def solve_ik(target_x, target_y, target_z):
             break
 
     if best_solution:
-        get_logger(__name__).info(f"Coordinate {target} | Angles: {angles}")
+        logger.debug(f"Coordinate {target} | Angles: {angles}")
         return best_solution, "Success"
     else:
-        get_logger(__name__).error(f"Coordinate {target} | Calculate failed: No solution within joint limits")
+        logger.error(f"Coordinate {target} | Calculate failed: No solution within joint limits")
         return None, "No solution within joint limits"
 
 
+def solve_ik_batch(targets):
+    """
+    Vectorized solve_ik for many targets at once (same geometry, branch choice
+    and rounding as the scalar solver).
+    :param targets: (n, 3) array of x, y, z in cm
+    :return: (angles, ok) - (n, 4) angles in degrees (NaN where unsolved) and an (n,) bool mask
+    """
+    targets = np.atleast_2d(np.asarray(targets, dtype=float))
+    x, y, z = targets[:, 0], targets[:, 1], targets[:, 2]
+    L1_h, L1_v = 1, 9.5
+    L2 = 10.5
+    L3 = 10.0
+    L4_v, L4_h = -5.0, 4.5
+    L5_v = -10.0
+
+    j1 = np.degrees(np.arctan2(y, x))
+    r = np.sqrt(x**2 + y**2)
+    tx = r - L4_h - L1_h
+    tz = z - (L4_v + L5_v) - L1_v
+    dist_sq = tx**2 + tz**2
+    dist = np.sqrt(dist_sq)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        K = np.clip((dist_sq + L2**2 - L3**2) / (2 * L2 * dist), -1.0, 1.0)
+    phi = np.arctan2(tx, tz)
+    alpha = np.arccos(K)
+
+    angles = np.full((len(targets), 4), np.nan)
+    ok = np.zeros(len(targets), dtype=bool)
+    j1_ok = (-90 <= j1) & (j1 <= 90)
+
+    # Elbow branches in the scalar solver's order; the first one within limits wins
+    for sign in (1, -1):
+        j2_rad = phi - sign * alpha
+        term_x = tx - L2 * np.sin(j2_rad)
+        term_z = tz - L2 * np.cos(j2_rad)
+        sum_rad = np.arctan2(-term_z, term_x)
+        branch = np.stack([j1, np.degrees(j2_rad), np.degrees(sum_rad - j2_rad), np.degrees(-sum_rad)], axis=1)
+        branch = (branch + 180) % 360 - 180
+
+        use = j1_ok & ~ok & np.all((-100.1 <= branch) & (branch <= 100.1), axis=1)
+        angles[use] = np.round(branch[use], 2)
+        ok |= use
+
+    logger.debug(f"Batch IK: {ok.sum()}/{len(targets)} targets solved")
+    return angles, ok
+
+
 
 
 
@@ -0,0 +1,190 @@
+import os
+import cv2
+import numpy as np
+from Utils.Logger import get_logger
+
+logger = get_logger(__name__)
+
+# Default image corners of the playing area (tl, tr, br, bl) for the 1280x960 camera setup
+DEFAULT_BOARD_CORNERS = [[349, 296], [878, 277], [966, 807], [262, 825]]
+
+
+class BoardBackgroundModel:
+    """
+    Streaming per-pixel background model of the warped (top-down) empty board.
+    Keeps only a running mean and variance, so memory is constant no matter
+    how many frames are fed in. The first frames are averaged exactly, after
+    that an exponential moving average lets the reference follow lighting
+    drift during a session.
+
+    The 8x8 outputs use the warped image layout: row 0 is the top of the
+    image, which matches the ChessBoardDetector matrix (row 0 = H, col 0 = 8)
+    for the standard camera mounting.
+    """
+    def __init__(self, corners=None, size=800, alpha=0.05, fg_alpha=0.0,
+                 grayscale=True, k_sigma=3.0, min_diff=12.0, occupancy_ratio=0.08):
+        """
+        :param corners: 4 image points of the board (tl, tr, br, bl)
+        :param size: Side length of the warped board in pixels (multiple of 8)
+        :param alpha: Learning rate once warmed up (higher follows drift faster)
+        :param fg_alpha: Learning rate for pixels currently flagged as changed (0 = freeze)
+        :param grayscale: Model intensity only (3x cheaper) instead of BGR
+        :param k_sigma: Change threshold in standard deviations
+        :param min_diff: Absolute floor for the change threshold (grey levels)
+        :param occupancy_ratio: Fraction of changed pixels for a square to count as occupied
+        """
+        self.size = size
+        self.alpha = alpha
+        self.fg_alpha = fg_alpha
+        self.grayscale = grayscale
+        self.k_sigma = k_sigma
+        self.min_diff = min_diff
+        self.occupancy_ratio = occupancy_ratio
+
+        self.set_corners(corners if corners is not None else DEFAULT_BOARD_CORNERS)
+
+        self.mean = None
+        self.var = None
+        self.frame_count = 0
+
+    def set_corners(self, corners):
+        """Update the board corners (e.g. after relocalization). The learned model is kept."""
+        src_pts = np.float32(corners)
+        dst_pts = np.float32([[0, 0], [self.size, 0], [self.size, self.size], [0, self.size]])
+        self.M = cv2.getPerspectiveTransform(src_pts, dst_pts)
+
+    def reset(self):
+        self.mean = None
+        self.var = None
+        self.frame_count = 0
+
+    def warp(self, frame):
+        """Convert a raw camera frame (BGR, RGB(A)/XRGB or gray) to the warped model space."""
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
+        if self.grayscale and frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        warped = cv2.warpPerspective(frame, self.M, (self.size, self.size))
+        return warped.astype(np.float32)
+
+    def _diff(self, warped):
+        diff = np.abs(warped - self.mean)
+        thresh = self.k_sigma * np.sqrt(self.var) + self.min_diff
+        changed = diff > thresh
+        if changed.ndim == 3:
+            changed = changed.any(axis=2)
+        return changed
+
+    def update(self, frame, warped=None, warm_up=True):
+        """
+        Feed one frame into the model.
+        :param frame: Raw camera frame (ignored if warped is given)
+        :param warped: Already warped float32 frame from warp()
+        :param warm_up: Allow the exact average of the first frames; pass False for
+                        frames that may show pieces, which must always be frozen out
+        :return: Boolean change mask of the frame against the model before the update
+        """
+        x = self.warp(frame) if warped is None else warped
+
+        if self.mean is None:
+            self.mean = x.copy()
+            self.var = np.zeros_like(x)
+            self.frame_count = 1
+            return np.zeros(x.shape[:2], dtype=bool)
+
+        changed = self._diff(x)
+        self.frame_count += 1
+
+        # Exact running average while warming up (every frame counts),
+        # EMA with frozen foreground afterwards. alpha=0 never leaves warm-up.
+        warming_up = warm_up and self.frame_count * self.alpha < 1.0
+        rate = 1.0 / self.frame_count if warming_up else self.alpha
+        if warming_up or not changed.any():
+            a = rate
+        else:
+            a = np.where(changed, self.fg_alpha, rate).astype(np.float32)
+            if x.ndim == 3:
+                a = a[..., None]
+
+        delta = x - self.mean
+        incr = a * delta
+        self.mean += incr
+        self.var = (1.0 - a) * (self.var + delta * incr)
+
+        return changed
+
+    def is_ready(self):
+        return self.mean is not None
+
+    def save(self, path):
+        """Store mean/variance so the next session starts from the learned reference."""
+        if self.mean is None:
+            return
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        np.savez(path, mean=self.mean, var=self.var, frame_count=self.frame_count)
+
+    def load(self, path):
+        """
+        Restore a model stored by save().
+        :return: True if loaded, False if missing or not matching size/grayscale
+        """
+        if not os.path.exists(path):
+            return False
+        try:
+            data = np.load(path)
+            mean, var = data["mean"], data["var"]
+            frame_count = int(data["frame_count"])
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Background model {path} unreadable: {e}")
+            return False
+        expected = (self.size, self.size) if self.grayscale else (self.size, self.size, 3)
+        if mean.shape != expected or var.shape != expected:
+            logger.warning(f"Background model {path} has shape {mean.shape}, expected {expected}.")
+            return False
+        self.mean = mean.astype(np.float32)
+        self.var = var.astype(np.float32)
+        self.frame_count = frame_count
+        return True
+
+    def reference(self):
+        """Current background estimate as a uint8 image (None before the first update)."""
+        if self.mean is None:
+            return None
+        return np.clip(self.mean, 0, 255).astype(np.uint8)
+
+    def change_mask(self, frame, warped=None):
+        """Boolean mask of pixels that differ from the background, without updating it."""
+        if self.mean is None:
+            raise RuntimeError("Background model has no frames yet.")
+        x = self.warp(frame) if warped is None else warped
+        return self._diff(x)
+
+    def compare(self, frame_a, frame_b):
+        """
+        Fraction of pixels per square that differ between two frames, using
+        the model's per-pixel noise for the threshold. Catches changes that
+        keep a square occupied (a capture replaces one piece by another).
+        :return: 8x8 float change scores
+        """
+        if self.mean is None:
+            raise RuntimeError("Background model has no frames yet.")
+        diff = np.abs(self.warp(frame_b) - self.warp(frame_a))
+        # Both frames carry sensor noise, hence sqrt(2) sigma
+        changed = diff > self.k_sigma * np.sqrt(2.0 * self.var) + self.min_diff
+        if changed.ndim == 3:
+            changed = changed.any(axis=2)
+        return self.square_scores(changed)
+
+    def square_scores(self, mask):
+        """Fraction of changed pixels per square as an 8x8 float array."""
+        return cv2.resize(mask.astype(np.float32), (8, 8), interpolation=cv2.INTER_AREA)
+
+    def occupancy(self, frame):
+        """
+        Compare a frame against the background.
+        :return: (8x8 bool occupancy array, 8x8 float change scores)
+        """
+        scores = self.square_scores(self.change_mask(frame))
+        return scores > self.occupancy_ratio, scores
@@ -1,22 +1,30 @@
 import os
+import cv2
+import glob
 import json
 import time
 import numpy as np
 from picamera2 import Picamera2
 from Vision.PieceDetect import ChessBoardDetector
+from Vision.BackgroundModel import BoardBackgroundModel
 from Utils.Logger import get_logger
 logger = get_logger(__name__)
 
 class VisionSystem:
-    def __init__(self, model_path="chess_8sets_model.pkl", config_path="chessboardcfg.csv", history_file="cache/board_history.json"):
+    def __init__(self, model_path="chess_8sets_model.pkl", config_path="chessboardcfg.csv", history_file="cache/board_history.json",
+                 empty_board_dir="Identify/chess_data", background_file="cache/background_model.npz"):
         """
         Initializes the VisionSystem.
         Args:
             model_path: Path to the trained SVM model.
             config_path: Path to the chessboard coordinate config.
             history_file: Path to the JSON file where board states are stored.
+            empty_board_dir: Folder with the Empty_Board_N.jpg captures that seed the background model.
+            background_file: Where the learned background model is kept between sessions.
         """
         logger.info("Initializing VisionSystem...")
+        self.history_file = history_file
+        self.background_file = background_file
 
         history_dir = os.path.dirname(self.history_file)
         if history_dir and not os.path.exists(history_dir):
@@ -54,6 +62,11 @@ class VisionSystem:
             logger.error(f"Failed to initialize Picamera2: {e}")
             raise RuntimeError("Camera start failed")
 
+        # Streaming empty-board reference: seeded from empty boards, then fed the
+        # coordinator's base frames (squares with pieces on are frozen, the rest follow the light)
+        self.background = BoardBackgroundModel()
+        self.seed_background(empty_board_dir)
+
         # Coordinate Mapping: Matrix Index -> Chess Notation
         # Rows: 0=H (Top), 7=A (Bottom) | Cols: 0=8 (Left), 7=1 (Right)
         self.rows_map = {0: 'H', 1: 'G', 2: 'F', 3: 'E', 4: 'D', 5: 'C', 6: 'B', 7: 'A'}
@@ -66,6 +79,117 @@ class VisionSystem:
             self.picam2.capture_array()
             time.sleep(0.1)
 
+    def capture_frame(self):
+        """Single raw camera frame, or None if the capture failed."""
+        try:
+            return self.picam2.capture_array()
+        except Exception as e:
+            logger.error(f"Frame capture failed: {e}")
+            return None
+
+    def seed_background(self, empty_board_dir):
+        """
+        Start the background model from the reference saved by the last session,
+        else from the Empty_Board_N.jpg captures.
+        :return: True if the model has a reference
+        """
+        if self.background.load(self.background_file):
+            logger.info(f"Background model restored from {self.background_file} ({self.background.frame_count} frames).")
+            return True
+
+        files = sorted(glob.glob(os.path.join(empty_board_dir, "Empty_Board_*.jpg")))
+        for f in files:
+            img = cv2.imread(f)
+            if img is None:
+                logger.warning(f"Skipping unreadable {f}")
+                continue
+            self.background.update(img)
+
+        if not self.background.is_ready():
+            logger.warning(f"No empty-board images in {empty_board_dir}; background model disabled.")
+            return False
+        logger.info(f"Background model seeded from {self.background.frame_count} empty-board images.")
+        return True
+
+    def update_background(self, frame=None):
+        """
+        Feed a frame into the background model so the reference follows lighting
+        drift. Pieces on the board are fine once the model is seeded: pixels that
+        differ from the reference are frozen instead of learned.
+        :param frame: Raw camera frame; captured from the camera if None
+        :return: Boolean change mask against the reference before the update, or None if not seeded
+        """
+        if not self.background.is_ready():
+            # An unseeded model would take the pieces in this frame as the empty board
+            return None
+        if frame is None:
+            frame = self.picam2.capture_array()
+        return self.background.update(frame, warm_up=False)
+
+    def get_background_reference(self):
+        """Current warped empty-board reference image (None until the model has frames)."""
+        return self.background.reference()
+
+    def detect_changes(self, frame=None):
+        """
+        Occupancy / change detection against the background model.
+        :return: (8x8 bool matrix in detector layout, 8x8 change scores), or (None, None) if no reference yet
+        """
+        if not self.background.is_ready():
+            logger.warning("Background model not initialized yet.")
+            return None, None
+        if frame is None:
+            frame = self.picam2.capture_array()
+        occupied, scores = self.background.occupancy(frame)
+        return occupied.tolist(), scores
+
+    def check_initial_setup(self, frame):
+        """
+        True if exactly the squares of the starting position (ranks 1, 2, 7, 8)
+        are occupied according to the background model.
+        """
+        occupied, _ = self.detect_changes(frame)
+        if occupied is None:
+            return False
+        # Detector layout: columns are ranks 8..1
+        start_cols = {0, 1, 6, 7}
+        wrong = [self.get_coords_from_index(r, c) for r in range(8) for c in range(8)
+                 if occupied[r][c] != (c in start_cols)]
+        if wrong:
+            logger.debug(f"Setup incomplete, mismatching squares: {wrong}")
+        return not wrong
+
+    def get_move_uci(self, base_frame, frame):
+        """
+        Move made between two frames, from occupancy against the background model.
+        A square that stays occupied but changes is taken as the capture target
+        when exactly one square was vacated and none newly filled.
+        :return: UCI string, or None if no single move is recognised
+        """
+        if base_frame is None or frame is None:
+            return None
+        if not self.background.is_ready():
+            logger.warning("Background model not initialized yet.")
+            return None
+
+        before, _ = self.background.occupancy(base_frame)
+        after, _ = self.background.occupancy(frame)
+        reference = [['X' if before[r][c] else '.' for c in range(8)] for r in range(8)]
+        current = [['X' if after[r][c] else '.' for c in range(8)] for r in range(8)]
+
+        vacated = (before & ~after).sum()
+        filled = (after & ~before).sum()
+        if vacated == 1 and filled == 0:
+            scores = self.background.compare(base_frame, frame)
+            scores[~(before & after)] = 0.0
+            r, c = np.unravel_index(np.argmax(scores), scores.shape)
+            if scores[r, c] > self.background.occupancy_ratio:
+                current[r][c] = 'Y'
+
+        uci, status = self.analyze_diff(current, reference)
+        logger.info(f"Background move detection: UCI={uci}, Status={status}")
+        return uci
+
     def get_coords_from_index(self, r, c):
         """Converts matrix indices (row, col) to Board Label (e.g., 'a1')."""
         # Note: UCI standard usually uses lowercase (e.g., e2e4)
@@ -214,6 +338,8 @@ class VisionSystem:
 
     def close(self):
         """Releases camera resources."""
+        if hasattr(self, 'background'):
+            self.background.save(self.background_file)
         if hasattr(self, 'picam2'):
             logger.info("Stopping Picamera2...")
             self.picam2.stop()
@@ -0,0 +1,224 @@
+import cv2
+import numpy as np
+import pandas as pd
+import os
+import re
+import json
+import argparse
+
+# Packed patch dataset:
+#   <pack_dir>/meta.json      patch size, shared by all splits
+#   <pack_dir>/<split>.u8     raw uint8 patches, row-major, appended in place
+#   <pack_dir>/<split>.csv    one index row per patch (label, source, square, captured_at);
+#                             source is relative to the packed dataset root
+# A split is opened as a read-only np.memmap, so training and benchmarks
+# slice it without decoding a single JPEG.
+
+PATCH_SIZE = (64, 128)  # (width, height), same as the HOG window
+INDEX_COLUMNS = ["label", "source", "square", "captured_at"]
+IMAGE_EXTS = ('.jpg', '.png', '.jpeg')
+
+# Square name at the end of a patch file name, e.g. board_20250101_3f2a9c1e_E4.jpg
+SQUARE_PATTERN = re.compile(r"_([A-Ha-h][1-8])$")
+
+
+class PatchPack:
+    """
+    Append-only, memory-mappable store for grayscale training patches.
+    """
+    def __init__(self, pack_dir, patch_size=None):
+        """
+        :param pack_dir: Folder holding the pack (created if missing)
+        :param patch_size: (width, height) of every patch; must match an existing pack.
+                           None = the existing pack's size, PATCH_SIZE for a new one
+        """
+        self.pack_dir = pack_dir
+        os.makedirs(pack_dir, exist_ok=True)
+
+        meta_path = os.path.join(pack_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            self.patch_size = tuple(meta['patch_size'])
+            if patch_size is not None and tuple(patch_size) != self.patch_size:
+                raise ValueError(f"Pack {pack_dir} stores {self.patch_size} patches, not {tuple(patch_size)}")
+        else:
+            self.patch_size = tuple(patch_size) if patch_size is not None else PATCH_SIZE
+            with open(meta_path, 'w') as f:
+                json.dump({"patch_size": list(self.patch_size), "dtype": "uint8"}, f, indent=4)
+
+        width, height = self.patch_size
+        self.patch_bytes = width * height
+
+    def _data_path(self, split):
+        return os.path.join(self.pack_dir, f"{split}.u8")
+
+    def _index_path(self, split):
+        return os.path.join(self.pack_dir, f"{split}.csv")
+
+    def load_index(self, split):
+        """Index of a split as a DataFrame (empty if the split does not exist)."""
+        path = self._index_path(split)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+        return pd.read_csv(path, keep_default_na=False)
+
+    def splits(self):
+        return sorted(f[:-3] for f in os.listdir(self.pack_dir) if f.endswith(".u8"))
+
+    def append(self, split, patches, labels, sources=None, squares=None, captured_at=None):
+        """
+        Append patches to a split without rewriting what is already there.
+        :param patches: (N, H, W) uint8 array or list of HxW uint8 images
+        :param labels: N class names
+        :param sources: N source image paths (optional)
+        :param squares: N square names like 'E4' (optional)
+        :param captured_at: N capture timestamps, unix seconds (optional)
+        :return: Number of patches written
+        """
+        width, height = self.patch_size
+        patches = np.ascontiguousarray(np.asarray(patches, dtype=np.uint8))
+        if patches.size == 0:
+            return 0
+        if patches.ndim != 3 or patches.shape[1:] != (height, width):
+            raise ValueError(f"Expected (N, {height}, {width}) patches, got {patches.shape}")
+
+        n = len(patches)
+        index = pd.DataFrame({
+            "label": list(labels),
+            "source": list(sources) if sources is not None else [""] * n,
+            "square": list(squares) if squares is not None else [""] * n,
+            "captured_at": list(captured_at) if captured_at is not None else [0.0] * n,
+        }, columns=INDEX_COLUMNS)
+        if len(index) != n:
+            raise ValueError("Metadata length does not match number of patches")
+
+        # Data first, index second: a crash in between leaves extra bytes that load()
+        # ignores and the next append cuts off, so rows and index never drift apart
+        data_path = self._data_path(split)
+        committed = len(self.load_index(split)) * self.patch_bytes
+        if os.path.exists(data_path) and os.path.getsize(data_path) > committed:
+            os.truncate(data_path, committed)
+
+        with open(data_path, 'ab') as f:
+            f.write(patches.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        index_path = self._index_path(split)
+        index.to_csv(index_path, mode='a', header=not os.path.exists(index_path), index=False)
+        return n
+
+    def load(self, split):
+        """
+        Open a split for reading.
+        :return: (patches memmap (N, H, W) uint8, index DataFrame)
+        """
+        index = self.load_index(split)
+        data_path = self._data_path(split)
+        width, height = self.patch_size
+
+        n_data = os.path.getsize(data_path) // self.patch_bytes if os.path.exists(data_path) else 0
+        n = min(n_data, len(index))
+        if n == 0:
+            return np.zeros((0, height, width), dtype=np.uint8), index.iloc[:0]
+
+        patches = np.memmap(data_path, dtype=np.uint8, mode='r', shape=(n, height, width))
+        return patches, index.iloc[:n].reset_index(drop=True)
+
+    def select(self, split, labels=None, squares=None):
+        """
+        Slice a split by label and/or square without touching the other patches.
+        :return: (patches (M, H, W), index rows)
+        """
+        patches, index = self.load(split)
+        mask = np.ones(len(index), dtype=bool)
+        if labels is not None:
+            mask &= index['label'].isin(list(labels)).to_numpy()
+        if squares is not None:
+            mask &= index['square'].isin(list(squares)).to_numpy()
+        rows = np.flatnonzero(mask)
+        return patches[rows], index.iloc[rows].reset_index(drop=True)
+
+
+def has_pack(pack_dir):
+    """True if pack_dir holds a pack. Loaders use it to pick the pack over their image folders."""
+    return os.path.isfile(os.path.join(pack_dir, "meta.json"))
+
+
+def pack_directory(dataset_dir, pack_dir, split="train", classes=None, chunk=512, patch_size=None):
+    """
+    Pack a dataset/<class>/*.jpg tree into a split. Files already in the
+    split's index are skipped, so re-running only adds new captures.
+    :param patch_size: (width, height) for a new pack (default PATCH_SIZE); images are resized to it
+    :return: Number of newly packed patches
+    """
+    pack = PatchPack(pack_dir, patch_size=patch_size)
+    width, height = pack.patch_size
+    known = set(pack.load_index(split)['source'])
+
+    if classes is None:
+        classes = sorted(d for d in os.listdir(dataset_dir) if os.path.isdir(os.path.join(dataset_dir, d)))
+
+    added = 0
+    buf, meta = [], []
+
+    def flush():
+        nonlocal added
+        if buf:
+            labels, sources, squares, stamps = zip(*meta)
+            added += pack.append(split, np.stack(buf), labels, sources, squares, stamps)
+            buf.clear()
+            meta.clear()
+
+    for category in classes:
+        cat_path = os.path.join(dataset_dir, category)
+        if not os.path.isdir(cat_path):
+            print(f"Warning: Folder '{category}' not found. Skipping.")
+            continue
+
+        for img_name in sorted(os.listdir(cat_path)):
+            if not img_name.lower().endswith(IMAGE_EXTS):
+                continue
+            img_path = os.path.join(cat_path, img_name)
+            # Relative to the dataset root, so "dataset" and "./dataset" runs agree
+            source = os.path.relpath(img_path, dataset_dir)
+            if source in known:
+                continue
+
+            img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                continue
+            if img.shape[1] != width or img.shape[0] != height:
+                img = cv2.resize(img, (width, height))
+
+            match = SQUARE_PATTERN.search(os.path.splitext(img_name)[0])
+            square = match.group(1).upper() if match else ""
+
+            buf.append(img)
+            meta.append((category, source, square, os.path.getmtime(img_path)))
+            if len(buf) >= chunk:
+                flush()
+
+    flush()
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack a dataset/<class> image tree into a memory-mappable split.")
+    parser.add_argument("dataset_dir", help="Root with one folder per class")
+    parser.add_argument("pack_dir", help="Output pack folder")
+    parser.add_argument("--split", default="train", help="Split name (default: train)")
+    parser.add_argument("--patch-size", nargs=2, type=int, metavar=("W", "H"),
+                        help="Patch size of a new pack (default: 64 128)")
+    args = parser.parse_args()
+
+    added = pack_directory(args.dataset_dir, args.pack_dir, split=args.split, patch_size=args.patch_size)
+    patches, index = PatchPack(args.pack_dir).load(args.split)
+    print(f"Packed {added} new patches. Split '{args.split}' now holds {len(patches)} patches.")
+    if len(index):
+        print(index['label'].value_counts().to_string())
+
+
+if __name__ == "__main__":
+    main()
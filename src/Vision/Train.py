@@ -1,11 +1,16 @@
 import cv2
 import numpy as np
 import os
+import sys
 import joblib
 from sklearn.svm import SVC
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Vision.PatchPack import PatchPack, has_pack
+
 # ==========================================
 # 1. Configuration Area
 # ==========================================
@@ -13,6 +18,11 @@ from sklearn.metrics import classification_report, accuracy_score
 # Expected structure: origindataset/black, origindataset/empty, origindataset/white
 DATASET_DIR = "origindataset"
 
+# Packed copy of the dataset (see Vision/PatchPack.py). Used instead of
+# DATASET_DIR when it exists, so no JPEG has to be decoded.
+PACK_DIR = "origindataset_pack"
+PACK_SPLIT = "train"
+
 # HOG Parameters (Must match preprocessing dimensions: 64x128)
 WIN_SIZE = (64, 128)
 BLOCK_SIZE = (16, 16)
@@ -23,14 +33,16 @@ NBINS = 9
 # Initialize HOG Descriptor
 hog = cv2.HOGDescriptor(WIN_SIZE, BLOCK_SIZE, BLOCK_STRIDE, CELL_SIZE, NBINS)
 
+# Label mapping: empty=0, black=1, white=2
+LABEL_MAP = {'empty': 0, 'black': 1, 'white': 2}
+
 # ==========================================
 # 2. Feature Extraction Function
 # ==========================================
 def extract_hog_features(data_dir):
     features = []
     labels = []
-    # Label mapping: empty=0, black=1, white=2
-    label_map = {'empty': 0, 'black': 1, 'white': 2}
+    label_map = LABEL_MAP
 
     print("Starting HOG feature extraction from folders...")
 
@@ -63,12 +75,30 @@ def extract_hog_features(data_dir):
 
     return np.array(features), np.array(labels), label_map
 
+def extract_hog_features_from_pack(pack_dir, split=PACK_SPLIT):
+    """Same output as extract_hog_features, read from a memory-mapped PatchPack split."""
+    label_map = LABEL_MAP
+    pack = PatchPack(pack_dir, patch_size=WIN_SIZE)
+    patches, index = pack.select(split, labels=label_map.keys())
+
+    print(f"Starting HOG feature extraction from pack {pack_dir} [{split}]...")
+
+    features = np.empty((len(patches), hog.getDescriptorSize()), dtype=np.float32)
+    for i in range(len(patches)):
+        features[i] = hog.compute(patches[i]).ravel()
+
+    labels = index['label'].map(label_map).to_numpy()
+    return features, labels, label_map
+
 # ==========================================
 # 3. Main Training Routine
 # ==========================================
 def main():
     # 1. Load data and extract features
-    X, y, label_map = extract_hog_features(DATASET_DIR)
+    if has_pack(PACK_DIR):
+        X, y, label_map = extract_hog_features_from_pack(PACK_DIR)
+    else:
+        X, y, label_map = extract_hog_features(DATASET_DIR)
 
     if len(X) == 0:
         print("Error: No valid features extracted. Please check dataset path and images.")
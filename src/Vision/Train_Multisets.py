@@ -1,11 +1,16 @@
 import cv2
 import numpy as np
 import os
+import sys
 import joblib
 from sklearn.svm import SVC
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Vision.PatchPack import PatchPack, has_pack
+
 # ==========================================
 # 1. Configuration Area
 # ==========================================
@@ -13,6 +18,11 @@ from sklearn.metrics import classification_report, accuracy_score
 # Ensure your folder structure is: dataset/black, dataset/empty_black, etc.
 DATASET_DIR = "dataset"
 
+# Packed copy of the dataset (see Vision/PatchPack.py). Used instead of
+# DATASET_DIR when it exists, so no JPEG has to be decoded.
+PACK_DIR = "dataset_pack"
+PACK_SPLIT = "train"
+
 # HOG Parameters (Standard for 64x128 input)
 # These must remain consistent between Training and Inference
 WIN_SIZE = (64, 128)
@@ -24,31 +34,32 @@ NBINS = 9
 # Initialize HOG Descriptor
 hog = cv2.HOGDescriptor(WIN_SIZE, BLOCK_SIZE, BLOCK_STRIDE, CELL_SIZE, NBINS)
 
+# Updated Label Map: 8 Distinct Classes
+# We keep them separate during training to allow the SVM to find
+# the best hyperplane for each specific texture/lighting condition.
+LABEL_MAP = {
+    # Black Piece Faction
+    'black': 0,
+    'black_corner': 1,
+
+    # White Piece Faction
+    'white': 2,
+    'white_corner': 3,
+    'white_shadow': 4,
+
+    # Empty Square Faction (The new additions)
+    'empty_black': 5,
+    'empty_white': 6,
+    'empty_corner': 7
+}
+
 # ==========================================
 # 2. Feature Extraction Function
 # ==========================================
 def extract_hog_features(data_dir):
     features = []
     labels = []
-
-    # Updated Label Map: 8 Distinct Classes
-    # We keep them separate during training to allow the SVM to find
-    # the best hyperplane for each specific texture/lighting condition.
-    label_map = {
-        # Black Piece Faction
-        'black': 0,
-        'black_corner': 1,
-
-        # White Piece Faction
-        'white': 2,
-        'white_corner': 3,
-        'white_shadow': 4,
-
-        # Empty Square Faction (The new additions)
-        'empty_black': 5,
-        'empty_white': 6,
-        'empty_corner': 7
-    }
+    label_map = LABEL_MAP
 
     print(f"Starting HOG feature extraction from {data_dir}...")
     print(f"Target Classes: {list(label_map.keys())}")
@@ -85,12 +96,31 @@ def extract_hog_features(data_dir):
 
     return np.array(features), np.array(labels), label_map
 
+def extract_hog_features_from_pack(pack_dir, split=PACK_SPLIT):
+    """Same output as extract_hog_features, read from a memory-mapped PatchPack split."""
+    label_map = LABEL_MAP
+    pack = PatchPack(pack_dir, patch_size=WIN_SIZE)
+    patches, index = pack.select(split, labels=label_map.keys())
+
+    print(f"Starting HOG feature extraction from pack {pack_dir} [{split}]...")
+    print(index['label'].value_counts().to_string())
+
+    features = np.empty((len(patches), hog.getDescriptorSize()), dtype=np.float32)
+    for i in range(len(patches)):
+        features[i] = hog.compute(patches[i]).ravel()
+
+    labels = index['label'].map(label_map).to_numpy()
+    return features, labels, label_map
+
 # ==========================================
 # 3. Main Training Routine
 # ==========================================
 def main():
     # 1. Extract Features
-    X, y, label_map = extract_hog_features(DATASET_DIR)
+    if has_pack(PACK_DIR):
+        X, y, label_map = extract_hog_features_from_pack(PACK_DIR)
+    else:
+        X, y, label_map = extract_hog_features(DATASET_DIR)
 
     if len(X) == 0:
         print("Error: No features extracted. Please check your dataset structure.")
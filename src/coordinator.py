@@ -1,8 +1,13 @@
 import time
+import threading
 import chess
+from contextlib import nullcontext
+from concurrent.futures import TimeoutError as FutureTimeout
 from Vision.Detector import VisionSystem
 from Logic.chess_logic_manager import ChessLogicManager
+from Logic.game_journal import GameJournal
 from ServoControl.ArmActions import ArmAction
+from ServoControl.MotionExecutor import MotionExecutor
 from Utils.Logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,7 +17,8 @@ class GameCoordinator:
     The central controller managing game states, vision-logic-servo synchronization,
     and multi-point image verification.
     """
-    def __init__(self, pca_channels, enable_vision=True, enable_arm=True):
+    def __init__(self, pca_channels, enable_vision=True, enable_arm=True, journal_path="cache/game_journal.log",
+                 servo_bus=None):
         self.enable_vision = enable_vision
         self.enable_arm = enable_arm
 
@@ -28,14 +34,18 @@ class GameCoordinator:
         # Logic is always required for game rules and state
         self.logic = ChessLogicManager(robot_color=chess.BLACK)
         self.logic.start_engine()
+        self.governor = self.logic.governor
 
         # --- 3. SERVO CONTROL MODULE INITIALIZATION ---
-        if self.enable_arm and pca_channels is not None:
-            self.arm_action = ArmAction(pca_channels=pca_channels)
+        if self.enable_arm and (pca_channels is not None or servo_bus is not None):
+            self.arm_action = ArmAction(pca_channels=pca_channels, bus=servo_bus)
             self.arm_action.initialize()
+            # All arm motion runs on the executor thread, in submission order
+            self.motion = MotionExecutor(self.arm_action)
             logger.info("Arm Module initialized.")
         else:
             self.arm_action = None
+            self.motion = None
             logger.warning("Arm Module is DISABLED.")
 
         # State variables
@@ -43,6 +53,103 @@ class GameCoordinator:
         self.current_m_state = "IDLE"
         self.move_history = []
 
+        # Background engine search (see start_robot_response / poll_robot_response)
+        self.pending_search = None
+        self.search_started_at = 0.0
+        self.search_timeout = 5.0
+
+        # Arm motion of the robot's move (see finish_robot_response / poll_robot_response)
+        self.pending_motion = None
+        self._pending_robot_move = None
+
+        # Speculative arm motion: travel toward the engine's current best move while it
+        # is still searching, once that move has been stable long enough
+        self.speculate = True
+        self.speculate_depth = 3    # Best move unchanged for this many depths ...
+        self.speculate_time = 0.3   # ... or for this many seconds
+        self._spec_lock = threading.Lock()
+        self._spec_board = None
+        self._spec_move = None
+        self._spec_first_depth = 0
+        self._spec_since = 0.0
+        self._spec_square = None
+        self._spec_job = None
+        self.spec_stats = {"started": 0, "hits": 0, "redirects": 0}
+
+        # Write-ahead journal: resume an interrupted game instead of resetting the pieces
+        self.journal = GameJournal(journal_path)
+        self.robot_color = None
+        self.resumed = self.resume_from_journal()
+
+    def _activity(self, name):
+        """Tell the engine governor that a subsystem is busy for the duration of a with-block."""
+        return self.governor.activity(name) if self.governor is not None else nullcontext()
+
+    def _submit_motion(self, name, fn, *args, estimate=None, **kwargs):
+        """Queue an arm job on the motion executor, reported to the governor while it runs."""
+        def run(*job_args, **job_kwargs):
+            with self._activity("arm"):
+                return fn(*job_args, **job_kwargs)
+        return self.motion.submit(name, run, *args, estimate=estimate, **kwargs)
+
+    def resume_from_journal(self):
+        """
+        Rebuild logic, move history and capture-bin state from the journal of an
+        unfinished game.
+        :return: True if a game was resumed
+        """
+        state = self.journal.replay()
+        if state is None or state["result"] is not None:
+            return False
+
+        try:
+            self.logic.restore_game([uci for _, uci in state["moves"]], start_fen=state["fen"])
+        except ValueError as e:
+            logger.error(f"Journal cannot be replayed ({e}), starting a new game.")
+            return False
+
+        self.robot_color = state["robot_color"]
+        self.logic.robot_color = (self.robot_color == "white")
+        self.move_history = [f"{'User' if side == 'human' else 'AI'}: {uci}" for side, uci in state["moves"]]
+
+        if self.enable_arm and self.arm_action:
+            self.arm_action.board.set_perspective(self.robot_color)
+            self.arm_action.board.captured_count = state["captured_count"]
+        if state["arm_pending"]:
+            logger.warning(f"Last robot move {state['moves'][-1][1]} may not have been finished by the arm. "
+                           "Check the physical board.")
+
+        # check_ready_to_start is skipped on resume: the human's next move needs a
+        # reference frame. On the robot's turn _complete_robot_turn captures it.
+        if self.enable_vision and self.logic.board.turn != self.logic.robot_color:
+            self._capture_base_frame()
+
+        self.current_m_state = "WAITING"
+        logger.info(f"Resumed game after {len(state['moves'])} moves, robot plays {self.robot_color.upper()}.")
+        return True
+
+    def _capture_base_frame(self):
+        """Take the reference frame the human's next move is detected against."""
+        with self._activity("vision"):
+            self.base_frame = self.vision.capture_frame()
+            if self.base_frame is not None:
+                # Settled board between turns: lets the reference follow the lighting
+                self.vision.update_background(self.base_frame)
+        if self.base_frame is None:
+            logger.warning("No base frame captured; the next vision move cannot be detected.")
+        return self.base_frame is not None
+
+    def begin_game(self, robot_color):
+        """Start journaling a new game (no-op when an interrupted game was resumed)."""
+        if self.resumed:
+            return
+        self.robot_color = robot_color
+        self.journal.start_game(robot_color, self.logic.get_current_fen())
+
+    def _journal_game_over(self):
+        if self.logic.board.is_game_over():
+            self.journal.record_end(self.logic.board.result())
+
     def check_ready_to_start(self):
         """Phase 1: Monitor board setup. Auto-ready if vision is disabled."""
         if not self.enable_vision:
@@ -51,6 +158,7 @@ class GameCoordinator:
         frame = self.vision.capture_frame()
         if frame is not None and self.vision.check_initial_setup(frame):
             self.base_frame = frame
+            self.vision.update_background(frame)
             return True
         return False
 
@@ -65,6 +173,8 @@ class GameCoordinator:
         is_legal, info = self.logic.update_human_move(uci_str)
 
         if is_legal:
+            self.journal.record_human(uci_str)
+            self._journal_game_over()
             self.move_history.append(f"User: {uci_str}")
             logger.info(f"Manual move validated: {uci_str} ({info['move_type']})")
             return True, uci_str
@@ -80,9 +190,9 @@ class GameCoordinator:
 
         self.current_m_state = "THINKING"
         time.sleep(0.5)
-        frame_after_user = self.vision.capture_frame()
-
-        user_uci = self.vision.get_move_uci(self.base_frame, frame_after_user)
+        with self._activity("vision"):
+            frame_after_user = self.vision.capture_frame()
+            user_uci = self.vision.get_move_uci(self.base_frame, frame_after_user)
 
         if not user_uci:
             logger.warning("No move detected via vision.")
@@ -92,6 +202,8 @@ class GameCoordinator:
         is_legal, info = self.logic.update_human_move(user_uci)
 
         if is_legal:
+            self.journal.record_human(user_uci)
+            self._journal_game_over()
             self.move_history.append(f"User: {user_uci}")
             logger.info(f"Vision move validated: {user_uci} ({info['move_type']})")
             return True, user_uci
@@ -126,43 +238,260 @@ class GameCoordinator:
 
         return robot_color
 
-    def execute_robot_response(self):
-        """Phase 3: AI calculation and optional physical execution."""
+    def start_robot_response(self):
+        """
+        Phase 3a: Start the AI search in the background and return at once,
+        so the dashboard keeps refreshing while Stockfish thinks.
+        """
         self.current_m_state = "THINKING"
+        self.search_started_at = time.monotonic()
+
+        info_callback = None
+        if self.speculate and self.enable_arm and self.arm_action:
+            with self._spec_lock:
+                self._spec_board = self.logic.board.copy(stack=False)
+                self._spec_move = None
+                self._spec_square = None
+            info_callback = self._on_search_info
+
+        self.pending_search = self.logic.start_robot_search(info_callback=info_callback)
+        return self.pending_search
+
+    # ---------------- Speculative arm motion ----------------
+
+    def _first_square(self, board, move):
+        """Square the arm visits first for a move: the captured piece, else the moving piece."""
+        return chess.square_name(move.to_square if board.is_capture(move) else move.from_square)
+
+    def _on_search_info(self, info):
+        """Engine info callback (search thread): start pre-positioning once the best move is stable."""
+        pv = info.get("pv")
+        depth = info.get("depth")
+        if not pv or depth is None:
+            return
+
+        now = time.monotonic()
+        with self._spec_lock:
+            board = self._spec_board
+            if board is None:
+                return
+            move = pv[0]
+            if move != self._spec_move:
+                self._spec_move = move
+                self._spec_first_depth = depth
+                self._spec_since = now
+                return
+
+            stable = (depth - self._spec_first_depth >= self.speculate_depth
+                      or now - self._spec_since >= self.speculate_time)
+            square = self._first_square(board, move)
+            if not stable or square == self._spec_square:
+                return
+            self._spec_square = square
+            self._start_speculation(move.uci(), board.is_capture(move))
+
+    def _start_speculation(self, uci, capture):
+        """Queue the pre-positioning travel, replacing any earlier one (lock held)."""
+        previous = self._spec_job
+        if previous is not None and not previous.done():
+            previous.cancel()
+            self.spec_stats["redirects"] += 1
+
+        try:
+            self._spec_job = self._submit_motion(f"prepare {uci}", self.arm_action.prepare_move,
+                                                 uci, side="black", capture=capture)
+        except RuntimeError as e:
+            self._spec_job = None
+            logger.debug(f"No speculative travel: {e}")
+            return
+        self.spec_stats["started"] += 1
+
+    def _settle_speculation(self, robot_uci=None):
+        """
+        Before the arm executes the final move: let a matching pre-positioning
+        finish, abort one that went for another square.
+        """
+        with self._spec_lock:
+            job, square = self._spec_job, self._spec_square
+            board = self._spec_board
+            self._spec_job = self._spec_board = None
+            self._spec_move = self._spec_square = None
+        if job is None:
+            return
+
+        final_square = None
+        if robot_uci is not None and board is not None:
+            final_square = self._first_square(board, chess.Move.from_uci(robot_uci))
+        if final_square == square:
+            # The robot's move is queued behind it on the executor
+            self.spec_stats["hits"] += 1
+        else:
+            job.cancel()
+            self.spec_stats["redirects"] += 1
+            if robot_uci is not None:
+                logger.info(f"Speculative travel to {square} redirected, final move is {robot_uci}")
+
+    def get_speculation_stats(self):
+        return dict(self.spec_stats)
+
+    def is_robot_busy(self):
+        return self.pending_search is not None or self.pending_motion is not None
 
-        # --- LOGIC CALL: Get best move ---
-        robot_uci, info = self.logic.get_robot_move()
+    def poll_robot_response(self):
+        """
+        Phase 3b: Call from the UI loop. Once the search has finished, apply
+        the move and queue the arm motion; once that is done, finish the turn.
+        :return: (robot_uci, info) when the turn was completed, otherwise None
+        """
+        if self.pending_motion is not None:
+            if not self.pending_motion.done():
+                return None
+            return self._complete_robot_turn()
+
+        handle = self.pending_search
+        if handle is None:
+            return None
+
+        if not handle.done():
+            # Hard deadline: make the engine commit to its current best move
+            if time.monotonic() - self.search_started_at > self.search_timeout:
+                logger.warning("Engine search over deadline, forcing a move.")
+                handle.stop()
+            return None
+
+        self.pending_search = None
+        return self.finish_robot_response(handle.result())
+
+    def cancel_robot_response(self):
+        """Abort a running search without applying any move."""
+        if self.pending_search is not None:
+            self.pending_search.cancel()
+            self.pending_search = None
+            self.current_m_state = "WAITING"
+        self._settle_speculation()
+
+    def finish_robot_response(self, robot_uci):
+        """Phase 3c: Apply the AI move and optionally execute it physically."""
+        # The arm may already be on its way to this move
+        self._settle_speculation(robot_uci)
+
+        if robot_uci is None:
+            logger.warning("Engine returned no move (game over?).")
+            self.current_m_state = "WAITING"
+            return None, None
+
+        # The turn planner needs the position before the move (castling, en passant)
+        board_before = self.logic.board.copy(stack=False)
+        info = self.logic.apply_robot_move(robot_uci)
+        self.journal.record_robot(robot_uci)
         self.move_history.append(f"AI: {robot_uci}")
 
+        self._pending_robot_move = (robot_uci, info)
+
         # --- SERVO CALL: Physical Execution (If Enabled) ---
         if self.enable_arm and self.arm_action:
             self.current_m_state = "MOVING"
-
-            # Handle capture if the logic says so
-            if info.get("move_type") == "capture":
-                # The square being captured is the destination of the UCI move
-                target_sq = robot_uci[2:4]
-                logger.info(f"AI Capture on {target_sq}. Moving arm to clear...")
-                self.arm_action.handle_capture(target_sq, side="black")
-
-            # Move the piece
-            self.arm_action.execute_uci_move(robot_uci, side="black")
+            try:
+                estimate = self.arm_action.turn_planner.plan_move(board_before, robot_uci, side="black",
+                                                                  from_rest=True).duration
+            except ValueError:
+                estimate = None
+            try:
+                # Runs on the executor; the turn completes in poll_robot_response
+                self.pending_motion = self._submit_motion(f"move {robot_uci}", self._execute_robot_move,
+                                                          robot_uci, board_before, estimate=estimate)
+                return None
+            except RuntimeError as e:
+                logger.error(f"Robot move {robot_uci} not executed: {e}")
         else:
             logger.info(f"[SOFTWARE MODE] Robot move {robot_uci} applied to logic only.")
+        return self._complete_robot_turn()
+
+    def _execute_robot_move(self, robot_uci, board, abort=None):
+        """
+        Motion job: every piece the move touches (captured piece, castling rook,
+        en passant victim, the moving piece) in one planned turn, ordered from
+        wherever the arm is now (e.g. pre-positioned by speculation).
+        """
+        try:
+            plan = self.arm_action.turn_planner.plan_move(board, robot_uci, side="black")
+        except ValueError as e:
+            logger.error(f"Cannot plan {robot_uci}: {e}")
+            return False
+        return self.arm_action.execute_turn(plan, abort=abort)
+
+    def _complete_robot_turn(self):
+        """Phase 3d: After the arm is done (or without an arm), refresh vision and close the turn."""
+        robot_uci, info = self._pending_robot_move
+        self._pending_robot_move = None
+        job, self.pending_motion = self.pending_motion, None
+
+        arm_done = True
+        if job is not None:
+            error = job.exception() if not job.cancelled() else None
+            arm_done = not job.cancelled() and error is None and job.result() is not False
+            if not arm_done:
+                logger.error(f"Arm did not finish {robot_uci}"
+                             + (f": {error}" if error is not None else "") + ". Check the physical board.")
 
         # Update vision base frame if enabled
         if self.enable_vision:
             time.sleep(1.0)
-            self.base_frame = self.vision.capture_frame()
-
-        self.current_m_state = "WAITING"
+            self._capture_base_frame()
+
+        # Robot's clock stops once the move is physically done
+        self.logic.finish_robot_turn()
+        if arm_done:
+            captured_count = self.arm_action.board.captured_count if self.enable_arm and self.arm_action else 0
+            self.journal.record_arm_done(captured_count)
+        self._journal_game_over()
+        self.current_m_state = "ESTOP" if self.motion is not None and self.motion.is_estopped() else "WAITING"
         return robot_uci, info
 
+    def emergency_stop(self):
+        """Stop the arm at once and refuse further motion until resume_motion()."""
+        if self.motion is None:
+            logger.warning("Emergency stop: arm is disabled.")
+            return
+        self.motion.emergency_stop()
+        self.current_m_state = "ESTOP"
+
+    def resume_motion(self):
+        if self.motion is not None:
+            self.motion.reset_estop()
+        if self.current_m_state == "ESTOP":
+            self.current_m_state = "WAITING"
+
+    def execute_robot_response(self):
+        """Phase 3: AI calculation and optional physical execution (blocking)."""
+        handle = self.start_robot_response()
+        try:
+            robot_uci = handle.result(timeout=self.search_timeout)
+        except FutureTimeout:
+            handle.stop()
+            robot_uci = handle.result()
+        self.pending_search = None
+        result = self.finish_robot_response(robot_uci)
+        if self.pending_motion is not None:
+            self.motion.wait_idle()
+            result = self._complete_robot_turn()
+        return result
+
+    def _machine_state(self):
+        """Machine state for the dashboard, with the arm's phase and ETA while it moves."""
+        if self.current_m_state != "MOVING" or self.motion is None:
+            return self.current_m_state
+        progress = self.motion.get_progress()
+        if progress["phase"] is None:
+            return self.current_m_state
+        eta = f" {progress['eta']:.1f}s" if progress["eta"] is not None else ""
+        return f"MOVING {progress['phase'].upper()}{eta}"
+
     def get_ui_data(self):
         """Aggregates data. Ensure logic manager is tracking captures."""
         return {
             "fen": self.logic.get_current_fen(),
-            "m_state": self.current_m_state,
+            "m_state": self._machine_state(),
             "c_state": "CHECK" if self.logic.board.is_check() else "NORMAL",
             "steps": self.move_history,
             # Ensure these are lists of piece characters (e.g., ['p', 'n'])
@@ -202,9 +531,15 @@ class GameCoordinator:
             self.vision.close()
 
         if hasattr(self, 'logic') and self.logic:
+            self.cancel_robot_response()
             logger.info("Stopping Chess Engine...")
             self.logic.stop()
 
+        if hasattr(self, 'journal'):
+            self.journal.close()
+
         if self.enable_arm and hasattr(self, 'arm_action') and self.arm_action:
+            self.motion.shutdown(wait=False)
             logger.info("Releasing Servo torque...")
             self.arm_action.manager.release_all()
+            self.arm_action.motion_cache.close()
@@ -17,6 +17,7 @@ from UI.dashboard import ChessDashboard
 from UI.Overlays import UIOverlays
 from UI.CalibrationUI import CalibrationUI
 from coordinator import GameCoordinator
+from ServoControl.ServoBus import PCA9685Bus
 
 # --- HARDWARE & CALIBRATION ---
 from ServoControl.ArmCalibration import ArmCalibrator
@@ -93,6 +94,7 @@ def main():
 
     # --- 4. CONDITIONAL HARDWARE INITIALIZATION ---
     pca_channels = None
+    servo_bus = None
     if a_choice:
         try:
             # Only access physical I2C pins if the arm is explicitly enabled
@@ -100,6 +102,8 @@ def main():
             pca = PCA9685(i2c)
             pca.frequency = 50
             pca_channels = pca.channels
+            # All joints of a control tick in one I2C block write
+            servo_bus = PCA9685Bus(pca)
             logger.info("Hardware I2C and PCA9685 initialized successfully.")
         except Exception as e:
             # If initialization fails (e.g., on a VM), fallback to software mode
@@ -107,7 +111,7 @@ def main():
             a_choice = False
 
     # Initialize the Coordinator with user preferences
-    coord = GameCoordinator(pca_channels, enable_vision=v_choice, enable_arm=a_choice)
+    coord = GameCoordinator(pca_channels, enable_vision=v_choice, enable_arm=a_choice, servo_bus=servo_bus)
     dashboard = ChessDashboard()
 
     # --- 5. CALIBRATION (OPTIONAL) ---
@@ -138,7 +142,10 @@ def main():
                 vis_cal.close_window()
 
     # --- 6. GAME INITIALIZATION ---
-    if v_choice:
+    if coord.resumed:
+        # Interrupted game restored from the journal; the pieces are already in place
+        startup_ui.render(f"Resuming game ({len(coord.move_history)} moves played)...")
+    elif v_choice:
         startup_ui.render("Verifying Board Setup...")
         # Loops until the board matches the starting chess position
         while not coord.check_ready_to_start():
@@ -147,10 +154,18 @@ def main():
             time.sleep(0.5)
 
     # Sync perspective and robot color
-    detected_color = coord.detect_robot_color()
+    if coord.resumed:
+        detected_color = coord.robot_color
+    else:
+        detected_color = coord.detect_robot_color()
+        coord.begin_game(detected_color)
     logger.info(f"Setup complete. Robot is playing as {detected_color.upper()}.")
     time.sleep(1)
 
+    # A crash during the robot's search: pick the turn up where it was left
+    if coord.resumed and coord.logic.board.turn == coord.logic.robot_color and not coord.logic.board.is_game_over():
+        coord.start_robot_response()
+
 # --- 7. MAIN GAME LOOP (TUI) ---
     # 'screen=True' creates a dedicated full-screen buffer for the Dashboard
     with Live(dashboard.layout, refresh_per_second=4, screen=True) as live:
@@ -197,19 +212,34 @@ def main():
             dashboard.layout["input_zone"].update(dashboard.make_input_panel(ssh_input_buffer))
 
             # 7e. PROCESS USER INPUT EVENTS
-            if ssh_enter_pressed:
+            # Finish the robot's turn once the background search is done
+            coord.poll_robot_response()
+
+            if ssh_enter_pressed and ssh_input_buffer.lower().strip() == "stop":
+                # Emergency stop is accepted at any time, also while the arm moves
+                ssh_input_buffer = ""
+                ssh_enter_pressed = False
+                coord.emergency_stop()
+            elif ssh_enter_pressed and coord.is_robot_busy():
+                # Keep the input buffered until the robot has replied
+                pass
+            elif ssh_enter_pressed:
                 # Capture the command and immediately reset buffer to clear UI
                 command = ssh_input_buffer.lower().strip()
                 ssh_input_buffer = ""
                 ssh_enter_pressed = False
 
+                # CASE 0: Release the emergency stop
+                if command == "resume":
+                    coord.resume_motion()
+
                 # CASE 1: Manual UCI Move (e.g., "d2d4")
-                if len(command) >= 4 and command[0].isalpha():
+                elif len(command) >= 4 and command[0].isalpha():
                     logger.info(f"PROCESSING MANUAL MOVE: {command}")
                     is_valid, _ = coord.handle_manual_move(command)
                     if is_valid:
-                        # AI thinks and Arm executes if enabled
-                        coord.execute_robot_response()
+                        # AI thinks in the background, Arm executes once it is done
+                        coord.start_robot_response()
                     else:
                         logger.warning(f"ILLEGAL MOVE: {command}")
 
@@ -219,7 +249,7 @@ def main():
                     is_valid, move_msg = coord.handle_user_move_event()
                     if is_valid:
                         logger.info(f"HUMAN MOVE DETECTED: {move_msg}")
-                        coord.execute_robot_response()
+                        coord.start_robot_response()
                     else:
                         logger.warning(f"SCAN ERROR: {move_msg}")
 